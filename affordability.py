@@ -0,0 +1,149 @@
+"""
+Maximum affordable home price for Rent vs Buy Analysis
+Inverts the first-year monthly cost of owning (mortgage payment plus property
+tax, maintenance, insurance and HOA, as in RentVsBuyAnalysis) to find the
+highest purchase price a debt-to-income target allows, for whole arrays of
+incomes, states and filing statuses at once.
+"""
+
+import numpy as np
+
+from batch_engine import monthly_mortgage_payments
+from tax_calculator import TaxCalculator
+
+# Assumptions used when a caller leaves them out (ownership rates as in /api/analyze)
+AFFORDABILITY_DEFAULTS = {
+    'debt_to_income': 0.36,
+    'monthly_debts': 0,
+    'loan_term_years': 30,
+    'annual_interest_rate': 6.5,
+    'annual_property_tax_rate': 1.2,
+    'annual_maintenance_rate': 1.0,
+    'annual_insurance_rate': 0.5,
+    'annual_hoa': 0.2,
+}
+
+# Income the debt-to-income target applies to
+INCOME_BASES = ('after_tax', 'gross')
+
+# Filing statuses compared by compare_states unless others are given
+COMPARISON_FILING_STATUSES = ('single', 'married')
+
+
+def max_purchase_prices(monthly_budget, down_payment, payment_factor, ownership_share):
+    """
+    Highest purchase price whose first-year monthly cost fits a budget.
+    
+    The monthly cost of a price P is (P - down_payment) * payment_factor +
+    P * ownership_share, which is linear in P, so the price is solved in closed
+    form. When even a price equal to the down payment costs more than the budget,
+    the home is bought outright and only ownership costs count.
+    
+    Args:
+        monthly_budget: Monthly amount available for housing
+        down_payment: Cash put towards the price
+        payment_factor: Monthly mortgage payment per dollar borrowed
+        ownership_share: Monthly property tax, maintenance, insurance and HOA per
+            dollar of home value
+    
+    Returns:
+        Array of maximum purchase prices (0 where the budget is not positive)
+    """
+    budget = np.maximum(np.asarray(monthly_budget, dtype=np.float64), 0.0)
+    down_payment = np.asarray(down_payment, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        financed = (budget + down_payment * payment_factor) / (payment_factor + ownership_share)
+        outright = np.where(ownership_share > 0, np.minimum(down_payment, budget / ownership_share), down_payment)
+    return np.where(financed >= down_payment, financed, outright)
+
+
+def max_affordable_prices(gross_annual_income, down_payment, state_codes='CA', filing_statuses='single',
+                          income_basis='after_tax', **assumptions):
+    """
+    Maximum affordable purchase price for arrays of incomes, states and filing statuses.
+    
+    The housing budget is debt_to_income times monthly income (after-tax by
+    default, so it differs by state and filing status) minus other monthly debts.
+    
+    Args:
+        gross_annual_income: Annual income before taxes (scalar or array)
+        down_payment: Cash available for the down payment (scalar or array)
+        state_codes: Two-letter state code, or one per row
+        filing_statuses: Filing status, or one per row
+        income_basis: 'after_tax' or 'gross' monthly income for the ratio
+        **assumptions: Overrides for AFFORDABILITY_DEFAULTS (scalars or arrays)
+    
+    Returns:
+        Dictionary of float64 arrays: gross_annual_income, monthly_income,
+        housing_budget, max_purchase_price, loan_amount, monthly_mortgage_payment
+        and monthly_ownership_cost
+    """
+    unknown = [name for name in assumptions if name not in AFFORDABILITY_DEFAULTS]
+    if unknown:
+        raise ValueError(f"Unknown assumptions: {', '.join(sorted(unknown))}")
+    if income_basis not in INCOME_BASES:
+        raise ValueError(f"income_basis must be one of {', '.join(INCOME_BASES)}")
+    values = {name: np.asarray(assumptions.get(name, default), dtype=np.float64)
+              for name, default in AFFORDABILITY_DEFAULTS.items()}
+    
+    incomes, down_payment = np.broadcast_arrays(np.asarray(gross_annual_income, dtype=np.float64),
+                                                np.asarray(down_payment, dtype=np.float64))
+    incomes = np.atleast_1d(incomes)
+    down_payment = np.atleast_1d(down_payment)
+    if np.any(incomes < 0) or np.any(down_payment < 0):
+        raise ValueError("Income and down payment cannot be negative")
+    if np.any(values['debt_to_income'] <= 0) or np.any(values['debt_to_income'] > 1):
+        raise ValueError("debt_to_income must be above 0 and at most 1")
+    if np.any(values['loan_term_years'] < 1) or np.any(values['annual_interest_rate'] < 0):
+        raise ValueError("Loan term must be at least 1 year and the interest rate cannot be negative")
+    
+    if income_basis == 'after_tax':
+        taxes = TaxCalculator.calculate_after_tax_income_batch(incomes, state_codes, filing_statuses)
+        monthly_income = taxes['after_tax_monthly_income']
+    else:
+        monthly_income = incomes / 12
+    budget = values['debt_to_income'] * monthly_income - values['monthly_debts']
+    
+    payment_factor = monthly_mortgage_payments(1.0, values['annual_interest_rate'] / 100 / 12,
+                                               np.round(values['loan_term_years']) * 12)
+    ownership_share = (values['annual_property_tax_rate'] + values['annual_maintenance_rate'] +
+                       values['annual_insurance_rate'] + values['annual_hoa']) / 100 / 12
+    price = max_purchase_prices(budget, down_payment, payment_factor, ownership_share)
+    loan_amount = np.maximum(price - down_payment, 0.0)
+    mortgage = loan_amount * payment_factor
+    
+    return {
+        'gross_annual_income': incomes,
+        'monthly_income': monthly_income,
+        'housing_budget': budget,
+        'max_purchase_price': price,
+        'loan_amount': loan_amount,
+        'monthly_mortgage_payment': mortgage,
+        'monthly_ownership_cost': mortgage + price * ownership_share,
+    }
+
+
+def compare_states(gross_annual_income, down_payment, filing_statuses=COMPARISON_FILING_STATUSES,
+                   income_basis='after_tax', **assumptions):
+    """
+    Maximum affordable purchase price in every state for each filing status.
+    
+    All state and filing status combinations are evaluated as one batch.
+    
+    Args:
+        gross_annual_income: Annual income before taxes
+        down_payment: Cash available for the down payment
+        filing_statuses: Filing statuses to compare
+        income_basis: 'after_tax' or 'gross' (see max_affordable_prices)
+        **assumptions: Overrides for AFFORDABILITY_DEFAULTS (scalars)
+    
+    Returns:
+        Dictionary of max_affordable_prices arrays plus state_code and
+        filing_status columns, one row per (state, filing status), states sorted
+    """
+    states = TaxCalculator.get_available_states()
+    state_column = np.repeat(states, len(filing_statuses))
+    status_column = np.tile(np.asarray(filing_statuses, dtype=str), len(states))
+    results = max_affordable_prices(np.full(len(state_column), float(gross_annual_income)), down_payment,
+                                    state_column, status_column, income_basis, **assumptions)
+    return dict({'state_code': state_column, 'filing_status': status_column}, **results)
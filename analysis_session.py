@@ -0,0 +1,339 @@
+"""
+Incremental analysis sessions for Rent vs Buy Analysis
+Keeps the intermediate series of one scenario in a dependency graph keyed by
+the inputs each series reads, so that after an edit (a slider move) only the
+nodes downstream of the changed inputs are recomputed. Results are identical to
+RentVsBuyAnalysis.compare_scenarios for the same inputs.
+"""
+
+import threading
+
+from growth_tables import growth_table
+from rent_vs_buy import (ACCUMULATION_CLOSED_FORM, ACCUMULATION_ITERATIVE, COMPARE_FIELDS, LazyResults,
+                         RentVsBuyAnalysis, year_accumulation_factors)
+from scenario_params import SCENARIO_PARAM_FIELDS
+
+# RentVsBuyAnalysis constructor inputs
+LOAN_FIELDS = ('purchase_price', 'down_payment', 'loan_term_years', 'annual_interest_rate')
+
+# Every input a session can change
+SESSION_INPUTS = LOAN_FIELDS + SCENARIO_PARAM_FIELDS
+
+# Node name -> (inputs it reads, nodes it reads); each node is built by _compute_<name>
+NODES = {
+    'analysis': (LOAN_FIELDS, ()),
+    'loan': (('years',), ('analysis',)),
+    'home_values': (('purchase_price', 'annual_appreciation_rate', 'years'), ()),
+    'ownership_costs': (('annual_property_tax_rate', 'annual_maintenance_rate',
+                         'annual_insurance_rate', 'annual_hoa'), ('home_values',)),
+    'buy_costs': ((), ('loan', 'ownership_costs')),
+    'rents': (('monthly_rent', 'annual_rent_increase_rate', 'years'), ()),
+    'incomes': (('monthly_income', 'annual_inflation_rate', 'years'), ()),
+    'budget_account': (('annual_market_return', 'monthly_investment_percentage'), ('incomes',)),
+    'buy_account': (('annual_market_return', 'monthly_investment_percentage'), ('incomes', 'buy_costs')),
+    'rent_account': (('annual_market_return', 'monthly_investment_percentage', 'down_payment'),
+                     ('incomes', 'rents')),
+    'home_equity': ((), ('loan', 'home_values')),
+    'buying': (('closing_costs_percent',), ('analysis', 'loan', 'home_values', 'ownership_costs',
+                                            'budget_account')),
+    'renting': ((), ('rents', 'rent_account')),
+    'summary': (('years',), ('buying', 'renting')),
+    'monthly_costs': ((), ('buy_costs', 'rents', 'incomes', 'buy_account', 'rent_account')),
+    'yearly_growth': ((), ('home_equity', 'buy_account', 'rent_account')),
+}
+
+
+def _dependents():
+    """Map each input and node to the nodes that read it directly."""
+    dependents = {}
+    for node, (inputs, nodes) in NODES.items():
+        for name in inputs + nodes:
+            dependents.setdefault(name, []).append(node)
+    return dependents
+
+
+DEPENDENTS = _dependents()
+
+
+class AnalysisSession:
+    """
+    One scenario whose results are updated incrementally.
+    
+    Node values are computed on demand and kept until an input they depend on
+    (directly or through another node) changes. For example, changing
+    annual_interest_rate recomputes the loan, buying costs and buy-side account,
+    while the rent, income and home value series are reused as they are.
+    
+    A session is not safe for concurrent use; callers sharing one across threads
+    hold `lock` around update() and the use of results().
+    
+    Usage:
+        session = AnalysisSession(500000, 100000, ScenarioParams(10, monthly_rent=2000))
+        results = session.results()
+        session.update(annual_interest_rate=6.0)
+        results = session.results()  # Rent side reused
+    """
+    
+    def __init__(self, purchase_price, down_payment, scenario, loan_term_years=30, annual_interest_rate=6.5,
+                 accumulation=ACCUMULATION_ITERATIVE):
+        """
+        Args:
+            purchase_price: Total price of the house
+            down_payment: Available cash for down payment
+            scenario: ScenarioParams with the analysis period and scenario inputs
+            loan_term_years: Mortgage loan term
+            annual_interest_rate: Mortgage interest rate as percentage
+            accumulation: Investment accumulation mode (see RentVsBuyAnalysis)
+        """
+        if accumulation not in (ACCUMULATION_ITERATIVE, ACCUMULATION_CLOSED_FORM):
+            raise ValueError(f"Unknown accumulation mode: {accumulation}")
+        self.accumulation = accumulation
+        self.loan_inputs = {
+            'purchase_price': purchase_price,
+            'down_payment': down_payment,
+            'loan_term_years': loan_term_years,
+            'annual_interest_rate': annual_interest_rate,
+        }
+        self.scenario = scenario
+        self.lock = threading.Lock()
+        self.computations = dict.fromkeys(NODES, 0)
+        self._values = {}
+    
+    def update(self, **changes):
+        """
+        Change inputs and drop the node values that depend on them.
+        
+        Args:
+            **changes: New values by name (see SESSION_INPUTS); unchanged values are ignored
+        
+        Returns:
+            Sorted tuple of the node names whose cached values were dropped
+        """
+        unknown = [name for name in changes if name not in SESSION_INPUTS]
+        if unknown:
+            raise TypeError(f"Unknown inputs: {', '.join(sorted(unknown))}")
+        
+        scenario_changes = {name: value for name, value in changes.items() if name in SCENARIO_PARAM_FIELDS}
+        scenario = self.scenario.replace(**scenario_changes) if scenario_changes else self.scenario
+        changed = [name for name in SCENARIO_PARAM_FIELDS if getattr(scenario, name) != getattr(self.scenario, name)]
+        changed += [name for name in LOAN_FIELDS if name in changes and changes[name] != self.loan_inputs[name]]
+        self.scenario = scenario
+        for name in LOAN_FIELDS:
+            if name in changes:
+                self.loan_inputs[name] = changes[name]
+        
+        invalidated = set()
+        pending = list(changed)
+        while pending:
+            for node in DEPENDENTS.get(pending.pop(), ()):
+                if node not in invalidated:
+                    invalidated.add(node)
+                    pending.append(node)
+        dropped = tuple(sorted(node for node in invalidated if node in self._values))
+        for node in dropped:
+            del self._values[node]
+        return dropped
+    
+    def get(self, node):
+        """Value of a node, computing it (and any stale dependencies) if needed."""
+        if node not in self._values:
+            self._values[node] = getattr(self, f"_compute_{node}")()
+            self.computations[node] += 1
+        return self._values[node]
+    
+    def results(self, fields=None):
+        """
+        Results in the RentVsBuyAnalysis.compare_scenarios layout.
+        
+        Args:
+            fields: Optional keys to compute up front (see COMPARE_FIELDS). The result
+                is then a LazyResults; other keys are computed from the session's
+                current state on first access, so read them before the next update().
+        
+        Returns:
+            Dictionary with comparison results
+        """
+        if fields is None:
+            results = dict(self.get('summary'))
+            results['monthly_costs'] = self.get('monthly_costs')
+            results['yearly_growth'] = self.get('yearly_growth')
+            return results
+        
+        unknown = [name for name in fields if name not in COMPARE_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        loaders = {name: (lambda name=name: self.get('summary')[name]) for name in COMPARE_FIELDS}
+        loaders['monthly_costs'] = lambda: self.get('monthly_costs')
+        loaders['yearly_growth'] = lambda: self.get('yearly_growth')
+        results = LazyResults(loaders)
+        for name in fields:
+            results[name]
+        return results
+    
+    def _accumulate(self, start, contributions):
+        """Year-end values of an account given each year's level monthly contribution."""
+        monthly_return = self.scenario.annual_market_return / 100 / 12
+        growth_per_month = 1 + monthly_return
+        growth_per_year, annuity_per_year = year_accumulation_factors(monthly_return)
+        closed_form = self.accumulation == ACCUMULATION_CLOSED_FORM
+        values = []
+        value = start
+        for contribution in contributions:
+            if closed_form:
+                value = value * growth_per_year + contribution * annuity_per_year
+            else:
+                for month in range(12):
+                    value = value * growth_per_month + contribution
+            values.append(value)
+        return values
+    
+    @staticmethod
+    def _running_total(start, contributions):
+        """Contributed amount at each year end, given each year's monthly contribution."""
+        totals = []
+        total = start
+        for contribution in contributions:
+            total += contribution * 12
+            totals.append(total)
+        return totals
+    
+    # Nodes, in the order of NODES; the arithmetic follows RentVsBuyAnalysis._simulate
+    # step for step so results are bit-for-bit identical
+    
+    def _compute_analysis(self):
+        return RentVsBuyAnalysis(accumulation=self.accumulation, **self.loan_inputs)
+    
+    def _compute_loan(self):
+        analysis = self.get('analysis')
+        amortization = analysis._amortization()
+        return {
+            'monthly_payment': analysis.calculate_monthly_mortgage_payment(),
+            # Remaining balance at the end of each year, from year 0
+            'balances': [analysis.loan_amount * amortization.remaining_fraction(year * 12)
+                         for year in range(self.scenario.years + 1)],
+        }
+    
+    def _compute_home_values(self):
+        appreciation = growth_table(self.scenario.annual_appreciation_rate / 100, self.scenario.years).factors
+        purchase_price = self.loan_inputs['purchase_price']
+        return [purchase_price * appreciation[year] for year in range(self.scenario.years + 1)]
+    
+    def _compute_ownership_costs(self):
+        scenario = self.scenario
+        property_tax_share = scenario.annual_property_tax_rate / 100
+        maintenance_share = scenario.annual_maintenance_rate / 100
+        insurance_share = scenario.annual_insurance_rate / 100
+        hoa_share = scenario.annual_hoa / 100
+        totals = {'total_property_tax': 0, 'total_maintenance': 0, 'total_insurance': 0, 'total_hoa': 0}
+        monthly = []
+        # Ownership costs for each year are based on the value at its start
+        for home_value in self.get('home_values')[:-1]:
+            annual_property_tax = home_value * property_tax_share
+            annual_maintenance = home_value * maintenance_share
+            annual_insurance = home_value * insurance_share
+            annual_hoa_cost = home_value * hoa_share
+            totals['total_property_tax'] += annual_property_tax
+            totals['total_maintenance'] += annual_maintenance
+            totals['total_insurance'] += annual_insurance
+            totals['total_hoa'] += annual_hoa_cost
+            monthly.append((annual_property_tax + annual_maintenance + annual_insurance + annual_hoa_cost) / 12)
+        return {'monthly': monthly, 'totals': totals}
+    
+    def _compute_buy_costs(self):
+        monthly_mortgage = self.get('loan')['monthly_payment']
+        return [monthly_mortgage + ownership for ownership in self.get('ownership_costs')['monthly']]
+    
+    def _compute_rents(self):
+        rent_increase = growth_table(self.scenario.annual_rent_increase_rate / 100, self.scenario.years).factors
+        monthly = [self.scenario.monthly_rent * rent_increase[year] for year in range(self.scenario.years)]
+        total = 0
+        for rent in monthly:
+            total += rent * 12
+        return {'monthly': monthly, 'total': total}
+    
+    def _compute_incomes(self):
+        inflation = growth_table(self.scenario.annual_inflation_rate / 100, self.scenario.years).factors
+        return [self.scenario.monthly_income * inflation[year] for year in range(self.scenario.years)]
+    
+    def _compute_budget_account(self):
+        investment_share = self.scenario.monthly_investment_percentage / 100
+        return self._accumulate(0, [income * investment_share for income in self.get('incomes')])
+    
+    def _compute_buy_account(self):
+        investment_share = self.scenario.monthly_investment_percentage / 100
+        contributions = [max(0, income - cost) * investment_share
+                         for income, cost in zip(self.get('incomes'), self.get('buy_costs'))]
+        return {
+            'contributions': contributions,
+            'values': self._accumulate(0, contributions),
+            'contributed': self._running_total(0, contributions),
+        }
+    
+    def _compute_rent_account(self):
+        investment_share = self.scenario.monthly_investment_percentage / 100
+        down_payment = self.loan_inputs['down_payment']
+        contributions = [max(0, income - rent) * investment_share
+                         for income, rent in zip(self.get('incomes'), self.get('rents')['monthly'])]
+        return {
+            'contributions': contributions,
+            'values': self._accumulate(down_payment, contributions),
+            'contributed': self._running_total(down_payment, contributions),
+        }
+    
+    def _compute_home_equity(self):
+        home_values = self.get('home_values')
+        balances = self.get('loan')['balances']
+        return [home_values[year] - balances[year] - home_values[year] * 0.06
+                for year in range(1, self.scenario.years + 1)]
+    
+    def _compute_buying(self):
+        analysis = self.get('analysis')
+        budget_account = self.get('budget_account')
+        sim = dict(self.get('ownership_costs')['totals'])
+        sim.update({
+            'years': self.scenario.years,
+            'monthly_mortgage_payment': self.get('loan')['monthly_payment'],
+            'closing_costs': analysis.purchase_price * (self.scenario.closing_costs_percent / 100),
+            'final_home_value': self.get('home_values')[-1],
+            'remaining_mortgage_balance': self.get('loan')['balances'][-1],
+            'available_budget_investments': budget_account[-1] if budget_account else 0,
+        })
+        return analysis._buying_costs_view(sim)
+    
+    def _compute_renting(self):
+        rent_values = self.get('rent_account')['values']
+        return RentVsBuyAnalysis._renting_costs_view({
+            'total_rent': self.get('rents')['total'],
+            'investment_rent': rent_values[-1] if rent_values else self.loan_inputs['down_payment'],
+            'down_payment_investment': self.loan_inputs['down_payment'] * (
+                1 + self.scenario.annual_market_return / 100 / 12) ** (self.scenario.years * 12),
+        })
+    
+    def _compute_summary(self):
+        return RentVsBuyAnalysis._summary_view(self.scenario.years, self.get('buying'), self.get('renting'))
+    
+    def _compute_monthly_costs(self):
+        return RentVsBuyAnalysis._monthly_costs_view({
+            'years': self.scenario.years,
+            'series': {
+                'buy_costs': self.get('buy_costs'),
+                'rent_costs': self.get('rents')['monthly'],
+                'monthly_income': self.get('incomes'),
+                'buy_monthly_investments': self.get('buy_account')['contributions'],
+                'rent_monthly_investments': self.get('rent_account')['contributions'],
+            },
+        })
+    
+    def _compute_yearly_growth(self):
+        buy_account = self.get('buy_account')
+        rent_account = self.get('rent_account')
+        return RentVsBuyAnalysis._yearly_growth_view({
+            'years': self.scenario.years,
+            'series': {
+                'home_equity_after_sales': self.get('home_equity'),
+                'investment_growth_buy': buy_account['values'],
+                'investment_growth_rent': rent_account['values'],
+                'investment_contributions_buy': buy_account['contributed'],
+                'investment_contributions_rent': rent_account['contributed'],
+            },
+        })
@@ -2,169 +2,806 @@
 Web interface for Rent vs Buy Analysis
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
-from rent_vs_buy import RentVsBuyAnalysis
+from rent_vs_buy import RentVsBuyAnalysis, SCHEDULE_COLUMNS, SERIES_SECTIONS
+from analysis_session import AnalysisSession
+from scenario_params import ScenarioParams
 from tax_calculator import TaxCalculator
+from break_even import break_even_rents
+from financing_optimizer import DEFAULT_LOAN_TERMS, DEFAULT_MIN_DOWN_PAYMENT_PERCENT, optimize_financing
+from affordability import AFFORDABILITY_DEFAULTS, COMPARISON_FILING_STATUSES, compare_states
+from batch_engine import (compare_scenarios_batch, prepare_columns, find_invalid_scenarios, results_to_json,
+                          INVALID_SCENARIO_ERROR, MAX_ANALYSIS_YEARS)
+from sensitivity import sensitivity_analysis
+from monte_carlo import run_monte_carlo, DEFAULT_PERCENTILES
+from heatmap import evaluate_grid, grid_axis
+from result_cache import ResultCache, canonical_key
+from growth_tables import table_cache_info
+from instrumentation import PhaseTimer, log_timings
+from metrics import MetricsRegistry
+from static_page import StaticPage
+from schedule_export import SCHEDULE_FORMATS, iter_csv, iter_ndjson, negotiate_schedule_format
+from columnar import (COLUMNAR_BINARY_MIMETYPE, COLUMNAR_JSON_MIMETYPE, encode_columnar_binary,
+                      encode_columnar_json, negotiate_format, omit_fields, parse_omit)
+import base64
+import config
 import json
 import os
+import secrets
+import time
 
 app = Flask(__name__)
 CORS(app)
 
+# Cache of formatted /api/analyze responses keyed on canonical parameters
+analysis_cache = ResultCache(config.RESULT_CACHE_SIZE, config.RESULT_CACHE_TTL_SECONDS)
+
+# Incremental analysis sessions for interactive updates, per process. Session ids
+# carry the session's parameters, so any worker can rebuild a session it does not hold.
+analysis_sessions = ResultCache(config.SESSION_CACHE_SIZE, config.SESSION_TTL_SECONDS)
+
+# Main page, read once (works with or without templates folder)
+index_page = StaticPage([
+    os.path.join(os.path.dirname(__file__), 'index.html'),
+    os.path.join(os.path.dirname(__file__), 'templates', 'index.html'),
+], reload_interval=config.STATIC_RELOAD_INTERVAL)
+
+# Prometheus metrics, summed across worker processes through METRICS_DIR when set
+metrics = MetricsRegistry(config.METRICS_DIR, config.METRICS_FLUSH_INTERVAL)
+
+# Request fields for RentVsBuyAnalysis and compare_scenarios, with form defaults
+ANALYSIS_FIELDS = {
+    'purchase_price': 0,
+    'down_payment': 0,
+    'loan_term_years': 30,
+    'annual_interest_rate': 6.5,
+}
+SCENARIO_FIELDS = {
+    'monthly_rent': 0,
+    'annual_market_return': 7.0,
+    'annual_property_tax_rate': 1.2,
+    'annual_maintenance_rate': 1.0,
+    'annual_insurance_rate': 0.5,
+    'annual_hoa': 0.2,
+    'closing_costs_percent': 3,
+    'annual_appreciation_rate': 3.0,
+    'annual_rent_increase_rate': 3.0,
+    'monthly_income': 5000,
+    'annual_inflation_rate': 2.5,
+    'monthly_investment_percentage': 10.0,
+}
+INTEGER_FIELDS = ('analysis_years', 'loan_term_years')
+
+# Upper bound on simulated paths per Monte Carlo request
+MAX_MONTE_CARLO_PATHS = 200000
+
+# Upper bound on scenarios per /api/schedule export
+MAX_SCHEDULE_SCENARIOS = 10000
+
+# Upper bound on scenarios per /api/analyze/batch or /api/break-even-rent request
+MAX_BATCH_SCENARIOS = 100000
+
+# Upper bound on incomes per /api/affordability/batch request
+MAX_AFFORDABILITY_INCOMES = 100000
+
+
+def read_analysis_params(data):
+    """Extract analysis parameters from a request body, filling in form defaults."""
+    params = {'analysis_years': int(data.get('analysis_years', 10))}
+    for name, default in {**ANALYSIS_FIELDS, **SCENARIO_FIELDS}.items():
+        value = data.get(name, default)
+        params[name] = int(value) if name in INTEGER_FIELDS else float(value)
+    return params
+
+
+def validate_analysis_params(params):
+    """Return an error message for invalid analysis parameters, or None."""
+    if params['purchase_price'] <= 0 or params['down_payment'] <= 0 or params['monthly_rent'] <= 0:
+        return 'All main parameters must be positive'
+    
+    if params['down_payment'] > params['purchase_price']:
+        return 'Down payment cannot exceed purchase price'
+    
+    for name in INTEGER_FIELDS:
+        if not 1 <= params[name] <= MAX_ANALYSIS_YEARS:
+            return f'{name} must be between 1 and {MAX_ANALYSIS_YEARS}'
+    
+    return None
+
+
+def analysis_args(params):
+    """Constructor arguments for RentVsBuyAnalysis."""
+    return {name: params[name] for name in ANALYSIS_FIELDS}
+
+
+def scenario_args(params):
+    """Keyword arguments shared by compare_scenarios and related methods."""
+    return {name: params[name] for name in SCENARIO_FIELDS}
+
+
+def error_response(error, status):
+    """JSON error response for an exception, counted by type in /metrics."""
+    g.error_type = type(error).__name__
+    return jsonify({'error': str(error)}), status
+
+
+def results_response(results, extra=None, to_json=None):
+    """
+    Respond with results in the format negotiated by ?format= or Accept.
+    
+    Fields named in ?omit= (comma-separated dotted names or sections) are left out.
+    
+    Args:
+        results: Nested results (lists or NumPy arrays as columns)
+        extra: Top-level keys besides success and results (e.g. count)
+        to_json: Converts results for the default JSON format (default: as is)
+    """
+    response_format = negotiate_format(request.args.get('format'), request.accept_mimetypes)
+    omit = parse_omit(request.args.get('omit'))
+    extra = dict({'success': True}, **(extra or {}))
+    if response_format == 'columnar':
+        document = encode_columnar_json(results, omit, extra=extra)
+        response = Response(json.dumps(document, separators=(',', ':')), mimetype=COLUMNAR_JSON_MIMETYPE)
+    elif response_format == 'binary':
+        response = Response(encode_columnar_binary(results, omit, extra=extra), mimetype=COLUMNAR_BINARY_MIMETYPE)
+    else:
+        results = omit_fields(results, omit)
+        response = jsonify(dict(extra, results=to_json(results) if to_json else results))
+    # The format depends on Accept, so caches must not serve one client's format to another
+    response.vary.add('Accept')
+    return response
+
+
+def observe_analysis_years(params):
+    """Record the requested analysis period in /metrics."""
+    metrics.observe('rentvsbuy_analysis_years', params['analysis_years'], (request.url_rule.rule,))
+
+
+def _format_buying(buying):
+    """Round the buying section of compare_scenarios results."""
+    return {
+        'down_payment': round(buying['initial_down_payment'], 2),
+        'closing_costs': round(buying['closing_costs'], 2),
+        'monthly_mortgage': round(buying['monthly_mortgage_payment'], 2),
+        'total_mortgage_payments': round(buying['total_mortgage_payments'], 2),
+        'total_interest_paid': round(buying['total_interest_paid'], 2),
+        'total_property_tax': round(buying['total_property_tax'], 2),
+        'total_maintenance': round(buying['total_maintenance'], 2),
+        'total_insurance': round(buying['total_insurance'], 2),
+        'total_hoa': round(buying['total_hoa'], 2),
+        'selling_costs': round(buying['selling_costs'], 2),
+        'total_costs': round(buying['total_costs'], 2),
+        'final_home_value': round(buying['final_home_value'], 2),
+        'home_equity': round(buying['home_equity'], 2),
+    }
+
+
+def _format_renting(renting, down_payment):
+    """Round the renting section of compare_scenarios results."""
+    return {
+        'total_rent_paid': round(renting['total_rent_paid'], 2),
+        'investment_amount': round(renting['investment_amount'], 2),
+        'down_payment': round(down_payment, 2),
+    }
+
+
+def _format_monthly_costs(monthly_costs):
+    """Pick the monthly cost series of compare_scenarios results."""
+    return {
+        'years': monthly_costs['years'],
+        'buy_costs': monthly_costs['buy_costs'],
+        'rent_costs': monthly_costs['rent_costs'],
+        'monthly_income': monthly_costs['monthly_income'],
+        'buy_monthly_investments': monthly_costs['buy_monthly_investments'],
+        'rent_monthly_investments': monthly_costs['rent_monthly_investments']
+    }
+
+
+def _format_yearly_growth(yearly_growth):
+    """Pick the yearly growth series of compare_scenarios results."""
+    return {
+        'years': yearly_growth['years'],
+        'home_equity_after_sales': yearly_growth['home_equity_after_sales'],
+        'investment_growth': yearly_growth['investment_growth'],
+        'investment_growth_buy': yearly_growth['investment_growth_buy'],
+        'investment_growth_rent': yearly_growth['investment_growth_rent'],
+        'investment_gains_buy': yearly_growth['investment_gains_buy'],
+        'investment_gains_rent': yearly_growth['investment_gains_rent'],
+        'buy_wealth_gains': yearly_growth['buy_wealth_gains'],
+        'buy_total_available_cash': yearly_growth['buy_total_available_cash'],
+        'rent_total_available_cash': yearly_growth['rent_total_available_cash']
+    }
+
+
+# /api/analyze response fields, in response order, built from compare_scenarios results
+ANALYSIS_RESPONSE_FIELDS = {
+    'recommendation': lambda results, params: results['recommendation'],
+    'advantage_description': lambda results, params: results['advantage_description'],
+    'financial_advantage': lambda results, params: round(results['financial_advantage'], 2),
+    'buy_net_cost': lambda results, params: round(results['buy_net_cost'], 2),
+    'buy_net_position': lambda results, params: round(results['buying']['net_position'], 2),
+    'rent_net_cost': lambda results, params: round(results['rent_net_cost'], 2),
+    'rent_net_position': lambda results, params: round(results['rent_net_position'], 2),
+    'buying': lambda results, params: _format_buying(results['buying']),
+    'renting': lambda results, params: _format_renting(results['renting'], params['down_payment']),
+    'monthly_costs': lambda results, params: _format_monthly_costs(results['monthly_costs']),
+    'yearly_growth': lambda results, params: _format_yearly_growth(results['yearly_growth']),
+}
+
+
+def parse_fields(value):
+    """
+    Read a comma-separated ?fields= selection for /api/analyze.
+    
+    Returns:
+        Sorted tuple of field names, or None when every field is wanted
+    """
+    if not value:
+        return None
+    fields = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = fields - set(ANALYSIS_RESPONSE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(sorted(fields))
+
+
+def format_analysis_results(results, params, fields=None):
+    """
+    Round compare_scenarios results into the /api/analyze response layout.
+    
+    Only `fields` (default: all) are built, so series sections of a LazyResults
+    that were not asked for are never computed.
+    """
+    return {
+        name: format_field(results, params)
+        for name, format_field in ANALYSIS_RESPONSE_FIELDS.items()
+        if fields is None or name in fields
+    }
+
+
+def session_token(params):
+    """
+    Session id for a session's current parameters: a random nonce and the
+    parameters as URL-safe base64 JSON.
+    
+    The parameters are the client's own inputs and are validated again when
+    read back, so the id needs no signature.
+    """
+    encoded = base64.urlsafe_b64encode(json.dumps(params, separators=(',', ':')).encode()).decode()
+    return f"{secrets.token_urlsafe(8)}.{encoded.rstrip('=')}"
+
+
+def read_session_token(session_id):
+    """Parameters carried by a session id, or None if it is malformed."""
+    _, _, encoded = session_id.partition('.')
+    try:
+        data = json.loads(base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+        return read_analysis_params(data) if isinstance(data, dict) else None
+    except (OverflowError, TypeError, ValueError):
+        return None
+
+
+def new_session(params):
+    """AnalysisSession for validated analysis parameters."""
+    return AnalysisSession(scenario=ScenarioParams.from_mapping(params), **analysis_args(params))
+
+
+def session_response(session, params, fields, timer, extra):
+    """Format an AnalysisSession's current results like /api/analyze (call with session.lock held)."""
+    with timer.phase('simulate'):
+        engine_fields = None if fields is None else [name for name in fields if name in SERIES_SECTIONS]
+        results = session.results(engine_fields)
+    with timer.phase('format'):
+        payload = format_analysis_results(results, params, fields)
+    with timer.phase('serialize'):
+        response = results_response(payload, extra=extra)
+    response.headers['Server-Timing'] = timer.server_timing()
+    return response
+
+
+@app.before_request
+def start_request_timer():
+    """Note the request start time for latency metrics."""
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response):
+    """Count the request and record its latency, phases and error type."""
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.inc('rentvsbuy_http_requests_total', (route, request.method, response.status_code))
+    if 'request_started' in g:
+        metrics.observe('rentvsbuy_http_request_duration_seconds',
+                        time.perf_counter() - g.request_started, (route,))
+    if 'timer' in g:
+        for phase, seconds in g.timer.phases:
+            metrics.observe('rentvsbuy_engine_phase_duration_seconds', seconds, (route, phase))
+    if 'error_type' in g:
+        metrics.inc('rentvsbuy_errors_total', (route, g.error_type))
+    metrics.flush()
+    return response
+
+
 @app.route('/')
 def index():
-    """Render the main analysis page."""
-    # Read HTML file directly (works with or without templates folder)
-    html_path = os.path.join(os.path.dirname(__file__), 'index.html')
-    try:
-        with open(html_path, 'r', encoding='utf-8') as f:
-            return f.read()
-    except FileNotFoundError:
-        # Fallback if index.html is in templates folder
-        html_path = os.path.join(os.path.dirname(__file__), 'templates', 'index.html')
-        with open(html_path, 'r', encoding='utf-8') as f:
-            return f.read()
+    """Serve the main analysis page from memory, pre-compressed, with ETag revalidation."""
+    page = index_page.variants()
+    encoding = page.choose(request.accept_encodings.quality)
+    etag = page.etags[encoding]
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = Response(page.bodies[encoding], mimetype='text/html')
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = config.STATIC_CACHE_CONTROL
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
 
 @app.route('/api/analyze', methods=['POST'])
 def analyze():
     """API endpoint for rent vs buy analysis."""
+    timer = g.timer = PhaseTimer()
+    try:
+        with timer.phase('parse'):
+            data = request.json
+            params = read_analysis_params(data)
+            fields = parse_fields(request.args.get('fields'))
+        
+        # Validate inputs
+        with timer.phase('validate'):
+            error = validate_analysis_params(params)
+        if error:
+            return jsonify({'error': error}), 400
+        observe_analysis_years(params)
+        
+        # Repeat requests are served from the cache without running the analysis
+        with timer.phase('cache'):
+            key = (canonical_key(params), fields)
+            payload = analysis_cache.get(key)
+        timer.note('cache', 'miss' if payload is None else 'hit')
+        metrics.inc('rentvsbuy_cache_requests_total', ('analysis', 'miss' if payload is None else 'hit'))
+        if payload is None:
+            # Create analysis and run comparison
+            with timer.phase('init'):
+                analysis = RentVsBuyAnalysis(**analysis_args(params))
+            # With ?fields=, series sections are only computed if selected
+            engine_fields = None if fields is None else [name for name in fields if name in SERIES_SECTIONS]
+            results = analysis.compare_scenarios(years=params['analysis_years'], timer=timer,
+                                                 fields=engine_fields, **scenario_args(params))
+            with timer.phase('format'):
+                payload = format_analysis_results(results, params, fields)
+            analysis_cache.put(key, payload)
+        
+        with timer.phase('serialize'):
+            response = results_response(payload)
+        response.headers['Server-Timing'] = timer.server_timing()
+        log_timings('analyze', timer, config.TIMING_LOG_SAMPLE_RATE,
+                    recommendation=payload.get('recommendation'),
+                    financial_advantage=payload.get('financial_advantage'),
+                    years=params['analysis_years'])
+        return response
+    except ValueError as e:
+        return error_response(e, 400)
+    except Exception as e:
+        return error_response(e, 500)
+
+@app.route('/api/session', methods=['POST'])
+def create_session():
+    """
+    API endpoint starting an incremental analysis session for interactive updates.
+    Accepts the /api/analyze body and ?fields=, and returns the results with a
+    session_id for PATCH /api/session/<session_id>.
+    """
+    timer = g.timer = PhaseTimer()
+    try:
+        with timer.phase('parse'):
+            params = read_analysis_params(request.json)
+            fields = parse_fields(request.args.get('fields'))
+        
+        # Validate inputs
+        with timer.phase('validate'):
+            error = validate_analysis_params(params)
+        if error:
+            return jsonify({'error': error}), 400
+        observe_analysis_years(params)
+        
+        with timer.phase('init'):
+            session = new_session(params)
+        session_id = session_token(params)
+        with session.lock:
+            response = session_response(session, params, fields, timer, {'session_id': session_id})
+        analysis_sessions.put(session_id, {'session': session, 'params': params})
+        return response
+    except ValueError as e:
+        return error_response(e, 400)
+    except Exception as e:
+        return error_response(e, 500)
+
+@app.route('/api/session/<session_id>', methods=['PATCH'])
+def update_session(session_id):
+    """
+    API endpoint applying changed inputs to a session and returning its updated results.
+    The body holds only the /api/analyze fields that changed; only the parts of
+    the model that depend on them are recomputed.
+    """
+    timer = g.timer = PhaseTimer()
+    try:
+        base = read_session_token(session_id)
+        if base is None:
+            return jsonify({'error': 'Unknown session'}), 404
+        
+        # Take the session out of the store, so no other request updates it meanwhile
+        entry = analysis_sessions.pop(session_id)
+        metrics.inc('rentvsbuy_cache_requests_total', ('session', 'miss' if entry is None else 'hit'))
+        if entry is None:
+            # Expired, evicted, or held by another worker process: rebuild it from the id
+            if validate_analysis_params(base):
+                return jsonify({'error': 'Unknown session'}), 404
+            with timer.phase('init'):
+                entry = {'session': new_session(base), 'params': base}
+        
+        session = entry['session']
+        with session.lock:
+            with timer.phase('parse'):
+                params = read_analysis_params({**entry['params'], **request.json})
+                fields = parse_fields(request.args.get('fields'))
+            
+            # Validate inputs
+            with timer.phase('validate'):
+                error = validate_analysis_params(params)
+            if error:
+                analysis_sessions.put(session_id, entry)
+                return jsonify({'error': error}), 400
+            observe_analysis_years(params)
+            
+            with timer.phase('update'):
+                changes = {
+                    'years' if name == 'analysis_years' else name: value
+                    for name, value in params.items() if value != entry['params'][name]
+                }
+                invalidated = session.update(**changes)
+            entry['params'] = params
+            new_id = session_token(params)
+            response = session_response(session, params, fields, timer,
+                                        {'session_id': new_id, 'invalidated': list(invalidated)})
+        analysis_sessions.put(new_id, entry)
+        return response
+    except ValueError as e:
+        return error_response(e, 400)
+    except Exception as e:
+        return error_response(e, 500)
+
+@app.route('/api/analyze/horizons', methods=['POST'])
+def analyze_horizons():
+    """
+    API endpoint summarizing every analysis period from 1 year to the loan term.
+    Accepts the same body as /api/analyze (analysis_years is ignored).
+    """
+    try:
+        data = request.json
+        params = read_analysis_params(data)
+        
+        # Validate inputs
+        error = validate_analysis_params(params)
+        if error:
+            return jsonify({'error': error}), 400
+        
+        analysis = RentVsBuyAnalysis(**analysis_args(params))
+        summary = analysis.calculate_horizon_summary(**scenario_args(params))
+        
+        return jsonify({
+            'success': True,
+            'results': {
+                'years': summary['years'],
+                'financial_advantage': [round(value, 2) for value in summary['financial_advantage']],
+                'buy_net_position': [round(value, 2) for value in summary['buy_net_position']],
+                'rent_net_position': [round(value, 2) for value in summary['rent_net_position']],
+                'recommendation': summary['recommendation'],
+                'break_even_year': summary['break_even_year'],
+                'crossover_years': summary['crossover_years']
+            }
+        })
+    except ValueError as e:
+        return error_response(e, 400)
+    except Exception as e:
+        return error_response(e, 500)
+
+@app.route('/api/analyze/batch', methods=['POST'])
+def analyze_batch():
+    """
+    API endpoint for analyzing many scenarios in one call.
+    Expects {"scenarios": {field: [values...]}, "include_series": false}
+    with one list per input field (scalars apply to every scenario).
+    """
     try:
         data = request.json
+        columns = data.get('scenarios', {})
+        include_series = bool(data.get('include_series', False))
         
-        # Extract parameters
-        purchase_price = float(data.get('purchase_price', 0))
-        down_payment = float(data.get('down_payment', 0))
-        monthly_rent = float(data.get('monthly_rent', 0))
-        analysis_years = int(data.get('analysis_years', 10))
-        
-        # Mortgage parameters
-        loan_term = int(data.get('loan_term_years', 30))
-        interest_rate = float(data.get('annual_interest_rate', 6.5))
-        
-        # Ownership costs
-        property_tax_rate = float(data.get('annual_property_tax_rate', 1.2))
-        maintenance_rate = float(data.get('annual_maintenance_rate', 1.0))
-        insurance_rate = float(data.get('annual_insurance_rate', 0.5))
-        hoa = float(data.get('annual_hoa', 0.2))
-        closing_costs = float(data.get('closing_costs_percent', 3))
-        
-        # Market parameters
-        home_appreciation = float(data.get('annual_appreciation_rate', 3.0))
-        market_return = float(data.get('annual_market_return', 7.0))
-        rent_increase = float(data.get('annual_rent_increase_rate', 3.0))
-        
-        # Income and investment parameters
-        monthly_income = float(data.get('monthly_income', 5000))
-        annual_inflation = float(data.get('annual_inflation_rate', 2.5))
-        monthly_investment_percentage = float(data.get('monthly_investment_percentage', 10.0))
+        # Same defaults as /api/analyze
+        defaults = {'annual_hoa': 0.2}
         
         # Validate inputs
-        if purchase_price <= 0 or down_payment <= 0 or monthly_rent <= 0:
-            return jsonify({'error': 'All main parameters must be positive'}), 400
-        
-        if down_payment > purchase_price:
-            return jsonify({'error': 'Down payment cannot exceed purchase price'}), 400
-        
-        # Create analysis
-        analysis = RentVsBuyAnalysis(
-            purchase_price=purchase_price,
-            down_payment=down_payment,
-            loan_term_years=loan_term,
-            annual_interest_rate=interest_rate
-        )
+        count, arrays = prepare_columns(columns, defaults)
+        if count > MAX_BATCH_SCENARIOS:
+            return jsonify({'error': f'At most {MAX_BATCH_SCENARIOS} scenarios per request'}), 400
+        invalid = find_invalid_scenarios(arrays)
+        if len(invalid):
+            return jsonify({
+                'error': INVALID_SCENARIO_ERROR,
+                'invalid_scenarios': invalid.tolist()
+            }), 400
+        
+        results = compare_scenarios_batch(arrays, include_series=include_series)
+        
+        return results_response(results, extra={'count': count}, to_json=results_to_json)
+    except ValueError as e:
+        return error_response(e, 400)
+    except Exception as e:
+        return error_response(e, 500)
+
+@app.route('/api/break-even-rent', methods=['POST'])
+def analyze_break_even_rent():
+    """
+    API endpoint for the monthly rent at which buying and renting break even, for
+    many properties in one call. Expects {"scenarios": {field: [values...]}} as
+    /api/analyze/batch; monthly_rent is not needed.
+    """
+    try:
+        data = request.json
+        columns = dict(data.get('scenarios', {}))
+        columns.pop('monthly_rent', None)
+        
+        # Same defaults as /api/analyze; rent is the unknown, so check the rest with a placeholder
+        defaults = {'annual_hoa': 0.2}
+        count, arrays = prepare_columns(dict(columns, monthly_rent=1.0), defaults)
+        if count > MAX_BATCH_SCENARIOS:
+            return jsonify({'error': f'At most {MAX_BATCH_SCENARIOS} scenarios per request'}), 400
+        invalid = find_invalid_scenarios(arrays)
+        if len(invalid):
+            return jsonify({
+                'error': INVALID_SCENARIO_ERROR,
+                'invalid_scenarios': invalid.tolist()
+            }), 400
+        
+        results = break_even_rents(arrays)
+        
+        return results_response(results, extra={'count': count}, to_json=results_to_json)
+    except ValueError as e:
+        return error_response(e, 400)
+    except Exception as e:
+        return error_response(e, 500)
+
+@app.route('/api/optimize/financing', methods=['POST'])
+def optimize_financing_choice():
+    """
+    API endpoint for the down payment and loan term that maximize end-of-horizon
+    wealth. Accepts the /api/analyze body (down_payment and loan_term_years are
+    searched) plus "available_cash" and optional "loan_terms" and
+    "min_down_payment_percent".
+    """
+    try:
+        data = request.json
+        if 'available_cash' not in data:
+            return jsonify({'error': 'available_cash is required'}), 400
+        params = read_analysis_params(dict(data, down_payment=1))
+        
+        # Validate inputs with a placeholder down payment, which is searched
+        error = validate_analysis_params(dict(params, down_payment=0.01 * params['purchase_price']))
+        if error:
+            return jsonify({'error': error}), 400
+        observe_analysis_years(params)
         
-        # Run comparison
-        results = analysis.compare_scenarios(
-            years=analysis_years,
-            monthly_rent=monthly_rent,
-            annual_market_return=market_return,
-            annual_property_tax_rate=property_tax_rate,
-            annual_maintenance_rate=maintenance_rate,
-            annual_insurance_rate=insurance_rate,
-            annual_hoa=hoa,
-            closing_costs_percent=closing_costs,
-            annual_appreciation_rate=home_appreciation,
-            annual_rent_increase_rate=rent_increase,
-            monthly_income=monthly_income,
-            annual_inflation_rate=annual_inflation,
-            monthly_investment_percentage=monthly_investment_percentage
+        result = optimize_financing(
+            params, float(data['available_cash']),
+            loan_terms=data.get('loan_terms', DEFAULT_LOAN_TERMS),
+            min_down_payment_percent=float(data.get('min_down_payment_percent', DEFAULT_MIN_DOWN_PAYMENT_PERCENT)))
+        
+        return jsonify({
+            'success': True,
+            'results': {
+                'down_payment': round(result['down_payment'], 2),
+                'loan_term_years': result['loan_term_years'],
+                'wealth': round(result['wealth'], 2),
+                'monthly_mortgage_payment': round(result['monthly_mortgage_payment'], 2),
+                'leftover_cash': round(result['leftover_cash'], 2),
+                'terms': results_to_json(result['terms']),
+                'evaluations': result['evaluations']
+            }
+        })
+    except (TypeError, ValueError) as e:
+        return error_response(e, 400)
+    except Exception as e:
+        return error_response(e, 500)
+
+@app.route('/api/sensitivity', methods=['POST'])
+def analyze_sensitivity():
+    """
+    API endpoint for a tornado chart: change in financial advantage when each
+    input is bumped down and up. Accepts the /api/analyze body plus an optional
+    "bumps" mapping of input name to bump size.
+    """
+    try:
+        data = request.json
+        params = read_analysis_params(data)
+        
+        # Validate inputs
+        error = validate_analysis_params(params)
+        if error:
+            return jsonify({'error': error}), 400
+        observe_analysis_years(params)
+        
+        bumps = data.get('bumps')
+        if bumps is not None:
+            bumps = {name: float(value) for name, value in bumps.items()}
+        
+        sensitivity = sensitivity_analysis(params, bumps)
+        
+        return jsonify({
+            'success': True,
+            'results': {
+                'base_financial_advantage': round(sensitivity['base_financial_advantage'], 2),
+                'base_recommendation': sensitivity['base_recommendation'],
+                'inputs': [
+                    {
+                        **entry,
+                        'low_change': round(entry['low_change'], 2),
+                        'high_change': round(entry['high_change'], 2),
+                        'swing': round(entry['swing'], 2)
+                    }
+                    for entry in sensitivity['inputs']
+                ]
+            }
+        })
+    except ValueError as e:
+        return error_response(e, 400)
+    except Exception as e:
+        return error_response(e, 500)
+
+@app.route('/api/monte-carlo', methods=['POST'])
+def analyze_monte_carlo():
+    """
+    API endpoint for the Monte Carlo mode. Accepts the /api/analyze body plus
+    optional n_paths, seed, volatility, correlation, percentiles, distribution
+    and degrees_of_freedom.
+    """
+    try:
+        data = request.json
+        params = read_analysis_params(data)
+        
+        # Validate inputs
+        error = validate_analysis_params(params)
+        if error:
+            return jsonify({'error': error}), 400
+        observe_analysis_years(params)
+        
+        n_paths = int(data.get('n_paths', 10000))
+        if not 1 <= n_paths <= MAX_MONTE_CARLO_PATHS:
+            return jsonify({'error': f'n_paths must be between 1 and {MAX_MONTE_CARLO_PATHS}'}), 400
+        
+        seed = data.get('seed')
+        results = run_monte_carlo(
+            params,
+            n_paths=n_paths,
+            volatility=data.get('volatility'),
+            correlation=data.get('correlation'),
+            seed=int(seed) if seed is not None else None,
+            percentiles=[float(value) for value in data.get('percentiles', DEFAULT_PERCENTILES)],
+            distribution=data.get('distribution', 'normal'),
+            degrees_of_freedom=float(data.get('degrees_of_freedom', 5))
         )
+        results['bands'] = {
+            name: {label: [round(value, 2) for value in values] for label, values in band.items()}
+            for name, band in results['bands'].items()
+        }
         
-        # Debug: Print results
-        print(f"DEBUG - buy_net_cost: {results['buy_net_cost']}")
-        print(f"DEBUG - rent_net_position: {results['rent_net_position']}")
-        print(f"DEBUG - rent_net_cost: {results['rent_net_cost']}")
-        print(f"DEBUG - monthly_costs exists? {'monthly_costs' in results}")
-        if 'monthly_costs' in results:
-            print(f"DEBUG - monthly_costs keys: {results['monthly_costs'].keys()}")
-            print(f"DEBUG - buy_monthly_investments: {results['monthly_costs'].get('buy_monthly_investments', 'MISSING')}")
-            print(f"DEBUG - rent_monthly_investments: {results['monthly_costs'].get('rent_monthly_investments', 'MISSING')}")
-        print(f"DEBUG - yearly_growth exists? {'yearly_growth' in results}")
-        if 'yearly_growth' in results:
-            print(f"DEBUG - yearly_growth keys: {results['yearly_growth'].keys()}")
-            print(f"DEBUG - yearly_growth years: {results['yearly_growth']['years']}")
-            print(f"DEBUG - yearly_growth home_equity type: {type(results['yearly_growth']['home_equity_after_sales'])}")
-            print(f"DEBUG - yearly_growth home_equity: {results['yearly_growth']['home_equity_after_sales']}")
-            print(f"DEBUG - yearly_growth investment_growth: {results['yearly_growth']['investment_growth']}")
-        else:
-            print(f"DEBUG - Available keys: {results.keys()}")
+        return jsonify({'success': True, 'results': results})
+    except ValueError as e:
+        return error_response(e, 400)
+    except Exception as e:
+        return error_response(e, 500)
+
+@app.route('/api/heatmap', methods=['POST'])
+def analyze_heatmap():
+    """
+    API endpoint for a buy vs rent map over two inputs. Accepts the /api/analyze
+    body plus "x" and "y" axes, each {"field", "start", "stop", "steps"}.
+    """
+    try:
+        data = request.json
+        params = read_analysis_params(data)
+        
+        axes = {}
+        for name in ('x', 'y'):
+            axis = data.get(name)
+            if not axis:
+                return jsonify({'error': f'Missing {name} axis'}), 400
+            axes[name] = (axis.get('field'), grid_axis(axis.get('start'), axis.get('stop'), axis.get('steps', 50)))
+        
+        # Validate only the fixed inputs: axis inputs get placeholders that pass
+        # their checks, and evaluate_grid leaves invalid cells empty
+        axis_fields = {field for field, _ in axes.values()}
+        fixed = dict(params)
+        if 'monthly_rent' in axis_fields:
+            fixed['monthly_rent'] = 1.0
+        for name in INTEGER_FIELDS:
+            if name in axis_fields:
+                fixed[name] = 1
+        if {'purchase_price', 'down_payment'} <= axis_fields:
+            fixed['purchase_price'] = fixed['down_payment'] = 1.0
+        elif 'purchase_price' in axis_fields:
+            fixed['purchase_price'] = fixed['down_payment']
+        elif 'down_payment' in axis_fields:
+            fixed['down_payment'] = fixed['purchase_price']
+        error = validate_analysis_params(fixed)
+        if error:
+            return jsonify({'error': error}), 400
+        observe_analysis_years(params)
+        
+        (x_field, x_values), (y_field, y_values) = axes['x'], axes['y']
+        grid = evaluate_grid(params, x_field, x_values, y_field, y_values)
         
-        # Format results for JSON response
         return jsonify({
             'success': True,
             'results': {
-                'recommendation': results['recommendation'],
-                'advantage_description': results['advantage_description'],
-                'financial_advantage': round(results['financial_advantage'], 2),
-                'buy_net_cost': round(results['buy_net_cost'], 2),
-                'buy_net_position': round(results['buying']['net_position'], 2),
-                'rent_net_cost': round(results['rent_net_cost'], 2),
-                'rent_net_position': round(results['rent_net_position'], 2),
-                'buying': {
-                    'down_payment': round(results['buying']['initial_down_payment'], 2),
-                    'closing_costs': round(results['buying']['closing_costs'], 2),
-                    'monthly_mortgage': round(results['buying']['monthly_mortgage_payment'], 2),
-                    'total_mortgage_payments': round(results['buying']['total_mortgage_payments'], 2),
-                    'total_interest_paid': round(results['buying']['total_interest_paid'], 2),
-                    'total_property_tax': round(results['buying']['total_property_tax'], 2),
-                    'total_maintenance': round(results['buying']['total_maintenance'], 2),
-                    'total_insurance': round(results['buying']['total_insurance'], 2),
-                    'total_hoa': round(results['buying']['total_hoa'], 2),
-                    'selling_costs': round(results['buying']['selling_costs'], 2),
-                    'total_costs': round(results['buying']['total_costs'], 2),
-                    'final_home_value': round(results['buying']['final_home_value'], 2),
-                    'home_equity': round(results['buying']['home_equity'], 2),
-                },
-                'renting': {
-                    'total_rent_paid': round(results['renting']['total_rent_paid'], 2),
-                    'investment_amount': round(results['renting']['investment_amount'], 2),
-                    'down_payment': round(down_payment, 2),
-                },
-                'monthly_costs': {
-                    'years': results['monthly_costs']['years'],
-                    'buy_costs': results['monthly_costs']['buy_costs'],
-                    'rent_costs': results['monthly_costs']['rent_costs'],
-                    'monthly_income': results['monthly_costs']['monthly_income'],
-                    'buy_monthly_investments': results['monthly_costs']['buy_monthly_investments'],
-                    'rent_monthly_investments': results['monthly_costs']['rent_monthly_investments']
-                },
-                'yearly_growth': {
-                    'years': results['yearly_growth']['years'],
-                    'home_equity_after_sales': results['yearly_growth']['home_equity_after_sales'],
-                    'investment_growth': results['yearly_growth']['investment_growth'],
-                    'investment_growth_buy': results['yearly_growth']['investment_growth_buy'],
-                    'investment_growth_rent': results['yearly_growth']['investment_growth_rent'],
-                    'investment_gains_buy': results['yearly_growth']['investment_gains_buy'],
-                    'investment_gains_rent': results['yearly_growth']['investment_gains_rent'],
-                    'buy_wealth_gains': results['yearly_growth']['buy_wealth_gains'],
-                    'buy_total_available_cash': results['yearly_growth']['buy_total_available_cash'],
-                    'rent_total_available_cash': results['yearly_growth']['rent_total_available_cash']
-                }
+                'x_field': x_field,
+                'y_field': y_field,
+                'x_values': results_to_json(grid['x_values']),
+                'y_values': results_to_json(grid['y_values']),
+                'financial_advantage': results_to_json(grid['financial_advantage']),
+                'recommendation': [[value or None for value in row] for row in grid['recommendation'].tolist()]
             }
         })
+    except ValueError as e:
+        return error_response(e, 400)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return error_response(e, 500)
+
+@app.route('/api/schedule', methods=['POST'])
+def export_schedule():
+    """
+    API endpoint streaming the month-by-month schedule as CSV (default) or NDJSON
+    (?format=ndjson or Accept: application/x-ndjson). Accepts the /api/analyze
+    body, or {"scenarios": [body, ...]} for a batch export with a scenario column.
+    Rows are generated and encoded as they are sent (chunked transfer encoding).
+    """
+    try:
+        data = request.json
+        export_format = negotiate_schedule_format(request.args.get('format'), request.accept_mimetypes)
+        bodies = data['scenarios'] if 'scenarios' in data else [data]
+        if not 1 <= len(bodies) <= MAX_SCHEDULE_SCENARIOS:
+            return jsonify({'error': f'scenarios must hold between 1 and {MAX_SCHEDULE_SCENARIOS} entries'}), 400
+        
+        # Validate every scenario before the first byte is sent
+        schedules = []
+        for index, body in enumerate(bodies):
+            params = read_analysis_params(body)
+            error = validate_analysis_params(params)
+            if error:
+                return jsonify({'error': error if len(bodies) == 1 else f'Scenario {index}: {error}'}), 400
+            observe_analysis_years(params)
+            analysis = RentVsBuyAnalysis(**analysis_args(params))
+            schedules.append(analysis.iter_monthly_schedule(ScenarioParams.from_mapping(params)))
+        
+        if 'scenarios' in data:
+            columns = ('scenario',) + SCHEDULE_COLUMNS
+            rows = ((index,) + row for index, schedule in enumerate(schedules) for row in schedule)
+        else:
+            columns = SCHEDULE_COLUMNS
+            rows = schedules[0]
+        encode = iter_csv if export_format == 'csv' else iter_ndjson
+        response = Response(encode(rows, columns), mimetype=SCHEDULE_FORMATS[export_format])
+        response.vary.add('Accept')
+        if export_format == 'csv':
+            response.headers['Content-Disposition'] = 'attachment; filename="schedule.csv"'
+        return response
+    except (KeyError, TypeError, ValueError) as e:
+        return error_response(e, 400)
+    except Exception as e:
+        return error_response(e, 500)
 
 @app.route('/api/affordability', methods=['POST'])
 def calculate_affordability():
@@ -186,7 +823,74 @@ def calculate_affordability():
             'available_states': TaxCalculator.get_available_states()
         })
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return error_response(e, 500)
+
+@app.route('/api/affordability/batch', methods=['POST'])
+def calculate_affordability_batch():
+    """
+    After-tax income for many incomes in one call (e.g. a whole income curve).
+    Expects {"gross_annual_income": [...], "state_code": "CA" or [...],
+    "filing_status": "single" or [...]}; scalars apply to every income.
+    """
+    try:
+        data = request.get_json()
+        incomes = data.get('gross_annual_income')
+        if incomes is None:
+            raise ValueError("gross_annual_income is required")
+        if isinstance(incomes, list) and len(incomes) > MAX_AFFORDABILITY_INCOMES:
+            raise ValueError(f"At most {MAX_AFFORDABILITY_INCOMES} incomes per request")
+        state_codes = data.get('state_code', 'CA')
+        if isinstance(state_codes, list):
+            state_codes = [str(code).upper() for code in state_codes]
+        else:
+            state_codes = str(state_codes).upper()
+        filing_statuses = data.get('filing_status', 'single')
+        
+        results = TaxCalculator.calculate_after_tax_income_batch(incomes, state_codes, filing_statuses)
+        
+        return results_response(results, extra={'count': len(results['gross_annual_income'])},
+                                to_json=results_to_json)
+    except (TypeError, ValueError) as e:
+        return error_response(e, 400)
+    except Exception as e:
+        return error_response(e, 500)
+
+@app.route('/api/affordability/states', methods=['POST'])
+def compare_affordability_states():
+    """
+    Maximum affordable purchase price in every state for each filing status.
+    Expects {"gross_annual_income", "down_payment"} plus optional
+    "filing_statuses", "income_basis" and AFFORDABILITY_DEFAULTS assumptions.
+    """
+    try:
+        data = request.get_json()
+        for name in ('gross_annual_income', 'down_payment'):
+            if name not in data:
+                raise ValueError(f"{name} is required")
+        assumptions = {name: float(data[name]) for name in AFFORDABILITY_DEFAULTS if name in data}
+        filing_statuses = data.get('filing_statuses', list(COMPARISON_FILING_STATUSES))
+        if not isinstance(filing_statuses, list) or not filing_statuses:
+            raise ValueError("filing_statuses must be a non-empty list")
+        
+        results = compare_states(float(data['gross_annual_income']), float(data['down_payment']),
+                                 [str(status).lower() for status in filing_statuses],
+                                 data.get('income_basis', 'after_tax'), **assumptions)
+        
+        return results_response(results, extra={'count': len(results['state_code'])}, to_json=results_to_json)
+    except (TypeError, ValueError) as e:
+        return error_response(e, 400)
+    except Exception as e:
+        return error_response(e, 500)
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Return /api/analyze result cache, session store and shared table cache counters."""
+    return jsonify(dict(analysis_cache.stats(), sessions=analysis_sessions.stats(), tables=table_cache_info()))
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus metrics for all worker processes."""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/api/defaults', methods=['GET'])
 def get_defaults():
@@ -0,0 +1,429 @@
+"""
+Vectorized batch engine for Rent vs Buy Analysis
+Evaluates many scenarios at once using NumPy arrays instead of one
+RentVsBuyAnalysis instance per scenario.
+"""
+
+import numpy as np
+
+# Inputs that every scenario must provide
+REQUIRED_FIELDS = ('purchase_price', 'down_payment', 'monthly_rent')
+
+# Defaults for optional inputs (same as RentVsBuyAnalysis and compare_scenarios)
+DEFAULT_FIELDS = {
+    'analysis_years': 10,
+    'loan_term_years': 30,
+    'annual_interest_rate': 6.5,
+    'annual_market_return': 7.0,
+    'annual_property_tax_rate': 1.2,
+    'annual_maintenance_rate': 1.0,
+    'annual_insurance_rate': 0.5,
+    'annual_hoa': 0,
+    'closing_costs_percent': 3,
+    'annual_appreciation_rate': 3.0,
+    'annual_rent_increase_rate': 3.0,
+    'monthly_income': 5000,
+    'annual_inflation_rate': 2.5,
+    'monthly_investment_percentage': 10.0,
+}
+
+SCENARIO_FIELDS = REQUIRED_FIELDS + tuple(DEFAULT_FIELDS)
+
+# Longest analysis period or loan term a scenario may request
+MAX_ANALYSIS_YEARS = 100
+
+# Error reported for scenarios rejected by find_invalid_scenarios
+INVALID_SCENARIO_ERROR = (f'All inputs must be finite, main parameters positive, analysis period and loan term '
+                          f'at most {MAX_ANALYSIS_YEARS} years and down payment cannot exceed purchase price')
+
+# Unrounded per-year series recorded by compare_scenarios_batch
+SERIES_FIELDS = (
+    'buy_costs', 'rent_costs', 'monthly_income', 'buy_monthly_investments', 'rent_monthly_investments',
+    'home_equity_after_sales', 'investment_growth_buy', 'investment_growth_rent',
+    'investment_gains_buy', 'investment_gains_rent',
+)
+
+# Every series simulate_batch can record
+RECORDABLE_SERIES = SERIES_FIELDS + ('buy_net_position', 'rent_net_position')
+
+# Inputs that simulate_batch can vary from year to year
+YEARLY_RATE_FIELDS = ('annual_appreciation_rate', 'annual_market_return',
+                      'annual_rent_increase_rate', 'annual_inflation_rate')
+
+# Typical 6% realtor commission, as in RentVsBuyAnalysis
+SELLING_COST_RATE = 0.06
+
+
+def prepare_columns(columns, defaults=None):
+    """
+    Convert columnar scenario inputs into float64 arrays of equal length.
+    
+    Args:
+        columns: Mapping of field name to a list/array of values or a scalar
+            applied to every scenario
+        defaults: Optional overrides for DEFAULT_FIELDS
+    
+    Returns:
+        Tuple of (number of scenarios, dict of field name to array)
+    """
+    fill = dict(DEFAULT_FIELDS)
+    if defaults:
+        fill.update(defaults)
+    
+    missing = [name for name in REQUIRED_FIELDS if name not in columns]
+    if missing:
+        raise ValueError(f"Missing required fields: {', '.join(missing)}")
+    
+    unknown = [name for name in columns if name not in SCENARIO_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    
+    lengths = {np.size(columns[name]) for name in columns if np.ndim(columns[name]) > 0}
+    if len(lengths) > 1:
+        raise ValueError("All scenario columns must have the same length")
+    count = lengths.pop() if lengths else 1
+    
+    arrays = {}
+    for name in SCENARIO_FIELDS:
+        value = np.asarray(columns.get(name, fill.get(name)), dtype=np.float64)
+        arrays[name] = np.broadcast_to(value, (count,)) if value.ndim == 0 else value.reshape(count)
+    # Non-finite years become out-of-range integers, caught by find_invalid_scenarios
+    with np.errstate(invalid='ignore'):
+        arrays['analysis_years'] = arrays['analysis_years'].astype(np.int64)
+        arrays['loan_term_years'] = arrays['loan_term_years'].astype(np.int64)
+    return count, arrays
+
+
+def find_invalid_scenarios(arrays):
+    """Return indexes of scenarios that fail the /api/analyze input checks or hold non-finite inputs."""
+    invalid = (
+        (arrays['purchase_price'] <= 0) |
+        (arrays['down_payment'] <= 0) |
+        (arrays['monthly_rent'] <= 0) |
+        (arrays['down_payment'] > arrays['purchase_price']) |
+        (arrays['analysis_years'] < 1) |
+        (arrays['analysis_years'] > MAX_ANALYSIS_YEARS) |
+        (arrays['loan_term_years'] < 1) |
+        (arrays['loan_term_years'] > MAX_ANALYSIS_YEARS)
+    )
+    for name in SCENARIO_FIELDS:
+        invalid |= ~np.isfinite(arrays[name])
+    return np.flatnonzero(invalid)
+
+
+def monthly_mortgage_payments(loan_amount, monthly_interest_rate, num_payments):
+    """Vectorized standard mortgage payment, including the zero-rate case."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = (1 + monthly_interest_rate) ** num_payments
+        payment = loan_amount * monthly_interest_rate * growth / (growth - 1)
+    return np.where(monthly_interest_rate == 0, loan_amount / num_payments, payment)
+
+
+def remaining_mortgage_balances(loan_amount, payment, monthly_interest_rate, num_payments, months_paid):
+    """Vectorized remaining balance after `months_paid` payments (zero once the loan is paid off)."""
+    remaining_payments = num_payments - months_paid
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        discount = (1 + monthly_interest_rate) ** -remaining_payments
+        balance = payment * (1 - discount) / monthly_interest_rate
+    balance = np.where(monthly_interest_rate == 0, loan_amount * remaining_payments / num_payments, balance)
+    return np.where(remaining_payments <= 0, 0.0, balance)
+
+
+def year_accumulation_factors(monthly_return, months=12):
+    """Vectorized rent_vs_buy.year_accumulation_factors: (growth, annuity) per scenario."""
+    growth = (1 + monthly_return) ** months
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annuity = np.where(monthly_return == 0, float(months), (growth - 1) / monthly_return)
+    return growth, annuity
+
+
+def simulate_batch(arrays, count, record=(), yearly_rates=None):
+    """
+    Advance every scenario through its analysis period with array operations.
+    
+    Investment accounts are compounded with the closed-form yearly factors (see
+    year_accumulation_factors), so results match RentVsBuyAnalysis to within
+    floating-point rounding. Scenarios with a shorter horizon stop accumulating
+    once their analysis_years is reached.
+    
+    Args:
+        arrays: Prepared scenario arrays (see prepare_columns)
+        count: Number of scenarios
+        record: Names from RECORDABLE_SERIES to record for every year
+        yearly_rates: Optional mapping of a name in YEARLY_RATE_FIELDS to an
+            array of shape (max analysis_years, scenarios) of per-year rates
+            that replace the constant input
+    
+    Returns:
+        Dictionary with end-of-horizon state and the recorded (years, scenarios)
+        series, unrounded and not masked past each horizon
+    """
+    yearly_rates = yearly_rates or {}
+    unknown = [name for name in list(record) if name not in RECORDABLE_SERIES]
+    unknown += [name for name in yearly_rates if name not in YEARLY_RATE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    
+    purchase_price = arrays['purchase_price']
+    down_payment = arrays['down_payment']
+    years = arrays['analysis_years']
+    max_years = int(years.max()) if count else 0
+    
+    loan_amount = purchase_price - down_payment
+    monthly_interest_rate = arrays['annual_interest_rate'] / 100 / 12
+    num_payments = arrays['loan_term_years'] * 12
+    monthly_mortgage = monthly_mortgage_payments(loan_amount, monthly_interest_rate, num_payments)
+    closing_costs = purchase_price * (arrays['closing_costs_percent'] / 100)
+    
+    growth_per_year, annuity_per_year = year_accumulation_factors(arrays['annual_market_return'] / 100 / 12)
+    appreciation_factor = 1 + arrays['annual_appreciation_rate'] / 100
+    rent_increase_factor = 1 + arrays['annual_rent_increase_rate'] / 100
+    inflation_factor = 1 + arrays['annual_inflation_rate'] / 100
+    investment_share = arrays['monthly_investment_percentage'] / 100
+    ownership_share = (
+        arrays['annual_property_tax_rate'] + arrays['annual_maintenance_rate'] +
+        arrays['annual_insurance_rate'] + arrays['annual_hoa']
+    ) / 100
+    
+    # Sum of start-of-year home values; every ownership cost is a share of it
+    total_home_value_years = np.zeros(count)
+    total_rent = np.zeros(count)
+    budget_investments = np.zeros(count)
+    investment_buy = np.zeros(count)
+    contributions_buy = np.zeros(count)
+    investment_rent = down_payment.copy()
+    contributions_rent = down_payment.copy()
+    home_value = purchase_price.copy()
+    current_monthly_rent = arrays['monthly_rent'].copy()
+    current_monthly_income = arrays['monthly_income'].copy()
+    
+    # (years, scenarios) arrays filled one row per year
+    series = {name: np.empty((max_years, count)) for name in record}
+    record_equity = bool({'home_equity_after_sales', 'buy_net_position'} & set(record))
+    
+    for year in range(1, max_years + 1):
+        row = year - 1
+        active = year <= years
+        
+        # Per-year rates replace the constant inputs for this year
+        if 'annual_market_return' in yearly_rates:
+            growth_per_year, annuity_per_year = year_accumulation_factors(
+                yearly_rates['annual_market_return'][row] / 100 / 12)
+        if 'annual_appreciation_rate' in yearly_rates:
+            appreciation_factor = 1 + yearly_rates['annual_appreciation_rate'][row] / 100
+        if 'annual_rent_increase_rate' in yearly_rates:
+            rent_increase_factor = 1 + yearly_rates['annual_rent_increase_rate'][row] / 100
+        if 'annual_inflation_rate' in yearly_rates:
+            inflation_factor = 1 + yearly_rates['annual_inflation_rate'][row] / 100
+        
+        annual_ownership = home_value * ownership_share
+        total_home_value_years += np.where(active, home_value, 0.0)
+        total_rent += np.where(active, current_monthly_rent * 12, 0.0)
+        
+        monthly_buy_cost = monthly_mortgage + annual_ownership / 12
+        budget_contribution = current_monthly_income * investment_share
+        buy_contribution = np.maximum(0, current_monthly_income - monthly_buy_cost) * investment_share
+        rent_contribution = np.maximum(0, current_monthly_income - current_monthly_rent) * investment_share
+        
+        budget_investments = np.where(
+            active, budget_investments * growth_per_year + budget_contribution * annuity_per_year, budget_investments)
+        investment_buy = np.where(
+            active, investment_buy * growth_per_year + buy_contribution * annuity_per_year, investment_buy)
+        investment_rent = np.where(
+            active, investment_rent * growth_per_year + rent_contribution * annuity_per_year, investment_rent)
+        contributions_buy += np.where(active, buy_contribution * 12, 0.0)
+        contributions_rent += np.where(active, rent_contribution * 12, 0.0)
+        
+        if record:
+            values = {
+                'buy_costs': monthly_buy_cost,
+                'rent_costs': current_monthly_rent,
+                'monthly_income': current_monthly_income,
+                'buy_monthly_investments': buy_contribution,
+                'rent_monthly_investments': rent_contribution,
+                'investment_growth_buy': investment_buy,
+                'investment_growth_rent': investment_rent,
+            }
+            for name in record:
+                if name in values:
+                    series[name][row] = values[name]
+                elif name == 'investment_gains_buy':
+                    series[name][row] = investment_buy - contributions_buy
+                elif name == 'investment_gains_rent':
+                    series[name][row] = investment_rent - contributions_rent
+                elif name == 'rent_net_position':
+                    series[name][row] = investment_rent - total_rent
+        
+        # Appreciate home value and grow rent and income for next year
+        home_value = np.where(active, home_value * appreciation_factor, home_value)
+        current_monthly_rent = np.where(active, current_monthly_rent * rent_increase_factor, current_monthly_rent)
+        current_monthly_income = np.where(active, current_monthly_income * inflation_factor, current_monthly_income)
+        
+        if record_equity:
+            balance = remaining_mortgage_balances(
+                loan_amount, monthly_mortgage, monthly_interest_rate, num_payments, year * 12)
+            equity = home_value - balance - home_value * SELLING_COST_RATE
+            if 'home_equity_after_sales' in series:
+                series['home_equity_after_sales'][row] = equity
+            if 'buy_net_position' in series:
+                costs_paid = closing_costs + monthly_mortgage * 12 * year + total_home_value_years * ownership_share
+                series['buy_net_position'][row] = equity + budget_investments - costs_paid
+    
+    return {
+        'max_years': max_years,
+        'loan_amount': loan_amount,
+        'monthly_mortgage_payment': monthly_mortgage,
+        'remaining_mortgage_balance': remaining_mortgage_balances(
+            loan_amount, monthly_mortgage, monthly_interest_rate, num_payments, years * 12),
+        'closing_costs': closing_costs,
+        'total_home_value_years': total_home_value_years,
+        'total_rent': total_rent,
+        'final_home_value': home_value,
+        'available_budget_investments': budget_investments,
+        'investment_rent': investment_rent,
+        'series': series,
+    }
+
+
+def compare_scenarios_batch(columns, include_series=True, defaults=None):
+    """
+    Run compare_scenarios for many scenarios at once.
+    
+    Args:
+        columns: Mapping of scenario field name to values (see SCENARIO_FIELDS)
+        include_series: Also build the monthly_costs and yearly_growth series as
+            2D arrays of shape (scenarios, max analysis_years), NaN past each
+            scenario's horizon
+        defaults: Optional overrides for DEFAULT_FIELDS
+    
+    Returns:
+        Dictionary with the compare_scenarios layout where every value is an array
+    """
+    count, arrays = prepare_columns(columns, defaults)
+    sim = simulate_batch(arrays, count, record=SERIES_FIELDS if include_series else ())
+    
+    down_payment = arrays['down_payment']
+    years = arrays['analysis_years']
+    max_years = sim['max_years']
+    loan_amount = sim['loan_amount']
+    monthly_mortgage = sim['monthly_mortgage_payment']
+    remaining_balance = sim['remaining_mortgage_balance']
+    total_home_value_years = sim['total_home_value_years']
+    total_rent = sim['total_rent']
+    budget_investments = sim['available_budget_investments']
+    investment_rent = sim['investment_rent']
+    home_value = sim['final_home_value']
+    
+    # Buying totals, as in RentVsBuyAnalysis.calculate_buying_costs
+    total_property_tax = total_home_value_years * (arrays['annual_property_tax_rate'] / 100)
+    total_maintenance = total_home_value_years * (arrays['annual_maintenance_rate'] / 100)
+    total_insurance = total_home_value_years * (arrays['annual_insurance_rate'] / 100)
+    total_hoa = total_home_value_years * (arrays['annual_hoa'] / 100)
+    
+    total_mortgage_payments = monthly_mortgage * 12 * years
+    total_interest_paid = total_mortgage_payments - (loan_amount - remaining_balance)
+    closing_costs = sim['closing_costs']
+    final_home_value = home_value
+    selling_costs = final_home_value * SELLING_COST_RATE
+    home_equity = final_home_value - remaining_balance - selling_costs
+    total_costs = (closing_costs + total_mortgage_payments + total_property_tax +
+                   total_maintenance + total_insurance + total_hoa + selling_costs)
+    buy_net_position = home_equity + budget_investments - (total_costs - selling_costs)
+    rent_net_position = investment_rent - total_rent
+    position_advantage = buy_net_position - rent_net_position
+    
+    results = {
+        'analysis_period_years': years,
+        'buying': {
+            'initial_down_payment': down_payment,
+            'closing_costs': closing_costs,
+            'total_mortgage_payments': total_mortgage_payments,
+            'total_interest_paid': total_interest_paid,
+            'total_property_tax': total_property_tax,
+            'total_maintenance': total_maintenance,
+            'total_insurance': total_insurance,
+            'total_hoa': total_hoa,
+            'selling_costs': selling_costs,
+            'total_costs': total_costs,
+            'final_home_value': final_home_value,
+            'remaining_mortgage_balance': remaining_balance,
+            'home_equity': home_equity,
+            'available_budget_investments': budget_investments,
+            'net_cost': total_costs - home_equity,
+            'net_position': buy_net_position,
+            'monthly_mortgage_payment': monthly_mortgage,
+        },
+        'renting': {
+            'total_rent_paid': total_rent,
+            'investment_amount': investment_rent,
+            'investment_from_down_payment': down_payment * (1 + arrays['annual_market_return'] / 100 / 12) ** (years * 12),
+            'total_outflow': total_rent,
+            'net_position': rent_net_position,
+        },
+        'financial_advantage': position_advantage,
+        'buy_net_cost': total_costs - home_equity,
+        'rent_net_position': rent_net_position,
+        'rent_net_cost': total_rent,
+        'recommendation': np.where(buy_net_position > rent_net_position, 'BUY', 'RENT'),
+        'advantage_amount': np.abs(position_advantage),
+    }
+    
+    if include_series:
+        # (scenarios, years) arrays, NaN past each scenario's horizon
+        past_horizon = np.arange(1, max_years + 1) > years[:, None]
+        series = {name: np.where(past_horizon, np.nan, sim['series'][name].T) for name in SERIES_FIELDS}
+        results['monthly_costs'] = _monthly_costs_series(series, max_years)
+        results['yearly_growth'] = _yearly_growth_series(series, max_years)
+    
+    return results
+
+
+def _monthly_costs_series(series, max_years):
+    """Round the monthly cost series like RentVsBuyAnalysis.calculate_monthly_costs."""
+    return {
+        'years': np.arange(1, max_years + 1),
+        'buy_costs': np.round(series['buy_costs'], 2),
+        'rent_costs': np.round(series['rent_costs'], 2),
+        'monthly_income': np.round(series['monthly_income'], 2),
+        'buy_monthly_investments': np.round(series['buy_monthly_investments'], 2),
+        'rent_monthly_investments': np.round(series['rent_monthly_investments'], 2),
+    }
+
+
+def _yearly_growth_series(series, max_years):
+    """Round the growth series like RentVsBuyAnalysis.calculate_yearly_growth."""
+    home_equity = np.round(np.maximum(0, series['home_equity_after_sales']), 2)
+    growth_buy = np.round(series['investment_growth_buy'], 2)
+    growth_rent = np.round(series['investment_growth_rent'], 2)
+    gains_buy = np.round(np.maximum(0, series['investment_gains_buy']), 2)
+    gains_rent = np.round(np.maximum(0, series['investment_gains_rent']), 2)
+    return {
+        'years': np.arange(1, max_years + 1),
+        'home_equity_after_sales': home_equity,
+        'investment_growth': growth_rent,  # For backwards compatibility
+        'investment_growth_buy': growth_buy,
+        'investment_growth_rent': growth_rent,
+        'investment_gains_buy': gains_buy,
+        'investment_gains_rent': gains_rent,
+        'buy_total_available_cash': np.round(home_equity + growth_buy, 2),
+        'rent_total_available_cash': growth_rent,
+        'buy_wealth_gains': np.round(home_equity + gains_buy, 2),
+    }
+
+
+def results_to_json(results, decimals=2):
+    """
+    Convert batch results into JSON-ready nested lists.
+    
+    Floats are rounded to `decimals` places and NaN (past a scenario's horizon)
+    becomes None.
+    """
+    if isinstance(results, dict):
+        return {key: results_to_json(value, decimals) for key, value in results.items()}
+    
+    array = np.asarray(results)
+    if array.dtype.kind == 'f':
+        rounded = np.round(array, decimals).astype(object)
+        rounded[np.isnan(array)] = None
+        return rounded.tolist()
+    return array.tolist()
@@ -0,0 +1,286 @@
+"""
+Bulk CSV scenario runner for Rent vs Buy Analysis
+Reads scenarios from a CSV file in chunks, evaluates each chunk with the
+vectorized batch engine across a process pool, and appends results to an output
+CSV in input order. Memory stays flat however large the input is, progress is
+reported on stderr, and an interrupted run can resume from its checkpoint.
+
+Usage:
+    python batch_runner.py scenarios.csv results.csv --workers 4
+    python batch_runner.py scenarios.csv results.csv --resume
+"""
+
+import argparse
+import csv
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from functools import partial
+from itertools import islice
+
+import numpy as np
+
+from batch_engine import (DEFAULT_FIELDS, REQUIRED_FIELDS, SCENARIO_FIELDS, compare_scenarios_batch,
+                          find_invalid_scenarios, prepare_columns, INVALID_SCENARIO_ERROR)
+
+# Defaults for columns missing from the input or left blank (same as /api/analyze)
+RUNNER_DEFAULTS = dict(DEFAULT_FIELDS, annual_hoa=0.2)
+
+# Columns appended to every input row, with the compare_scenarios result each is read from
+RESULT_COLUMNS = {
+    'recommendation': ('recommendation',),
+    'financial_advantage': ('financial_advantage',),
+    'buy_net_position': ('buying', 'net_position'),
+    'rent_net_position': ('rent_net_position',),
+    'buy_net_cost': ('buy_net_cost',),
+    'rent_net_cost': ('rent_net_cost',),
+    'monthly_mortgage_payment': ('buying', 'monthly_mortgage_payment'),
+    'total_interest_paid': ('buying', 'total_interest_paid'),
+    'final_home_value': ('buying', 'final_home_value'),
+    'home_equity': ('buying', 'home_equity'),
+    'rent_investment_amount': ('renting', 'investment_amount'),
+}
+ERROR_COLUMN = 'error'
+
+# Rows per chunk handed to a worker
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def _parse_row(row, positions):
+    """Scenario values of one input row, with defaults for blank or missing columns."""
+    values = {}
+    for name in SCENARIO_FIELDS:
+        text = row[positions[name]].strip() if name in positions and positions[name] < len(row) else ''
+        if not text:
+            if name in REQUIRED_FIELDS:
+                raise ValueError(f"Missing {name}")
+            values[name] = RUNNER_DEFAULTS[name]
+            continue
+        try:
+            values[name] = float(text)
+        except ValueError:
+            raise ValueError(f"Invalid number for {name}: {text}")
+        if not math.isfinite(values[name]):
+            raise ValueError(f"Invalid number for {name}: {text}")
+    return values
+
+
+def evaluate_chunk(header, rows):
+    """
+    Evaluate one chunk of input rows.
+    
+    Runs in a worker process: rows are parsed, checked like /api/analyze, evaluated
+    together with compare_scenarios_batch and formatted.
+    
+    Args:
+        header: Input column names
+        rows: Input rows as lists of strings
+    
+    Returns:
+        Output rows (input values followed by RESULT_COLUMNS and the error column)
+    """
+    positions = {name: index for index, name in enumerate(header)}
+    errors = [None] * len(rows)
+    columns = {name: [] for name in SCENARIO_FIELDS}
+    evaluated = []
+    for index, row in enumerate(rows):
+        try:
+            values = _parse_row(row, positions)
+        except ValueError as e:
+            errors[index] = str(e)
+            continue
+        evaluated.append(index)
+        for name in SCENARIO_FIELDS:
+            columns[name].append(values[name])
+    
+    results = None
+    if evaluated:
+        count, arrays = prepare_columns(columns)
+        invalid = find_invalid_scenarios(arrays)
+        for position in invalid:
+            errors[evaluated[position]] = INVALID_SCENARIO_ERROR
+        keep = np.ones(count, dtype=bool)
+        keep[invalid] = False
+        evaluated = [index for index, kept in zip(evaluated, keep) if kept]
+        if evaluated:
+            results = compare_scenarios_batch({name: array[keep] for name, array in arrays.items()},
+                                              include_series=False)
+    
+    values = {}
+    if results is not None:
+        for column, path in RESULT_COLUMNS.items():
+            array = results
+            for key in path:
+                array = array[key]
+            values[column] = array.tolist() if array.dtype.kind == 'U' else [f"{value:.2f}" for value in array]
+    result_row = dict(zip(evaluated, range(len(evaluated))))
+    
+    output = []
+    blank = [''] * len(RESULT_COLUMNS)
+    for index, row in enumerate(rows):
+        padded = row + [''] * (len(header) - len(row))
+        position = result_row.get(index)
+        if position is None:
+            output.append(padded + blank + [errors[index] or ''])
+        else:
+            output.append(padded + [values[column][position] for column in RESULT_COLUMNS] + [''])
+    return output
+
+
+def read_chunks(reader, chunk_size):
+    """Yield lists of up to chunk_size rows from a csv.reader, reading lazily."""
+    while True:
+        chunk = list(islice(reader, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def load_checkpoint(path):
+    """Checkpoint dictionary from a previous run, or None if there is none."""
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return None
+
+
+def save_checkpoint(path, checkpoint):
+    """Write the checkpoint atomically."""
+    temporary = f"{path}.tmp"
+    with open(temporary, 'w') as handle:
+        json.dump(checkpoint, handle)
+    os.replace(temporary, path)
+
+
+def run(input_path, output_path, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, checkpoint_path=None,
+        resume=False, progress=None):
+    """
+    Evaluate every scenario in an input CSV and write the results CSV.
+    
+    At most two chunks per worker are in flight, so memory use depends on the
+    chunk size and worker count, not on the input size. After each chunk is
+    written the output is flushed and the checkpoint (rows done, output size)
+    updated; with `resume`, a run continues after the last completed chunk.
+    
+    Args:
+        input_path: CSV with a header row of scenario fields (see
+            batch_engine.SCENARIO_FIELDS); other columns are copied through
+        output_path: CSV to write
+        workers: Worker processes (default: CPU count; 1 runs in this process)
+        chunk_size: Rows per chunk
+        checkpoint_path: Checkpoint file (default: output_path + '.checkpoint')
+        resume: Continue from the checkpoint instead of starting over
+        progress: Optional callable receiving (total rows done, rows done in this run,
+            seconds elapsed) after each chunk
+    
+    Returns:
+        Dictionary with rows processed in this run, total rows done and error count
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    workers = workers or os.cpu_count() or 1
+    checkpoint_path = checkpoint_path or f"{output_path}.checkpoint"
+    checkpoint = load_checkpoint(checkpoint_path) if resume else None
+    if checkpoint is not None and checkpoint['input'] != os.path.abspath(input_path):
+        raise ValueError(f"Checkpoint {checkpoint_path} belongs to {checkpoint['input']}")
+    
+    started = time.monotonic()
+    rows_done = checkpoint['rows_done'] if checkpoint else 0
+    errors = checkpoint['errors'] if checkpoint else 0
+    processed = 0
+    pool = multiprocessing.Pool(workers) if workers > 1 else None
+    try:
+        with open(input_path, newline='') as source, \
+                open(output_path, 'r+' if checkpoint else 'w', newline='') as target:
+            reader = csv.reader(source)
+            header = next(reader, None)
+            if header is None:
+                raise ValueError(f"{input_path} is empty")
+            writer = csv.writer(target)
+            if checkpoint:
+                # Drop anything written after the last completed chunk
+                target.truncate(checkpoint['output_bytes'])
+                target.seek(checkpoint['output_bytes'])
+                for row in islice(reader, rows_done):
+                    pass
+            else:
+                writer.writerow(header + list(RESULT_COLUMNS) + [ERROR_COLUMN])
+            
+            evaluate = partial(evaluate_chunk, header)
+            pending = deque()
+            chunks = read_chunks(reader, chunk_size)
+            while True:
+                # Keep workers busy without reading further ahead than needed
+                while len(pending) < 2 * workers:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    pending.append(pool.apply_async(evaluate, (chunk,)) if pool else evaluate(chunk))
+                if not pending:
+                    break
+                
+                result = pending.popleft()
+                output = result.get() if pool else result
+                writer.writerows(output)
+                target.flush()
+                os.fsync(target.fileno())
+                processed += len(output)
+                rows_done += len(output)
+                errors += sum(1 for row in output if row[-1])
+                save_checkpoint(checkpoint_path, {
+                    'input': os.path.abspath(input_path),
+                    'rows_done': rows_done,
+                    'errors': errors,
+                    'output_bytes': target.tell(),
+                })
+                if progress:
+                    progress(rows_done, processed, time.monotonic() - started)
+    finally:
+        if pool:
+            pool.terminate()
+            pool.join()
+    return {'processed': processed, 'rows_done': rows_done, 'errors': errors}
+
+
+def print_progress(rows_done, processed, elapsed):
+    """Report progress on stderr, overwriting the line."""
+    rate = processed / elapsed if elapsed > 0 else 0
+    sys.stderr.write(f"\r{rows_done:,} rows done ({rate:,.0f} rows/s)")
+    sys.stderr.flush()
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Evaluate rent vs buy scenarios from a CSV file.")
+    parser.add_argument('input', help="input CSV with a header row of scenario fields")
+    parser.add_argument('output', help="output CSV (input columns plus results)")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="rows per chunk")
+    parser.add_argument('--checkpoint', default=None, help="checkpoint file (default: OUTPUT.checkpoint)")
+    parser.add_argument('--resume', action='store_true', help="continue an interrupted run from its checkpoint")
+    parser.add_argument('--quiet', action='store_true', help="do not report progress")
+    args = parser.parse_args(argv)
+    
+    try:
+        summary = run(args.input, args.output, workers=args.workers, chunk_size=args.chunk_size,
+                      checkpoint_path=args.checkpoint, resume=args.resume,
+                      progress=None if args.quiet else print_progress)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        print("\ninterrupted; rerun with --resume to continue", file=sys.stderr)
+        return 130
+    if not args.quiet:
+        sys.stderr.write(f"\nProcessed {summary['processed']:,} rows "
+                         f"({summary['rows_done']:,} total, {summary['errors']:,} with errors)\n")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
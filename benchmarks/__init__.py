@@ -0,0 +1,12 @@
+"""
+Benchmark suite for Rent vs Buy Analysis
+Times the engine, batch engine, tax calculator and Flask request round-trips,
+and compares the results, relative to a calibration workload, with a stored
+JSON baseline so that regressions fail and speedups can be shown.
+
+Usage:
+    python -m benchmarks                       # Run and compare with benchmarks/baseline.json
+    python -m benchmarks -k engine             # Only benchmarks whose name contains 'engine'
+    python -m benchmarks --save                # Add entries for benchmarks not in the baseline
+    python -m benchmarks --save --replace -k x # Re-record existing entries matching 'x'
+"""
@@ -0,0 +1,94 @@
+"""
+Command-line runner: python -m benchmarks [options]
+"""
+
+import argparse
+import os
+import sys
+
+import benchmarks.suite  # noqa: F401 (registers the benchmarks)
+from benchmarks.harness import (BENCHMARKS, DEFAULT_THRESHOLD, baseline_document, compare, keep_best,
+                                load_baseline, retime_regressions, run_benchmarks, save_baseline)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+def _format_seconds(seconds):
+    if seconds is None:
+        return '-'
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
+
+
+def main(argv=None):
+    """Run the benchmarks, compare with the baseline and return the exit status."""
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description="Rent vs Buy benchmarks.")
+    parser.add_argument('-k', dest='pattern', default='', help="only run benchmarks whose name contains this")
+    parser.add_argument('--list', action='store_true', help="list benchmark names and exit")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before failing, e.g. 0.25 for 25%% (default: %(default)s)")
+    parser.add_argument('--save', action='store_true',
+                        help="add baseline entries for the benchmarks the baseline does not have yet")
+    parser.add_argument('--replace', action='store_true',
+                        help="with --save, re-record existing entries too (narrow it down with -k)")
+    parser.add_argument('--output', help="also write the results to this JSON file")
+    parser.add_argument('--repeat', type=int, default=5, help="samples per benchmark")
+    parser.add_argument('--min-time', type=float, default=0.05, help="minimum seconds per sample")
+    parser.add_argument('--retries', type=int, default=2,
+                        help="extra runs: re-timing of apparent regressions, or of the whole suite with --save")
+    args = parser.parse_args(argv)
+    
+    names = [name for name in BENCHMARKS if args.pattern in name]
+    if args.list:
+        print('\n'.join(names))
+        return 0
+    if not names:
+        print(f"No benchmarks match {args.pattern!r}", file=sys.stderr)
+        return 2
+    
+    baseline = load_baseline(args.baseline)
+    if args.save and not args.replace:
+        # A change records only its own benchmarks; existing entries keep the times they were recorded with
+        stored = (baseline or {}).get('benchmarks', {})
+        names = [name for name in names if name not in stored]
+        if not names:
+            print("The baseline has every selected benchmark already; use --replace to re-record them",
+                  file=sys.stderr)
+            return 0
+    
+    results = run_benchmarks(names, args.repeat, args.min_time,
+                             report=lambda name, result: print(f"  {name:<55} {_format_seconds(result['seconds'])}",
+                                                               file=sys.stderr))
+    if args.save:
+        # A baseline should be the machine's best, not one noisy run
+        for attempt in range(args.retries):
+            results = keep_best(results, run_benchmarks(names, args.repeat, args.min_time))
+    else:
+        results = retime_regressions(results, baseline, args.threshold, args.retries, args.repeat, args.min_time)
+    rows = compare(results, baseline, args.threshold)
+    
+    print(f"{'benchmark':<55} {'time':>12} {'baseline':>12} {'ratio':>7}  status")
+    for name, seconds, base_seconds, ratio, status in rows:
+        ratio_text = f"{ratio:.2f}x" if ratio is not None else '-'
+        print(f"{name:<55} {_format_seconds(seconds):>12} {_format_seconds(base_seconds):>12} {ratio_text:>7}  {status}")
+    
+    if args.output:
+        save_baseline(args.output, baseline_document(results))
+    if args.save:
+        save_baseline(args.baseline, baseline_document(results, baseline))
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+    
+    regressions = [row[0] for row in rows if row[4] == 'regression']
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower than the baseline by more than the threshold: "
+              f"{', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
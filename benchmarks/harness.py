@@ -0,0 +1,228 @@
+"""
+Benchmark registry, timing and baseline comparison
+"""
+
+import json
+import platform
+import statistics
+import time
+import timeit
+
+import numpy as np
+
+# Benchmark name -> factory returning the zero-argument callable to time
+BENCHMARKS = {}
+
+# Allowed slowdown over the baseline before a benchmark counts as a regression
+DEFAULT_THRESHOLD = 0.5
+
+# Minimum seconds per sample of the calibration workload timed around each benchmark
+CALIBRATION_MIN_TIME = 0.02
+
+
+def benchmark(name):
+    """
+    Register a benchmark factory under `name`.
+    
+    The factory does any setup (building inputs, importing the app) and returns
+    the callable to time, so setup cost is never measured and benchmarks that are
+    filtered out are never set up.
+    """
+    def register(factory):
+        if name in BENCHMARKS:
+            raise ValueError(f"Duplicate benchmark: {name}")
+        BENCHMARKS[name] = factory
+        return factory
+    return register
+
+
+def measure(func, repeat=5, min_time=0.05):
+    """
+    Time one callable.
+    
+    The number of calls per sample is doubled until a sample takes at least
+    min_time; `repeat` samples are then taken.
+    
+    Args:
+        func: Zero-argument callable
+        repeat: Number of samples
+        min_time: Minimum seconds per sample
+    
+    Returns:
+        Dictionary with the best and median seconds per call and the calls per sample
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    samples = [seconds / number for seconds in timer.repeat(repeat, number)]
+    return {'seconds': min(samples), 'median': statistics.median(samples), 'number': number}
+
+
+def _calibration_workload():
+    # Fixed mix of interpreter and small-array numpy work, like the engine's
+    total = 0.0
+    for value in range(2000):
+        total += value * 1.0001
+    return total + float(np.cumprod(np.full(360, 1.0005)).sum())
+
+
+def calibrate(repeat=5, min_time=CALIBRATION_MIN_TIME):
+    """Best seconds per call of a fixed reference workload on this machine, right now."""
+    return measure(_calibration_workload, repeat, min_time)['seconds']
+
+
+def run_benchmarks(names, repeat=5, min_time=0.05, report=None):
+    """
+    Set up and time the named benchmarks.
+    
+    A calibration workload is timed just before and after each benchmark, and
+    the benchmark's time relative to it is what baselines compare: the ratio
+    does not depend on how fast the machine is, or on how busy it was while
+    that benchmark ran.
+    
+    Args:
+        names: Benchmark names from BENCHMARKS
+        repeat: Samples per benchmark
+        min_time: Minimum seconds per sample
+        report: Optional callable receiving (name, result) as each benchmark finishes
+    
+    Returns:
+        Dictionary of benchmark name to measure() result, plus the 'calibration'
+        seconds and the 'relative' time (seconds / calibration)
+    """
+    results = {}
+    for name in names:
+        func = BENCHMARKS[name]()
+        calibration = calibrate(repeat)
+        result = measure(func, repeat, min_time)
+        result['calibration'] = min(calibration, calibrate(repeat))
+        result['relative'] = result['seconds'] / result['calibration']
+        results[name] = result
+        if report:
+            report(name, result)
+    return results
+
+
+def retime_regressions(results, baseline, threshold=DEFAULT_THRESHOLD, retries=2, repeat=5, min_time=0.05):
+    """
+    Time apparent regressions again, keeping each benchmark's best result.
+    
+    A slowdown caused by a busy machine rarely survives a second measurement,
+    while a real one does; only benchmarks still regressed are retried.
+    
+    Returns:
+        Updated copy of results
+    """
+    for attempt in range(retries):
+        regressed = [row[0] for row in compare(results, baseline, threshold) if row[4] == 'regression']
+        if not regressed:
+            break
+        results = keep_best(results, run_benchmarks(regressed, repeat, min_time))
+    return results
+
+
+def keep_best(results, new_results):
+    """
+    Merge two runs, keeping each benchmark's faster result.
+    
+    Results are ranked by relative time when both have one, so a run that was
+    only fast because the machine was idle is not preferred.
+    
+    Returns:
+        Updated copy of results
+    """
+    results = dict(results)
+    for name, result in new_results.items():
+        previous = results.get(name)
+        if previous is None:
+            results[name] = result
+        elif 'relative' in result and 'relative' in previous:
+            if result['relative'] < previous['relative']:
+                results[name] = result
+        elif result['seconds'] < previous['seconds']:
+            results[name] = result
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare results with a baseline.
+    
+    A benchmark regresses when its best time exceeds the baseline by more than
+    `threshold` (a per-benchmark 'threshold' stored in the baseline takes
+    precedence), and is reported faster when it beats the baseline by as much.
+    
+    Times relative to the calibration workload are compared when the result
+    and the baseline entry both have one, so baselines recorded on another
+    machine or under another load still apply; the baseline seconds reported
+    are then the entry scaled to this run's calibration.
+    
+    Args:
+        results: run_benchmarks() output
+        baseline: Baseline document (see baseline_document) or None
+        threshold: Allowed relative slowdown, e.g. 0.25 for 25%
+    
+    Returns:
+        List of (name, seconds, baseline seconds or None, ratio or None, status)
+        where status is 'regression', 'faster', 'ok' or 'new'
+    """
+    stored = (baseline or {}).get('benchmarks', {})
+    rows = []
+    for name, result in results.items():
+        if name not in stored:
+            rows.append((name, result['seconds'], None, None, 'new'))
+            continue
+        allowed = stored[name].get('threshold', threshold)
+        if 'relative' in result and 'relative' in stored[name]:
+            base_seconds = stored[name]['relative'] * result['calibration']
+        else:
+            base_seconds = stored[name]['seconds']
+        ratio = result['seconds'] / base_seconds
+        if ratio > 1 + allowed:
+            status = 'regression'
+        elif ratio < 1 / (1 + allowed):
+            status = 'faster'
+        else:
+            status = 'ok'
+        rows.append((name, result['seconds'], base_seconds, ratio, status))
+    return rows
+
+
+def baseline_document(results, previous=None):
+    """
+    Baseline JSON document for results, merged into a previous baseline.
+    
+    Benchmarks that were not run keep their previous entry, and per-benchmark
+    thresholds set by hand are kept.
+    """
+    benchmarks = dict((previous or {}).get('benchmarks', {}))
+    for name, result in results.items():
+        entry = {'seconds': result['seconds'], 'median': result['median']}
+        if 'relative' in result:
+            entry['relative'] = result['relative']
+        if 'threshold' in benchmarks.get(name, {}):
+            entry['threshold'] = benchmarks[name]['threshold']
+        benchmarks[name] = entry
+    return {
+        'recorded': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': f"{platform.system()} {platform.machine()}",
+        'benchmarks': dict(sorted(benchmarks.items())),
+    }
+
+
+def load_baseline(path):
+    """Baseline document from path, or None if the file does not exist."""
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path, document):
+    """Write a baseline document as indented JSON."""
+    with open(path, 'w') as handle:
+        json.dump(document, handle, indent=2)
+        handle.write('\n')
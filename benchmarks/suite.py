@@ -0,0 +1,182 @@
+"""
+Benchmarks for the engine, batch engine, tax calculator and HTTP layer
+Importing this module registers every benchmark in harness.BENCHMARKS.
+"""
+
+import numpy as np
+
+from benchmarks.harness import benchmark
+
+# Analysis periods timed for every engine method
+HORIZONS = (1, 10, 30, 50)
+
+# Scenario counts timed for the batch engine
+BATCH_SIZES = (1, 100, 10000)
+
+# Property and scenario used throughout
+LOAN = {'purchase_price': 500000, 'down_payment': 100000, 'loan_term_years': 30, 'annual_interest_rate': 6.5}
+SCENARIO = {'monthly_rent': 2000, 'annual_hoa': 0.2, 'monthly_income': 9000}
+REQUEST_BODY = dict(LOAN, analysis_years=10, **SCENARIO)
+
+# Engine methods taking (years, **scenario), with the scenario keywords each accepts
+ENGINE_METHODS = {
+    'compare_scenarios': None,
+    'calculate_buying_costs': ('annual_hoa', 'monthly_income'),
+    'calculate_renting_costs': ('monthly_rent', 'monthly_income'),
+    'calculate_monthly_costs': None,
+    'calculate_yearly_growth': None,
+}
+
+
+def _analysis(**options):
+    from rent_vs_buy import RentVsBuyAnalysis
+    return RentVsBuyAnalysis(**LOAN, **options)
+
+
+def _register_engine(method, years, accepted):
+    kwargs = SCENARIO if accepted is None else {name: SCENARIO[name] for name in accepted}
+    
+    @benchmark(f"engine.{method}[years={years}]")
+    def factory():
+        bound = getattr(_analysis(), method)
+        return lambda: bound(years, **kwargs)
+
+
+for _method, _accepted in ENGINE_METHODS.items():
+    for _years in HORIZONS:
+        _register_engine(_method, _years, _accepted)
+
+
+@benchmark("engine.compare_scenarios[years=30,closed_form]")
+def compare_scenarios_closed_form():
+    from rent_vs_buy import ACCUMULATION_CLOSED_FORM
+    analysis = _analysis(accumulation=ACCUMULATION_CLOSED_FORM)
+    return lambda: analysis.compare_scenarios(30, **SCENARIO)
+
+
+@benchmark("engine.compare_scenarios[years=30,headline]")
+def compare_scenarios_headline():
+    analysis = _analysis()
+    return lambda: analysis.compare_scenarios(30, fields=['recommendation'], **SCENARIO)
+
+
+@benchmark("engine.calculate_horizon_summary[years=30]")
+def horizon_summary():
+    analysis = _analysis()
+    return lambda: analysis.calculate_horizon_summary(max_years=30, **SCENARIO)
+
+
+@benchmark("engine.iter_monthly_schedule[years=30]")
+def monthly_schedule():
+    analysis = _analysis()
+    return lambda: sum(1 for row in analysis.iter_monthly_schedule(30, **SCENARIO))
+
+
+def _batch_columns(size):
+    rng = np.random.default_rng(0)
+    return {
+        'purchase_price': rng.uniform(200000, 900000, size),
+        'down_payment': rng.uniform(20000, 150000, size),
+        'monthly_rent': rng.uniform(1000, 4000, size),
+        'analysis_years': rng.integers(1, 31, size),
+        'annual_interest_rate': rng.uniform(3, 8, size),
+    }
+
+
+def _register_batch(size, include_series):
+    suffix = ',series' if include_series else ''
+    
+    @benchmark(f"batch.compare_scenarios_batch[n={size}{suffix}]")
+    def factory():
+        from batch_engine import compare_scenarios_batch
+        columns = _batch_columns(size)
+        return lambda: compare_scenarios_batch(columns, include_series=include_series)
+
+
+for _size in BATCH_SIZES:
+    _register_batch(_size, False)
+_register_batch(100, True)
+
+
+def _register_tax(filing_status):
+    @benchmark(f"tax.calculate_after_tax_income[{filing_status}]")
+    def factory():
+        from tax_calculator import TaxCalculator
+        return lambda: TaxCalculator.calculate_after_tax_income(135000, 'CA', filing_status)
+
+
+for _status in ('single', 'married'):
+    _register_tax(_status)
+
+
+@benchmark("tax.calculate_after_tax_income_batch[10000]")
+def _tax_batch():
+    import numpy as np
+    from tax_calculator import TaxCalculator
+    incomes = np.linspace(20000, 500000, 10000)
+    return lambda: TaxCalculator.calculate_after_tax_income_batch(incomes, 'CA', 'married')
+
+
+@benchmark("affordability.compare_states")
+def _affordability_states():
+    from affordability import compare_states
+    return lambda: compare_states(150000, 100000)
+
+
+@benchmark("break_even.break_even_rents[500]")
+def _break_even():
+    import numpy as np
+    from break_even import break_even_rents
+    prices = np.linspace(200000, 1500000, 500)
+    columns = {'purchase_price': prices, 'down_payment': prices * 0.2, 'analysis_years': 10}
+    return lambda: break_even_rents(columns)
+
+
+@benchmark("financing_optimizer.optimize_financing")
+def _optimize_financing():
+    from financing_optimizer import optimize_financing
+    params = {'purchase_price': 500000, 'monthly_rent': 2000, 'analysis_years': 10}
+    return lambda: optimize_financing(params, 200000)
+
+
+def _client():
+    from app import app
+    return app.test_client()
+
+
+@benchmark("http.post_analyze[cache_miss]")
+def http_analyze_miss():
+    from app import analysis_cache
+    client = _client()
+    
+    def request():
+        analysis_cache.clear()
+        client.post('/api/analyze', json=REQUEST_BODY)
+    return request
+
+
+@benchmark("http.post_analyze[cache_hit]")
+def http_analyze_hit():
+    client = _client()
+    client.post('/api/analyze', json=REQUEST_BODY)
+    return lambda: client.post('/api/analyze', json=REQUEST_BODY)
+
+
+@benchmark("http.post_analyze_batch[n=100]")
+def http_analyze_batch():
+    client = _client()
+    body = {'scenarios': {name: values.tolist() for name, values in _batch_columns(100).items()}}
+    return lambda: client.post('/api/analyze/batch', json=body)
+
+
+@benchmark("http.post_affordability")
+def http_affordability():
+    client = _client()
+    body = {'gross_annual_income': 135000, 'state_code': 'CA', 'filing_status': 'single'}
+    return lambda: client.post('/api/affordability', json=body)
+
+
+@benchmark("http.get_index")
+def http_index():
+    client = _client()
+    return lambda: client.get('/', headers={'Accept-Encoding': 'gzip'})
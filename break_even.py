@@ -0,0 +1,132 @@
+"""
+Break-even rent solver for Rent vs Buy Analysis
+Finds, for many properties at once, the monthly rent at which renting and
+buying end the analysis period with the same net position (financial
+advantage of zero), using a bracketed Newton iteration over the whole batch.
+"""
+
+import numpy as np
+
+from batch_engine import compare_scenarios_batch, prepare_columns, year_accumulation_factors
+
+# Stop once |financial advantage| is below this many dollars
+DEFAULT_TOLERANCE = 0.005
+
+# Newton or bisection steps before giving up on a scenario
+MAX_ITERATIONS = 100
+
+
+class RentSide:
+    """
+    Renting net position as a function of the starting monthly rent.
+    
+    Everything that does not depend on rent (income, growth and accumulation
+    factors) is precomputed as (years, scenarios) arrays, so each evaluation is a
+    handful of array operations. Mirrors simulate_batch: rent grows yearly, the
+    leftover income max(0, income - rent) is invested at the closed-form yearly
+    accumulation factors, and the down payment compounds from the start.
+    
+    Attributes:
+        rent_growth: Rent in each year per dollar of starting rent (0 past the horizon)
+        income: Monthly income in each year
+        weight: Final value of a dollar of monthly leftover income in each year
+            (investment share times accumulation to the horizon, 0 past it)
+        start: Final value of the invested down payment
+        rent_years: Total months of rent paid per dollar of starting rent
+    """
+    
+    __slots__ = ('rent_growth', 'income', 'weight', 'start', 'rent_years')
+    
+    def __init__(self, arrays):
+        years = arrays['analysis_years']
+        year_index = np.arange(int(years.max()) if len(years) else 0)[:, None]
+        active = year_index < years
+        growth_per_year, annuity_per_year = year_accumulation_factors(arrays['annual_market_return'] / 100 / 12)
+        self.rent_growth = np.where(active, (1 + arrays['annual_rent_increase_rate'] / 100) ** year_index, 0.0)
+        self.income = arrays['monthly_income'] * (1 + arrays['annual_inflation_rate'] / 100) ** year_index
+        self.weight = np.where(active, (arrays['monthly_investment_percentage'] / 100) * annuity_per_year
+                               * growth_per_year ** np.maximum(years - 1 - year_index, 0), 0.0)
+        self.start = arrays['down_payment'] * growth_per_year ** years
+        self.rent_years = 12 * self.rent_growth.sum(axis=0)
+    
+    def net_position(self, rent, columns=slice(None)):
+        """Renting net position and its derivative with respect to starting rent."""
+        rent_growth = self.rent_growth[:, columns]
+        leftover = self.income[:, columns] - rent * rent_growth
+        investing = leftover > 0
+        weight = self.weight[:, columns]
+        position = (self.start[columns] + (weight * np.where(investing, leftover, 0.0)).sum(axis=0)
+                    - rent * self.rent_years[columns])
+        slope = -(weight * rent_growth * investing).sum(axis=0) - self.rent_years[columns]
+        return position, slope
+
+
+def break_even_rents(columns, defaults=None, tolerance=DEFAULT_TOLERANCE, max_iterations=MAX_ITERATIONS):
+    """
+    Starting monthly rent at which financial_advantage is zero, for many scenarios.
+    
+    The buying net position does not depend on rent, and the renting net
+    position falls with rent, convexly and piecewise linearly (leftover income
+    stops being invested once rent exceeds it), so financial advantage rises
+    with rent and has a single root. Starting from zero rent, where buying is
+    behind, Newton steps approach that root from below and land exactly on it
+    within a linear piece; the root is also bracketed by zero and the rent that
+    would close the gap at the minimum slope, and steps leaving the bracket
+    fall back to bisection.
+    
+    Args:
+        columns: Scenario inputs as for compare_scenarios_batch (monthly_rent is
+            not needed and ignored)
+        defaults: Optional overrides for batch_engine.DEFAULT_FIELDS
+        tolerance: Dollars of financial advantage accepted as zero
+        max_iterations: Iteration limit
+    
+    Returns:
+        Dictionary of arrays: break_even_monthly_rent (NaN when buying wins even at
+        zero rent), financial_advantage (compare_scenarios_batch at that rent),
+        buy_net_position, iterations and converged
+    """
+    columns = dict(columns, monthly_rent=1.0)
+    count, arrays = prepare_columns(columns, defaults)
+    buy_net_position = compare_scenarios_batch(arrays, include_series=False)['buying']['net_position']
+    rent_side = RentSide(arrays)
+    
+    zero_position, zero_slope = rent_side.net_position(0.0)
+    advantage_at_zero = buy_net_position - zero_position
+    solvable = advantage_at_zero < 0
+    # Advantage rises at least as fast as rent payments, which bounds the root
+    low = np.zeros(count)
+    high = np.where(solvable, -advantage_at_zero / np.maximum(rent_side.rent_years, 1e-12), 0.0)
+    rent = low.copy()
+    advantage = advantage_at_zero.copy()
+    slope = -zero_slope
+    iterations = np.zeros(count, dtype=np.int64)
+    pending = np.flatnonzero(solvable & (np.abs(advantage) > tolerance))
+    
+    for _ in range(max_iterations):
+        if not len(pending):
+            break
+        step = rent[pending] - advantage[pending] / slope[pending]
+        outside = ~((step > low[pending]) & (step <= high[pending]))
+        step = np.where(outside, (low[pending] + high[pending]) / 2, step)
+        position, position_slope = rent_side.net_position(step, pending)
+        rent[pending] = step
+        advantage[pending] = buy_net_position[pending] - position
+        slope[pending] = -position_slope
+        iterations[pending] += 1
+        below = advantage[pending] < 0
+        low[pending] = np.where(below, step, low[pending])
+        high[pending] = np.where(below, high[pending], step)
+        done = (np.abs(advantage[pending]) <= tolerance) | (high[pending] - low[pending] <= 1e-9 * high[pending])
+        pending = pending[~done]
+    
+    rent = np.where(solvable, rent, np.nan)
+    check = dict(arrays, monthly_rent=np.where(solvable, rent, 0.0))
+    return {
+        'break_even_monthly_rent': rent,
+        'financial_advantage': np.where(
+            solvable, compare_scenarios_batch(check, include_series=False)['financial_advantage'], np.nan),
+        'buy_net_position': buy_net_position,
+        'iterations': iterations,
+        'converged': solvable & (np.abs(advantage) <= tolerance),
+    }
@@ -0,0 +1,241 @@
+"""
+Compact columnar response formats for Rent vs Buy Analysis
+Flattens nested results into named scalars and columns, stores identical
+columns once, and encodes them either as columnar JSON or as a binary layout of
+packed little-endian float64 arrays behind a small JSON header.
+"""
+
+import json
+import struct
+
+import numpy as np
+
+JSON_MIMETYPE = 'application/json'
+COLUMNAR_JSON_MIMETYPE = 'application/vnd.rentvsbuy.columnar+json'
+COLUMNAR_BINARY_MIMETYPE = 'application/vnd.rentvsbuy.columnar'
+
+# Response format names accepted by ?format=, with their content types
+FORMATS = {
+    'json': JSON_MIMETYPE,
+    'columnar': COLUMNAR_JSON_MIMETYPE,
+    'binary': COLUMNAR_BINARY_MIMETYPE,
+}
+
+# Binary layout: magic, version, 3 padding bytes, header length (uint32 LE),
+# UTF-8 JSON header, space padding to 8 bytes, then float64 LE column data
+BINARY_MAGIC = b'RVBC'
+BINARY_VERSION = 1
+BINARY_PREFIX = struct.Struct('<4sB3xI')
+
+
+def negotiate_format(format_name=None, accept_mimetypes=None):
+    """
+    Choose a response format from a ?format= value or the Accept header.
+    
+    Args:
+        format_name: Explicit format from FORMATS (takes precedence)
+        accept_mimetypes: werkzeug MIMEAccept of the request, if any
+    
+    Returns:
+        Key of FORMATS ('json' unless a compact format is asked for)
+    """
+    if format_name:
+        if format_name not in FORMATS:
+            raise ValueError(f"Unknown format: {format_name} (expected one of {', '.join(FORMATS)})")
+        return format_name
+    if accept_mimetypes is not None:
+        best = accept_mimetypes.best_match(list(FORMATS.values()), default=JSON_MIMETYPE)
+        for name, mimetype in FORMATS.items():
+            if mimetype == best:
+                return name
+    return 'json'
+
+
+def parse_omit(value):
+    """Split a comma-separated ?omit= value into dotted names."""
+    return tuple(name.strip() for name in (value or '').split(',') if name.strip())
+
+
+def _omitted(name, omit):
+    return any(name == prefix or name.startswith(prefix + '.') for prefix in omit)
+
+
+def omit_fields(results, omit, prefix=''):
+    """
+    Copy nested results without the dotted names (or whole sections) in `omit`.
+    
+    Leaf names also match on their own, so 'investment_growth' drops
+    'yearly_growth.investment_growth'.
+    """
+    if not omit:
+        return results
+    kept = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if _omitted(name, omit) or key in omit:
+            continue
+        kept[key] = omit_fields(value, omit, name + '.') if isinstance(value, dict) else value
+    return kept
+
+
+def flatten_results(results, omit=(), prefix=''):
+    """
+    Split nested results into scalars and columns keyed by dotted name.
+    
+    Lists and arrays become NumPy columns (None becomes NaN in a float64 column);
+    everything else is a scalar.
+    
+    Returns:
+        Tuple of (scalars, columns) dictionaries
+    """
+    scalars = {}
+    columns = {}
+    for key, value in omit_fields(results, omit).items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            nested_scalars, nested_columns = flatten_results(value, prefix=name + '.')
+            scalars.update(nested_scalars)
+            columns.update(nested_columns)
+        elif isinstance(value, (list, tuple, np.ndarray)):
+            array = np.asarray(value)
+            if array.dtype == object:
+                array = np.array([np.nan if item is None else item for item in array.ravel()],
+                                 dtype=np.float64).reshape(array.shape)
+            elif array.dtype.kind == 'b':
+                array = array.astype(np.int64)
+            columns[name] = array
+        elif isinstance(value, np.generic):
+            scalars[name] = value.item()
+        else:
+            scalars[name] = value
+    return scalars, columns
+
+
+def deduplicate(columns):
+    """
+    Store identical columns once.
+    
+    Returns:
+        Tuple of (unique columns, aliases mapping each dropped name to the kept one)
+    """
+    unique = {}
+    aliases = {}
+    for name, array in columns.items():
+        for kept_name, kept in unique.items():
+            if kept.shape == array.shape and kept.dtype == array.dtype and (
+                    np.array_equal(kept, array, equal_nan=True) if array.dtype.kind == 'f'
+                    else np.array_equal(kept, array)):
+                aliases[name] = kept_name
+                break
+        else:
+            unique[name] = array
+    return unique, aliases
+
+
+def _json_scalar(value, decimals):
+    if isinstance(value, float):
+        return None if value != value else round(value, decimals)
+    return value
+
+
+def encode_columnar_json(results, omit=(), decimals=2, extra=None):
+    """
+    Columnar JSON document for nested results.
+    
+    Numeric columns are rounded with NumPy; NaN becomes null.
+    
+    Args:
+        results: Nested results (lists or NumPy arrays as columns)
+        omit: Dotted names or sections to leave out
+        decimals: Decimal places for floats
+        extra: Top-level keys to add (e.g. success, count)
+    
+    Returns:
+        Dictionary with format, scalars, columns and aliases
+    """
+    scalars, columns = flatten_results(results, omit)
+    columns, aliases = deduplicate(columns)
+    encoded = {}
+    for name, array in columns.items():
+        if array.dtype.kind == 'f':
+            rounded = np.round(array, decimals)
+            if np.isnan(rounded).any():
+                rounded = rounded.astype(object)
+                rounded[np.isnan(array)] = None
+            encoded[name] = rounded.tolist()
+        else:
+            encoded[name] = array.tolist()
+    document = dict(extra or {})
+    document.update({
+        'format': 'columnar',
+        'scalars': {name: _json_scalar(value, decimals) for name, value in scalars.items()},
+        'columns': encoded,
+        'aliases': aliases,
+    })
+    return document
+
+
+def encode_columnar_binary(results, omit=(), extra=None):
+    """
+    Binary columnar encoding of nested results.
+    
+    Numeric columns are packed as little-endian float64 (NaN kept) after a JSON
+    header listing scalars, aliases, text columns, and each packed column's
+    name, shape and byte offset.
+    
+    Returns:
+        Bytes in the BINARY_MAGIC layout
+    """
+    scalars, columns = flatten_results(results, omit)
+    columns, aliases = deduplicate(columns)
+    packed = []
+    text_columns = {}
+    layout = []
+    offset = 0
+    for name, array in columns.items():
+        if array.dtype.kind not in 'iuf':
+            text_columns[name] = array.tolist()
+            continue
+        data = np.ascontiguousarray(array, dtype='<f8').tobytes()
+        layout.append({'name': name, 'shape': list(array.shape), 'offset': offset})
+        packed.append(data)
+        offset += len(data)
+    
+    header = dict(extra or {})
+    header.update({
+        'scalars': {name: (None if isinstance(value, float) and value != value else value)
+                    for name, value in scalars.items()},
+        'columns': layout,
+        'text_columns': text_columns,
+        'aliases': aliases,
+    })
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    padding = -(BINARY_PREFIX.size + len(header_bytes)) % 8
+    return b''.join([BINARY_PREFIX.pack(BINARY_MAGIC, BINARY_VERSION, len(header_bytes)),
+                     header_bytes, b' ' * padding] + packed)
+
+
+def decode_columnar_binary(data):
+    """
+    Decode encode_columnar_binary output.
+    
+    Returns:
+        Tuple of (header, columns) where columns maps every name (aliases
+        included) to a NumPy array
+    """
+    magic, version, header_length = BINARY_PREFIX.unpack_from(data)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION:
+        raise ValueError("Not a version 1 columnar payload")
+    start = BINARY_PREFIX.size
+    header = json.loads(data[start:start + header_length])
+    data_start = start + header_length + (-(start + header_length) % 8)
+    columns = {}
+    for column in header['columns']:
+        count = int(np.prod(column['shape'], dtype=np.int64))
+        columns[column['name']] = np.frombuffer(
+            data, dtype='<f8', count=count, offset=data_start + column['offset']).reshape(column['shape'])
+    for name, values in header['text_columns'].items():
+        columns[name] = np.asarray(values)
+    for name, kept in header['aliases'].items():
+        columns[name] = columns[kept]
+    return header, columns
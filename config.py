@@ -2,10 +2,33 @@
 Configuration file for Rent vs Buy Analysis Tool
 """
 
+import os
+
 # Application Settings
 DEBUG = True
 PORT = 5000
 
+# Result cache for /api/analyze
+RESULT_CACHE_SIZE = 1024  # Maximum cached responses per process
+RESULT_CACHE_TTL_SECONDS = None  # None keeps entries until evicted
+
+# Incremental analysis sessions (/api/session), kept per process (other workers rebuild them from the id)
+SESSION_CACHE_SIZE = 256  # Maximum open sessions per process
+SESSION_TTL_SECONDS = 1800  # Idle sessions expire after 30 minutes
+
+# Request timing logs ('rent_vs_buy.timing' logger, DEBUG level)
+TIMING_LOG_SAMPLE_RATE = 0.01  # Fraction of requests logged when the logger is enabled
+
+# Prometheus /metrics
+# Set METRICS_DIR to a directory shared by all gunicorn workers (cleared before
+# the server starts) so /metrics sums every worker; unset keeps per-process metrics.
+METRICS_DIR = os.environ.get('METRICS_DIR')
+METRICS_FLUSH_INTERVAL = 1.0  # Minimum seconds between a worker's snapshot writes (0 writes after every request)
+
+# Main page served from memory
+STATIC_CACHE_CONTROL = 'public, no-cache'  # Browsers revalidate with If-None-Match and get 304
+STATIC_RELOAD_INTERVAL = 1.0 if os.environ.get('FLASK_ENV') == 'development' else None  # Seconds between change checks
+
 # Default Values
 DEFAULT_ANALYSIS_PERIOD = 10
 DEFAULT_LOAN_TERM = 30
@@ -0,0 +1,186 @@
+"""
+Down payment and loan term optimizer for Rent vs Buy Analysis
+Searches the down payment and loan term that leave a buyer with the most wealth
+at the end of the analysis period: a coarse grid evaluated as one batch of the
+vectorized engine, then a bounded golden-section search around the best grid
+point of every loan term, all terms refined together.
+"""
+
+import math
+
+import numpy as np
+
+from batch_engine import MAX_ANALYSIS_YEARS, SCENARIO_FIELDS, compare_scenarios_batch
+
+# Loan terms compared when the caller does not choose
+DEFAULT_LOAN_TERMS = (15, 20, 30)
+
+# Down payments per loan term in the coarse grid
+DEFAULT_GRID_POINTS = 21
+
+# Smallest down payment considered, as % of the purchase price
+DEFAULT_MIN_DOWN_PAYMENT_PERCENT = 3.0
+
+# Refinement stops once the bracket is narrower than this many dollars
+DEFAULT_TOLERANCE = 1.0
+
+# Golden-section steps before the refinement stops regardless
+MAX_REFINE_ITERATIONS = 100
+
+# Fraction of the bracket between its ends and the golden-section points
+GOLDEN_FRACTION = (3 - 5 ** 0.5) / 2
+
+
+def end_of_horizon_wealth(params, available_cash, down_payments, loan_terms):
+    """
+    Buyer wealth at the end of the analysis period for several financing choices.
+    
+    Wealth is the calculate_buying_costs net position (home equity plus invested
+    budget, less the costs paid), with closing costs paid from the available
+    cash and the cash left after the down payment and closing costs invested at
+    the market return for the whole period.
+    
+    Args:
+        params: Scenario as a mapping of batch_engine.SCENARIO_FIELDS
+            (down_payment and loan_term_years are replaced)
+        available_cash: Cash for the down payment and closing costs
+        down_payments: Array of down payments
+        loan_terms: Array of loan terms in years, one per down payment
+    
+    Returns:
+        Tuple of (wealth, compare_scenarios_batch buying section) arrays
+    """
+    columns = {name: params[name] for name in SCENARIO_FIELDS if name in params}
+    columns.setdefault('monthly_rent', 1.0)  # The buying side does not depend on rent
+    columns['down_payment'] = np.asarray(down_payments, dtype=np.float64)
+    columns['loan_term_years'] = np.asarray(loan_terms)
+    buying = compare_scenarios_batch(columns, include_series=False)['buying']
+    
+    months = 12 * columns.get('analysis_years', 10)
+    growth = (1 + columns.get('annual_market_return', 7.0) / 100 / 12) ** months
+    closing_costs = buying['closing_costs']
+    leftover_cash = available_cash - columns['down_payment'] - closing_costs
+    return buying['net_position'] + closing_costs + leftover_cash * growth, buying
+
+
+def optimize_financing(params, available_cash, loan_terms=DEFAULT_LOAN_TERMS, grid_points=DEFAULT_GRID_POINTS,
+                       min_down_payment_percent=DEFAULT_MIN_DOWN_PAYMENT_PERCENT, tolerance=DEFAULT_TOLERANCE):
+    """
+    Down payment and loan term that maximize end-of-horizon wealth.
+    
+    Every (loan term, down payment) pair of a grid is evaluated in one batch;
+    for each term the best grid cell and its neighbours then bound a
+    golden-section search, run for all terms at once with one batch call per
+    step.
+    
+    Args:
+        params: Scenario as a mapping of batch_engine.SCENARIO_FIELDS
+            (down_payment and loan_term_years are searched)
+        available_cash: Cash for the down payment and closing costs
+        loan_terms: Loan terms in years to compare
+        grid_points: Down payments per term in the coarse grid (at least 2)
+        min_down_payment_percent: Smallest down payment as % of the purchase price
+        tolerance: Down payment precision in dollars
+    
+    Returns:
+        Dictionary with the best down_payment, loan_term_years, wealth,
+        monthly_mortgage_payment and leftover_cash, a 'terms' table with the
+        best down payment and wealth for each loan term, and the number of
+        scenarios evaluated
+    
+    Raises:
+        ValueError: If no down payment fits the available cash or an input is out of range
+    """
+    available_cash = float(available_cash)
+    min_down_payment_percent = float(min_down_payment_percent)
+    inputs = {name: float(params[name]) for name in SCENARIO_FIELDS if name in params}
+    inputs.update(available_cash=available_cash, min_down_payment_percent=min_down_payment_percent)
+    not_finite = [name for name, value in inputs.items() if not math.isfinite(value)]
+    if not_finite:
+        raise ValueError(f"Inputs must be finite: {', '.join(sorted(not_finite))}")
+    
+    purchase_price = inputs['purchase_price']
+    if purchase_price <= 0:
+        raise ValueError("purchase_price must be positive")
+    if not 1 <= inputs.get('analysis_years', 10) <= MAX_ANALYSIS_YEARS:
+        raise ValueError(f"analysis_years must be between 1 and {MAX_ANALYSIS_YEARS}")
+    if inputs.get('annual_interest_rate', 0) < 0:
+        raise ValueError("annual_interest_rate cannot be negative")
+    if inputs.get('monthly_income', 0) < 0:
+        raise ValueError("monthly_income cannot be negative")
+    if not 0 <= min_down_payment_percent <= 100:
+        raise ValueError("min_down_payment_percent must be between 0 and 100")
+    loan_terms = np.asarray(sorted({int(term) for term in loan_terms}), dtype=np.int64)
+    if not len(loan_terms) or loan_terms[0] < 1 or loan_terms[-1] > MAX_ANALYSIS_YEARS:
+        raise ValueError(f"loan_terms must hold terms between 1 and {MAX_ANALYSIS_YEARS} years")
+    if grid_points < 2:
+        raise ValueError("grid_points must be at least 2")
+    
+    closing_costs = purchase_price * params.get('closing_costs_percent', 3) / 100
+    lowest = max(purchase_price * min_down_payment_percent / 100, 0.01)
+    highest = min(float(available_cash) - closing_costs, purchase_price)
+    if highest < lowest:
+        raise ValueError(f"available_cash must cover a {min_down_payment_percent:g}% down payment "
+                         f"plus closing costs ({lowest + closing_costs:.2f})")
+    
+    def wealth(down_payments, terms):
+        return end_of_horizon_wealth(params, available_cash, down_payments, terms)[0]
+    
+    # Coarse grid: (terms, grid points) in one batch
+    grid = np.linspace(lowest, highest, grid_points)
+    grid_wealth = wealth(np.tile(grid, len(loan_terms)), np.repeat(loan_terms, grid_points))
+    grid_wealth = grid_wealth.reshape(len(loan_terms), grid_points)
+    evaluations = grid_wealth.size
+    
+    # Bracket each term's best grid point by its neighbours
+    best = np.argmax(grid_wealth, axis=1)
+    low = grid[np.maximum(best - 1, 0)]
+    high = grid[np.minimum(best + 1, grid_points - 1)]
+    left = low + GOLDEN_FRACTION * (high - low)
+    right = high - GOLDEN_FRACTION * (high - low)
+    left_wealth = wealth(left, loan_terms)
+    right_wealth = wealth(right, loan_terms)
+    evaluations += 2 * len(loan_terms)
+    for _ in range(MAX_REFINE_ITERATIONS):
+        if np.all(high - low <= tolerance):
+            break
+        # Keep the side of the better point; the other interior point carries over
+        keep_left = left_wealth >= right_wealth
+        high = np.where(keep_left, right, high)
+        low = np.where(keep_left, low, left)
+        carried = np.where(keep_left, left, right)
+        carried_wealth = np.where(keep_left, left_wealth, right_wealth)
+        probe = np.where(keep_left, low + GOLDEN_FRACTION * (high - low), high - GOLDEN_FRACTION * (high - low))
+        probe_wealth = wealth(probe, loan_terms)
+        evaluations += len(loan_terms)
+        left = np.where(keep_left, probe, carried)
+        left_wealth = np.where(keep_left, probe_wealth, carried_wealth)
+        right = np.where(keep_left, carried, probe)
+        right_wealth = np.where(keep_left, carried_wealth, probe_wealth)
+    
+    # Best of the refined bracket ends, interior points and the grid itself
+    candidates = np.stack([low, high, left, right, grid[best]])
+    candidate_wealth = wealth(candidates.ravel(), np.tile(loan_terms, len(candidates))).reshape(candidates.shape)
+    evaluations += candidates.size
+    pick = np.argmax(candidate_wealth, axis=0)
+    columns = np.arange(len(loan_terms))
+    term_down_payment = candidates[pick, columns]
+    term_wealth = candidate_wealth[pick, columns]
+    
+    choice = int(np.argmax(term_wealth))
+    down_payment = float(term_down_payment[choice])
+    final_wealth, buying = end_of_horizon_wealth(
+        params, available_cash, [down_payment], [loan_terms[choice]])
+    return {
+        'down_payment': down_payment,
+        'loan_term_years': int(loan_terms[choice]),
+        'wealth': float(final_wealth[0]),
+        'monthly_mortgage_payment': float(buying['monthly_mortgage_payment'][0]),
+        'leftover_cash': available_cash - down_payment - closing_costs,
+        'terms': {
+            'loan_term_years': loan_terms,
+            'down_payment': term_down_payment,
+            'wealth': term_wealth,
+        },
+        'evaluations': evaluations,
+    }
@@ -0,0 +1,134 @@
+"""
+Shared growth-factor and amortization tables for Rent vs Buy Analysis
+Powers of (1 + rate) are computed once per (rate, horizon) or (rate, term) and
+reused by every analysis through a bounded cache, instead of being recomputed
+on every call.
+"""
+
+from functools import lru_cache
+
+# Distinct tables kept per process
+TABLE_CACHE_SIZE = 256
+
+# Longest table stored, in periods (100 years of monthly payments). Longer loans
+# use the closed forms and longer growth horizons are built per call, uncached,
+# so one request cannot pin an oversized table in the cache.
+MAX_TABLE_PERIODS = 1200
+
+
+class GrowthTable:
+    """
+    Cumulative growth factors (1 + rate) ** k for k = 0 .. horizon.
+    
+    Attributes:
+        rate: Growth rate per period as a decimal
+        horizon: Number of periods covered
+        factors: Tuple of horizon + 1 cumulative factors, factors[0] == 1.0
+    """
+    
+    __slots__ = ('rate', 'horizon', 'factors')
+    
+    def __init__(self, rate, horizon):
+        horizon = int(horizon)
+        self.rate = rate
+        self.horizon = horizon
+        self.factors = tuple((1 + rate) ** k for k in range(horizon + 1))
+
+
+class AmortizationTable:
+    """
+    Payment and remaining-balance curve of a level-payment loan of one unit of principal.
+    
+    Scale by the loan amount to get dollars; the table itself only depends on the
+    monthly interest rate and the number of payments, so loans of any size share it.
+    
+    Attributes:
+        monthly_rate: Monthly interest rate as a decimal
+        num_payments: Number of monthly payments
+        payment_factor: Monthly payment per unit of principal
+        balance_fractions: Tuple of num_payments + 1 remaining balances per unit of
+            principal, indexed by months paid (None above MAX_TABLE_PERIODS
+            payments, where remaining_fraction uses the closed form)
+    """
+    
+    __slots__ = ('monthly_rate', 'num_payments', 'payment_factor', 'balance_fractions')
+    
+    def __init__(self, monthly_rate, num_payments):
+        num_payments = int(num_payments)
+        self.monthly_rate = monthly_rate
+        self.num_payments = num_payments
+        if num_payments > MAX_TABLE_PERIODS:
+            # (1 + r) ** -n does not overflow however long the loan
+            self.payment_factor = 1 / num_payments if monthly_rate == 0 else (
+                monthly_rate / (1 - (1 + monthly_rate) ** -num_payments))
+            self.balance_fractions = None
+        elif monthly_rate == 0:
+            self.payment_factor = 1 / num_payments
+            self.balance_fractions = tuple((num_payments - k) / num_payments for k in range(num_payments + 1))
+        else:
+            # Balance after k payments is (G_n - G_k) / (G_n - 1) with G_k = (1 + r) ** k
+            powers = growth_table(monthly_rate, num_payments).factors
+            total = powers[-1]
+            self.payment_factor = monthly_rate * total / (total - 1)
+            self.balance_fractions = tuple((total - power) / (total - 1) for power in powers)
+    
+    def remaining_fraction(self, months_paid):
+        """
+        Remaining balance per unit of principal after months_paid payments.
+        
+        Whole months are looked up; fractional months and loans without a stored
+        table use the same closed form.
+        """
+        if months_paid >= self.num_payments:
+            return 0.0
+        if self.balance_fractions is not None and float(months_paid).is_integer():
+            return self.balance_fractions[int(months_paid)]
+        if self.monthly_rate == 0:
+            return (self.num_payments - months_paid) / self.num_payments
+        # (G_n - G_k) / (G_n - 1) divided through by G_n
+        growth = 1 + self.monthly_rate
+        return (1 - growth ** (months_paid - self.num_payments)) / (1 - growth ** -self.num_payments)
+
+
+def growth_table(rate, horizon):
+    """
+    Shared GrowthTable for a growth rate and horizon.
+    
+    Args:
+        rate: Growth rate per period as a decimal
+        horizon: Number of periods
+    
+    Returns:
+        Cached GrowthTable instance (a new, uncached one above MAX_TABLE_PERIODS)
+    """
+    if horizon > MAX_TABLE_PERIODS:
+        return GrowthTable(rate, horizon)
+    return _cached_growth_table(rate, horizon)
+
+
+@lru_cache(maxsize=TABLE_CACHE_SIZE)
+def _cached_growth_table(rate, horizon):
+    return GrowthTable(rate, horizon)
+
+
+@lru_cache(maxsize=TABLE_CACHE_SIZE)
+def amortization_table(monthly_rate, num_payments):
+    """
+    Shared AmortizationTable for a monthly interest rate and number of payments.
+    
+    Args:
+        monthly_rate: Monthly interest rate as a decimal
+        num_payments: Number of monthly payments
+    
+    Returns:
+        Cached AmortizationTable instance
+    """
+    return AmortizationTable(monthly_rate, num_payments)
+
+
+def table_cache_info():
+    """Hit/miss statistics of the shared table caches."""
+    return {
+        'growth': _cached_growth_table.cache_info()._asdict(),
+        'amortization': amortization_table.cache_info()._asdict(),
+    }
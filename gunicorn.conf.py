@@ -0,0 +1,35 @@
+"""
+gunicorn settings for Rent vs Buy Analysis
+Loaded automatically by `gunicorn app:app` from the working directory. With
+METRICS_DIR set, the server clears stale metric snapshots when it starts, each
+worker writes its last snapshot when it exits, and the server folds an exited
+worker's snapshot into the merged file so /metrics keeps its counts.
+"""
+
+import os
+import sys
+
+# gunicorn loads this file by path; make the app's modules importable from it
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import config
+import metrics
+
+
+def on_starting(server):
+    """Remove snapshots left by a previous server."""
+    if config.METRICS_DIR:
+        metrics.clear_directory(config.METRICS_DIR)
+
+
+def worker_exit(server, worker):
+    """Write the exiting worker's remaining updates."""
+    app_module = sys.modules.get('app')
+    if app_module is not None:
+        app_module.metrics.close()
+
+
+def child_exit(server, worker):
+    """Fold an exited worker's snapshot into the merged file."""
+    if config.METRICS_DIR:
+        metrics.merge_exited_process(config.METRICS_DIR, worker.pid)
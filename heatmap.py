@@ -0,0 +1,79 @@
+"""
+Buy vs rent heatmap for Rent vs Buy Analysis
+Evaluates financial advantage over a grid of two inputs (for example purchase
+price and monthly rent) in bounded-memory chunks of the vectorized batch engine.
+"""
+
+import numpy as np
+
+from batch_engine import SCENARIO_FIELDS, compare_scenarios_batch, prepare_columns, find_invalid_scenarios
+
+# Grid cells evaluated per batch call
+DEFAULT_CHUNK_SIZE = 20000
+
+# Largest number of steps along either axis
+MAX_GRID_STEPS = 500
+
+
+def grid_axis(start, stop, steps):
+    """Evenly spaced values from start to stop (inclusive)."""
+    steps = int(steps)
+    if not 1 <= steps <= MAX_GRID_STEPS:
+        raise ValueError(f"steps must be between 1 and {MAX_GRID_STEPS}")
+    return np.linspace(float(start), float(stop), steps)
+
+
+def evaluate_grid(params, x_field, x_values, y_field, y_values, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Evaluate financial advantage for every combination of two inputs.
+    
+    Args:
+        params: Base scenario as a mapping of batch_engine.SCENARIO_FIELDS
+        x_field: Input varied along the columns
+        x_values: Values for x_field
+        y_field: Input varied along the rows
+        y_values: Values for y_field
+        chunk_size: Grid cells evaluated per batch call
+    
+    Returns:
+        Dictionary with the axes and (rows, columns) arrays of financial
+        advantage (NaN for invalid cells) and recommendation ('' for invalid cells)
+    """
+    for field in (x_field, y_field):
+        if field not in SCENARIO_FIELDS:
+            raise ValueError(f"Unknown grid input: {field}")
+    if x_field == y_field:
+        raise ValueError("Grid inputs must be different")
+    
+    x_values = np.asarray(x_values, dtype=np.float64)
+    y_values = np.asarray(y_values, dtype=np.float64)
+    cells = len(x_values) * len(y_values)
+    advantage = np.full(cells, np.nan)
+    recommendation = np.full(cells, '', dtype='<U4')
+    
+    for start in range(0, cells, chunk_size):
+        index = np.arange(start, min(start + chunk_size, cells))
+        columns = dict(params)
+        columns[x_field] = x_values[index % len(x_values)]
+        columns[y_field] = y_values[index // len(x_values)]
+        
+        count, arrays = prepare_columns(columns)
+        valid = np.ones(count, dtype=bool)
+        valid[find_invalid_scenarios(arrays)] = False
+        if not valid.any():
+            continue
+        # Only valid cells are evaluated, so out-of-range ones cost nothing
+        results = compare_scenarios_batch({name: array[valid] for name, array in arrays.items()},
+                                          include_series=False)
+        advantage[index[valid]] = results['financial_advantage']
+        recommendation[index[valid]] = results['recommendation']
+    
+    shape = (len(y_values), len(x_values))
+    return {
+        'x_field': x_field,
+        'x_values': x_values,
+        'y_field': y_field,
+        'y_values': y_values,
+        'financial_advantage': advantage.reshape(shape),
+        'recommendation': recommendation.reshape(shape),
+    }
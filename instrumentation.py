@@ -0,0 +1,100 @@
+"""
+Request timing instrumentation for Rent vs Buy Analysis
+Times named phases of a request with perf_counter, formats them as a
+Server-Timing header and logs a sample of requests when debug logging is on.
+"""
+
+import logging
+import random
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger('rent_vs_buy.timing')
+
+
+class PhaseTimer:
+    """
+    Collects wall-clock durations of named phases, in the order they ran.
+    
+    Usage:
+        timer = PhaseTimer()
+        with timer.phase('validate'):
+            ...
+        response.headers['Server-Timing'] = timer.server_timing()
+    """
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = []
+        self.notes = {}
+    
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block as phase `name` (repeated names are summed in the header)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+    
+    def note(self, name, description):
+        """Attach a description to a metric, e.g. note('cache', 'hit')."""
+        self.notes[name] = description
+    
+    def durations(self):
+        """Milliseconds per phase, summed by name, plus 'total' since the timer started."""
+        durations = {}
+        for name, seconds in self.phases:
+            durations[name] = durations.get(name, 0.0) + seconds * 1000
+        durations['total'] = (time.perf_counter() - self.started) * 1000
+        return durations
+    
+    def server_timing(self):
+        """Format phases and notes as a Server-Timing header value."""
+        durations = self.durations()
+        metrics = []
+        for name, milliseconds in durations.items():
+            metric = f"{name};dur={milliseconds:.3f}"
+            if name in self.notes:
+                metric += f';desc="{self.notes[name]}"'
+            metrics.append(metric)
+        metrics.extend(f'{name};desc="{description}"'
+                       for name, description in self.notes.items() if name not in durations)
+        return ', '.join(metrics)
+
+
+def should_log(sample_rate, level=logging.DEBUG):
+    """
+    Decide whether to log this request's timings.
+    
+    The logger level is checked first, so with logging disabled (the default)
+    this is a single attribute lookup and no random number is drawn.
+    
+    Args:
+        sample_rate: Fraction of requests to log, from 0 to 1
+        level: Logging level the timings are written at
+    
+    Returns:
+        True if the caller should log
+    """
+    if sample_rate <= 0 or not logger.isEnabledFor(level):
+        return False
+    return sample_rate >= 1 or random.random() < sample_rate
+
+
+def log_timings(endpoint, timer, sample_rate, level=logging.DEBUG, **fields):
+    """
+    Log phase durations for a sampled fraction of requests.
+    
+    Args:
+        endpoint: Name of the endpoint being timed
+        timer: PhaseTimer for the request
+        sample_rate: Fraction of requests to log, from 0 to 1
+        level: Logging level to write at
+        **fields: Extra summary values to include (kept small; no full series)
+    """
+    if not should_log(sample_rate, level):
+        return
+    durations = ' '.join(f"{name}={milliseconds:.3f}ms" for name, milliseconds in timer.durations().items())
+    extra = ' '.join(f"{name}={value}" for name, value in fields.items())
+    logger.log(level, "%s %s %s", endpoint, durations, extra)
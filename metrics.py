@@ -0,0 +1,310 @@
+"""
+Prometheus metrics for Rent vs Buy Analysis
+Counters and histograms kept in memory per process and, when a metrics
+directory is configured, flushed to one JSON file per process so that /metrics
+can sum every gunicorn worker's values.
+"""
+
+import atexit
+import glob
+import json
+import os
+import secrets
+import threading
+import time
+from bisect import bisect_left
+
+# Latency buckets in seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# analysis_years buckets
+YEARS_BUCKETS = (1, 2, 3, 5, 7, 10, 15, 20, 25, 30, 40, 50)
+
+# Metric name -> (type, help, label names, histogram buckets)
+METRICS = {
+    'rentvsbuy_http_requests_total': (
+        'counter', 'HTTP requests by route, method and status.', ('route', 'method', 'status'), None),
+    'rentvsbuy_http_request_duration_seconds': (
+        'histogram', 'HTTP request latency by route.', ('route',), LATENCY_BUCKETS),
+    'rentvsbuy_engine_phase_duration_seconds': (
+        'histogram', 'Request phase latency by route and phase.', ('route', 'phase'), LATENCY_BUCKETS),
+    'rentvsbuy_errors_total': (
+        'counter', 'Errors returned by route and exception type.', ('route', 'exception'), None),
+    'rentvsbuy_analysis_years': (
+        'histogram', 'Requested analysis_years.', ('route',), YEARS_BUCKETS),
+    'rentvsbuy_cache_requests_total': (
+        'counter', 'Result cache lookups by cache and outcome.', ('cache', 'result'), None),
+}
+
+# Gauge derived from rentvsbuy_cache_requests_total when rendering
+CACHE_HIT_RATIO = 'rentvsbuy_cache_hit_ratio'
+
+# File name pattern of per-process snapshots: metrics_<pid>_<nonce>.json
+FILE_PREFIX = 'metrics_'
+
+# Summed snapshots of worker processes that have exited (see merge_exited_process)
+MERGED_FILE = f"{FILE_PREFIX}merged.json"
+
+
+class MetricsRegistry:
+    """
+    Process-local metric store with optional file-backed aggregation.
+    
+    Every update touches only this process's dictionaries. With a directory,
+    flush() writes them atomically to metrics_<pid>_<nonce>.json and collect()
+    sums all such files, so counts survive worker restarts and add up across
+    workers. The random nonce keeps a recycled pid from overwriting an exited
+    worker's file. A background thread flushes every flush_interval seconds and
+    the process flushes at exit, so an idle worker's last updates are written
+    too. gunicorn.conf.py clears the directory when the server starts and
+    folds exited workers' files into MERGED_FILE.
+    """
+    
+    def __init__(self, directory=None, flush_interval=0.0):
+        """
+        Args:
+            directory: Shared directory for per-process snapshots (None keeps metrics in memory)
+            flush_interval: Minimum seconds between automatic flushes (0 flushes after every request)
+        """
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = 0.0
+        self._dirty = False
+        self._pid = None
+        self._path = None
+        self._stopped = threading.Event()
+        if directory is not None:
+            atexit.register(self.close)
+    
+    def _snapshot_path(self):
+        """This process's snapshot file, named (and its flush thread started) once per process."""
+        pid = os.getpid()
+        if pid != self._pid:
+            # First flush in this process, or in a child forked after the first
+            self._pid = pid
+            self._path = os.path.join(self.directory, f"{FILE_PREFIX}{pid}_{secrets.token_hex(4)}.json")
+            if self.flush_interval > 0:
+                threading.Thread(target=self._flush_periodically, name='metrics-flush', daemon=True).start()
+        return self._path
+    
+    def _flush_periodically(self):
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            except OSError:
+                # The directory may be recreated (e.g. by a restarting master); retry next time
+                pass
+    
+    def _key(self, name, labels):
+        label_names = METRICS[name][2]
+        if len(labels) != len(label_names):
+            raise ValueError(f"{name} expects labels {label_names}")
+        return name, tuple(str(value) for value in labels)
+    
+    def inc(self, name, labels=(), amount=1):
+        """Add amount to a counter."""
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+            self._dirty = True
+    
+    def observe(self, name, value, labels=()):
+        """Record one observation in a histogram."""
+        key = self._key(name, labels)
+        buckets = METRICS[name][3]
+        with self._lock:
+            state = self._histograms.get(key)
+            if state is None:
+                state = self._histograms[key] = [[0] * (len(buckets) + 1), 0.0]
+            # Per-bucket (non-cumulative) counts; the last slot is +Inf
+            state[0][bisect_left(buckets, value)] += 1
+            state[1] += value
+            self._dirty = True
+    
+    def snapshot(self):
+        """This process's metrics as a JSON-serializable dictionary."""
+        with self._lock:
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+                'histograms': [[name, list(labels), list(counts), total]
+                               for (name, labels), (counts, total) in self._histograms.items()],
+            }
+    
+    def flush(self, force=False):
+        """
+        Write this process's snapshot to the metrics directory (if due and configured).
+        
+        One thread writes at a time, so threads never share the temporary file;
+        an automatic flush is skipped while another is in progress, a forced one waits.
+        """
+        if self.directory is None:
+            return
+        if not self._flush_lock.acquire(blocking=force):
+            return
+        try:
+            now = time.monotonic()
+            if not force and (not self._dirty or now - self._last_flush < self.flush_interval):
+                return
+            self._last_flush = now
+            with self._lock:
+                self._dirty = False
+            path = self._snapshot_path()
+            temporary = f"{path}.tmp"
+            with open(temporary, 'w') as handle:
+                json.dump(self.snapshot(), handle)
+            os.replace(temporary, path)
+        finally:
+            self._flush_lock.release()
+    
+    def close(self):
+        """Stop the flush thread and write any remaining updates (runs at exit)."""
+        self._stopped.set()
+        # Wait for a flush the thread may have in progress; it clears _dirty before writing
+        with self._flush_lock:
+            pass
+        if self._dirty:
+            try:
+                self.flush(force=True)
+            except OSError:
+                # The metrics directory is already gone
+                pass
+    
+    def collect(self):
+        """
+        Sum metrics across processes.
+        
+        Returns:
+            Tuple of (counters, histograms) keyed by (name, labels)
+        """
+        if self.directory is None:
+            snapshots = [self.snapshot()]
+        else:
+            self.flush(force=True)
+            snapshots = []
+            for path in sorted(glob.glob(os.path.join(self.directory, f"{FILE_PREFIX}*.json"))):
+                try:
+                    with open(path) as handle:
+                        snapshots.append(json.load(handle))
+                except (OSError, ValueError):
+                    # A worker replaced or removed its file mid-read
+                    continue
+        
+        return sum_snapshots(snapshots)
+    
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        counters, histograms = self.collect()
+        lines = []
+        for name, (kind, help_text, label_names, buckets) in METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == 'counter':
+                for (metric, labels), value in sorted(counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{_labels(label_names, labels)} {_number(value)}")
+            else:
+                for (metric, labels), (counts, total) in sorted(histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(buckets + ('+Inf',), counts):
+                        cumulative += count
+                        bucket_labels = _labels(label_names + ('le',), labels + (_number(bound),))
+                        lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(label_names, labels)} {_number(total)}")
+                    lines.append(f"{name}_count{_labels(label_names, labels)} {cumulative}")
+        
+        lines.append(f"# HELP {CACHE_HIT_RATIO} Fraction of result cache lookups that were hits.")
+        lines.append(f"# TYPE {CACHE_HIT_RATIO} gauge")
+        lookups = {}
+        for (metric, labels), value in counters.items():
+            if metric == 'rentvsbuy_cache_requests_total':
+                cache, result = labels
+                hits, total = lookups.get(cache, (0, 0))
+                lookups[cache] = (hits + (value if result == 'hit' else 0), total + value)
+        for cache, (hits, total) in sorted(lookups.items()):
+            lines.append(f"{CACHE_HIT_RATIO}{_labels(('cache',), (cache,))} {_number(hits / total if total else 0)}")
+        return '\n'.join(lines) + '\n'
+
+
+def sum_snapshots(snapshots):
+    """
+    Sum snapshot dictionaries (as written by MetricsRegistry.flush).
+    
+    Returns:
+        Tuple of (counters, histograms) keyed by (name, labels)
+    """
+    counters = {}
+    histograms = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(labels))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, counts, total in snapshot['histograms']:
+            key = (name, tuple(labels))
+            merged = histograms.setdefault(key, [[0] * len(counts), 0.0])
+            merged[0] = [a + b for a, b in zip(merged[0], counts)]
+            merged[1] += total
+    return counters, histograms
+
+
+def clear_directory(directory):
+    """Remove every snapshot file from a metrics directory (call before workers start)."""
+    for path in glob.glob(os.path.join(directory, f"{FILE_PREFIX}*.json*")):
+        os.remove(path)
+
+
+def merge_exited_process(directory, pid):
+    """
+    Fold an exited worker's snapshot files into MERGED_FILE.
+    
+    Its counts stay in /metrics while the number of files stays bounded by the
+    number of live workers. Call from the server process only (gunicorn's
+    child_exit hook), after the worker has written its last snapshot.
+    
+    Args:
+        directory: Metrics directory
+        pid: Process id of the exited worker
+    """
+    paths = glob.glob(os.path.join(directory, f"{FILE_PREFIX}{pid}_*.json"))
+    if not paths:
+        return
+    merged_path = os.path.join(directory, MERGED_FILE)
+    snapshots = []
+    for path in [merged_path] + paths:
+        try:
+            with open(path) as handle:
+                snapshots.append(json.load(handle))
+        except (OSError, ValueError):
+            # No merged file yet, or a snapshot the worker never finished writing
+            continue
+    counters, histograms = sum_snapshots(snapshots)
+    temporary = f"{merged_path}.tmp"
+    with open(temporary, 'w') as handle:
+        json.dump({
+            'counters': [[name, list(labels), value] for (name, labels), value in counters.items()],
+            'histograms': [[name, list(labels), counts, total]
+                           for (name, labels), (counts, total) in histograms.items()],
+        }, handle)
+    os.replace(temporary, merged_path)
+    for path in paths:
+        os.remove(path)
+
+
+def _number(value):
+    """Format a sample value or bucket bound."""
+    if isinstance(value, str):
+        return value
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _labels(names, values):
+    """Format a label set, escaping backslashes, quotes and newlines."""
+    if not names:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in values)
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(names, escaped)) + '}'
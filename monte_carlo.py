@@ -0,0 +1,241 @@
+"""
+Monte Carlo mode for Rent vs Buy Analysis
+Draws per-year home appreciation, market return and rent increase rates from
+correlated distributions and reports how often buying wins, with percentile
+bands of each scenario's wealth by year.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from batch_engine import MAX_ANALYSIS_YEARS, prepare_columns, simulate_batch
+
+# Rates drawn per year, in this order for the correlation matrix
+STOCHASTIC_FIELDS = ('annual_appreciation_rate', 'annual_market_return', 'annual_rent_increase_rate')
+
+# Default yearly standard deviations (percentage points)
+DEFAULT_VOLATILITY = {
+    'annual_appreciation_rate': 5.0,
+    'annual_market_return': 15.0,
+    'annual_rent_increase_rate': 2.0,
+}
+
+# Default correlation: home prices and rents tend to move together
+DEFAULT_CORRELATION = [
+    [1.0, 0.0, 0.5],
+    [0.0, 1.0, 0.0],
+    [0.5, 0.0, 1.0],
+]
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Wealth series summarized by year
+WEALTH_SERIES = ('buy_net_position', 'rent_net_position', 'financial_advantage')
+
+# Paths simulated per chunk; also the largest run summarized with exact percentiles
+DEFAULT_CHUNK_SIZE = 10000
+
+# Resolution of the streaming percentile histograms
+HISTOGRAM_BINS = 2000
+
+
+class StreamingPercentiles:
+    """
+    Per-year histograms that estimate percentiles without keeping every path.
+    
+    Bin edges are fixed up front (from a pilot chunk); values outside the range
+    fall into the end bins. Histograms from different chunks or processes are
+    combined with merge().
+    """
+    
+    def __init__(self, low, high, bins=HISTOGRAM_BINS):
+        self.low = np.asarray(low, dtype=np.float64)
+        self.high = np.maximum(np.asarray(high, dtype=np.float64), self.low + 1e-9)
+        self.bins = bins
+        self.counts = np.zeros((len(self.low), bins), dtype=np.int64)
+    
+    def update(self, values):
+        """Add a (years, paths) array of values."""
+        years = len(self.low)
+        scaled = (values - self.low[:, None]) / (self.high - self.low)[:, None] * self.bins
+        index = np.clip(scaled.astype(np.int64), 0, self.bins - 1)
+        flat = (index + np.arange(years)[:, None] * self.bins).ravel()
+        self.counts += np.bincount(flat, minlength=years * self.bins).reshape(years, self.bins)
+    
+    def merge(self, counts):
+        """Add histogram counts gathered with the same bin edges."""
+        self.counts += counts
+    
+    def percentiles(self, percentiles):
+        """Interpolated percentiles as an array of shape (len(percentiles), years)."""
+        cumulative = np.cumsum(self.counts, axis=1)
+        totals = cumulative[:, -1]
+        width = (self.high - self.low) / self.bins
+        result = np.empty((len(percentiles), len(self.low)))
+        for row, percentile in enumerate(percentiles):
+            target = totals * percentile / 100
+            for year in range(len(self.low)):
+                bin_index = min(np.searchsorted(cumulative[year], target[year]), self.bins - 1)
+                before = cumulative[year][bin_index - 1] if bin_index > 0 else 0
+                in_bin = self.counts[year][bin_index]
+                fraction = (target[year] - before) / in_bin if in_bin else 0.5
+                result[row, year] = self.low[year] + (bin_index + fraction) * width[year]
+        return result
+
+
+def _draw_rates(rng, means, volatility, cholesky, years, paths, distribution, degrees_of_freedom):
+    """Draw correlated per-year rates; returns a dict of (years, paths) arrays."""
+    shocks = rng.standard_normal((years, paths, len(STOCHASTIC_FIELDS)))
+    if distribution == 'student_t':
+        # Scale to unit variance so volatility keeps its meaning
+        chi_square = rng.chisquare(degrees_of_freedom, (years, paths, 1))
+        shocks *= np.sqrt((degrees_of_freedom - 2) / chi_square)
+    correlated = shocks @ cholesky.T
+    return {
+        name: means[name] + volatility[name] * correlated[..., index]
+        for index, name in enumerate(STOCHASTIC_FIELDS)
+    }
+
+
+def _simulate_paths(params, paths, seed_sequence, means, volatility, cholesky, distribution, degrees_of_freedom):
+    """Simulate one chunk of paths; returns (years, paths) arrays of each wealth series."""
+    rng = np.random.default_rng(seed_sequence)
+    _, arrays = prepare_columns(params)
+    arrays = {name: np.broadcast_to(value, (paths,)) for name, value in arrays.items()}
+    years = int(arrays['analysis_years'][0])
+    rates = _draw_rates(rng, means, volatility, cholesky, years, paths, distribution, degrees_of_freedom)
+    sim = simulate_batch(arrays, paths, record=('buy_net_position', 'rent_net_position'), yearly_rates=rates)
+    buy = sim['series']['buy_net_position']
+    rent = sim['series']['rent_net_position']
+    return {'buy_net_position': buy, 'rent_net_position': rent, 'financial_advantage': buy - rent}
+
+
+def _summarize_chunk(args):
+    """Worker entry point: simulate a chunk and return histogram counts and buy-win counts."""
+    params, paths, seed_sequence, means, volatility, cholesky, distribution, degrees_of_freedom, edges = args
+    wealth = _simulate_paths(params, paths, seed_sequence, means, volatility, cholesky,
+                             distribution, degrees_of_freedom)
+    counts = {}
+    for name in WEALTH_SERIES:
+        histogram = StreamingPercentiles(*edges[name])
+        histogram.update(wealth[name])
+        counts[name] = histogram.counts
+    return counts, (wealth['financial_advantage'] > 0).sum(axis=1)
+
+
+def run_monte_carlo(params, n_paths=10000, volatility=None, correlation=None, seed=None,
+                    percentiles=DEFAULT_PERCENTILES, distribution='normal', degrees_of_freedom=5,
+                    chunk_size=DEFAULT_CHUNK_SIZE, workers=None):
+    """
+    Simulate buying vs renting with random yearly appreciation, market return and rent increase.
+    
+    Each path draws one rate per year for every field in STOCHASTIC_FIELDS, centered on
+    the scenario's own rate. Paths are simulated in chunks with the vectorized batch
+    engine. A run that fits in one chunk reports exact percentiles; larger runs merge
+    per-year histograms (bounded memory) and spread chunks across a process pool.
+    Chunk seeds are derived from `seed`, so results do not depend on the worker count.
+    
+    Args:
+        params: Scenario as a mapping of batch_engine.SCENARIO_FIELDS
+        n_paths: Number of simulated paths
+        volatility: Yearly standard deviation per stochastic field (default: DEFAULT_VOLATILITY)
+        correlation: 3x3 correlation matrix in STOCHASTIC_FIELDS order (default: DEFAULT_CORRELATION)
+        seed: Random seed for reproducible runs
+        percentiles: Percentiles to report for each wealth series
+        distribution: 'normal' or 'student_t' (fat-tailed, unit-variance shocks)
+        degrees_of_freedom: Degrees of freedom for 'student_t' (must be above 2)
+        chunk_size: Paths per chunk
+        workers: Process pool size for multi-chunk runs (default: CPU count, 1 disables the pool)
+    
+    Returns:
+        Dictionary with the probability that buying wins (overall and by year) and
+        percentile bands of buy/rent net position and financial advantage by year
+    
+    Raises:
+        ValueError: If analysis_years is outside 1 .. MAX_ANALYSIS_YEARS or an
+            option is out of range
+    """
+    if n_paths < 1 or chunk_size < 1:
+        raise ValueError("n_paths and chunk_size must be positive")
+    if not 1 <= params['analysis_years'] <= MAX_ANALYSIS_YEARS:
+        raise ValueError(f"analysis_years must be between 1 and {MAX_ANALYSIS_YEARS}")
+    if distribution not in ('normal', 'student_t'):
+        raise ValueError(f"Unknown distribution: {distribution}")
+    if distribution == 'student_t' and degrees_of_freedom <= 2:
+        raise ValueError("degrees_of_freedom must be greater than 2")
+    
+    volatility = {**DEFAULT_VOLATILITY, **(volatility or {})}
+    unknown = [name for name in volatility if name not in STOCHASTIC_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown stochastic fields: {', '.join(sorted(unknown))}")
+    
+    correlation = np.asarray(DEFAULT_CORRELATION if correlation is None else correlation, dtype=np.float64)
+    if correlation.shape != (3, 3) or not np.allclose(correlation, correlation.T):
+        raise ValueError("correlation must be a symmetric 3x3 matrix")
+    try:
+        cholesky = np.linalg.cholesky(correlation)
+    except np.linalg.LinAlgError:
+        raise ValueError("correlation matrix must be positive definite")
+    
+    means = {name: float(params[name]) for name in STOCHASTIC_FIELDS}
+    years = int(params['analysis_years'])
+    chunk_sizes = [chunk_size] * (n_paths // chunk_size)
+    if n_paths % chunk_size:
+        chunk_sizes.append(n_paths % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    shared = (means, volatility, cholesky, distribution, degrees_of_freedom)
+    
+    # The first chunk runs here: exact results for small runs, histogram ranges otherwise
+    pilot = _simulate_paths(params, chunk_sizes[0], seeds[0], *shared)
+    buy_wins = (pilot['financial_advantage'] > 0).sum(axis=1)
+    
+    if len(chunk_sizes) == 1:
+        method = 'exact'
+        bands = {name: np.percentile(pilot[name], percentiles, axis=1) for name in WEALTH_SERIES}
+    else:
+        method = 'histogram'
+        edges = {}
+        histograms = {}
+        for name in WEALTH_SERIES:
+            low, high = pilot[name].min(axis=1), pilot[name].max(axis=1)
+            # Leave room for paths beyond the pilot's range
+            margin = (high - low) * 0.5 + 1.0
+            edges[name] = (low - margin, high + margin)
+            histograms[name] = StreamingPercentiles(*edges[name])
+            histograms[name].update(pilot[name])
+        del pilot
+        
+        tasks = [(params, paths, chunk_seed) + shared + (edges,)
+                 for paths, chunk_seed in zip(chunk_sizes[1:], seeds[1:])]
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+                summaries = pool.map(_summarize_chunk, tasks)
+                for counts, wins in summaries:
+                    for name in WEALTH_SERIES:
+                        histograms[name].merge(counts[name])
+                    buy_wins += wins
+        else:
+            for task in tasks:
+                counts, wins = _summarize_chunk(task)
+                for name in WEALTH_SERIES:
+                    histograms[name].merge(counts[name])
+                buy_wins += wins
+        bands = {name: histograms[name].percentiles(percentiles) for name in WEALTH_SERIES}
+    
+    probability_by_year = buy_wins / n_paths
+    return {
+        'n_paths': n_paths,
+        'method': method,
+        'years': list(range(1, years + 1)),
+        'probability_buy_wins': float(probability_by_year[-1]),
+        'probability_buy_wins_by_year': probability_by_year.tolist(),
+        'percentiles': list(percentiles),
+        'bands': {
+            name: {f"p{percentile:g}": values.tolist() for percentile, values in zip(percentiles, bands[name])}
+            for name in WEALTH_SERIES
+        },
+    }
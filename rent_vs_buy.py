@@ -3,8 +3,102 @@ Rent vs Buy Analysis Tool
 Compares the financial implications of buying vs renting and investing the down payment.
 """
 
+from contextlib import nullcontext
+from functools import lru_cache
+from inspect import Parameter, signature
+
+from growth_tables import amortization_table, growth_table
+from scenario_params import ScenarioParams
+
+# Investment accumulation modes
+ACCUMULATION_ITERATIVE = 'iterative'      # Compound month by month
+ACCUMULATION_CLOSED_FORM = 'closed_form'  # Geometric-series closed form per year
+
+# Maximum relative difference between the two accumulation modes. Both compute
+# the same sums exactly; only floating-point rounding separates them.
+CLOSED_FORM_RELATIVE_TOLERANCE = 1e-9
+
+
+# Keys of the compare_scenarios result; the series sections are the costly ones
+SERIES_SECTIONS = ('monthly_costs', 'yearly_growth')
+COMPARE_FIELDS = (
+    'analysis_period_years', 'buying', 'renting', 'financial_advantage', 'buy_net_cost',
+    'rent_net_position', 'rent_net_cost', 'recommendation', 'advantage_amount',
+    'advantage_description',
+) + SERIES_SECTIONS
+
+# Columns of each iter_monthly_schedule row, in order
+SCHEDULE_COLUMNS = (
+    'month', 'year', 'mortgage_payment', 'interest', 'principal', 'mortgage_balance', 'home_value',
+    'property_tax', 'maintenance', 'insurance', 'hoa', 'buy_monthly_cost', 'rent', 'monthly_income',
+    'buy_investment_contribution', 'buy_investment_value', 'rent_investment_contribution',
+    'rent_investment_value',
+)
+
+
+def year_accumulation_factors(monthly_return, months=12):
+    """
+    Closed-form factors for compounding an account with level monthly contributions.
+    
+    After `months` months of growing by (1 + monthly_return) and then adding a
+    contribution c, a starting value V becomes V * growth + c * annuity.
+    
+    Args:
+        monthly_return: Monthly rate of return as a decimal
+        months: Number of months compounded
+    
+    Returns:
+        Tuple of (growth, annuity) factors
+    """
+    if monthly_return == 0:
+        return 1.0, float(months)
+    
+    growth = (1 + monthly_return) ** months
+    annuity = (growth - 1) / monthly_return
+    return growth, annuity
+
+
+@lru_cache(maxsize=None)
+def _keyword_defaults(function):
+    """Default value of each keyword parameter of a function."""
+    return {name: parameter.default for name, parameter in signature(function).parameters.items()
+            if parameter.default is not Parameter.empty}
+
+
+class LazyResults(dict):
+    """
+    compare_scenarios result whose keys are computed on first access.
+    
+    Keys computed so far are ordinary dict entries (iteration, len and JSON
+    serialization see only those); other available keys are loaded by indexing,
+    get() or `in`.
+    """
+    
+    def __init__(self, loaders):
+        """
+        Args:
+            loaders: Mapping of key to a zero-argument function computing its value
+        """
+        super().__init__()
+        self._loaders = loaders
+    
+    def __missing__(self, key):
+        if key not in self._loaders:
+            raise KeyError(key)
+        value = self[key] = self._loaders[key]()
+        return value
+    
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or key in self._loaders
+    
+    def get(self, key, default=None):
+        """Value for key (computing it if needed), or default if unavailable."""
+        return self[key] if key in self else default
+
+
 class RentVsBuyAnalysis:
-    def __init__(self, purchase_price, down_payment, loan_term_years=30, annual_interest_rate=6.5):
+    def __init__(self, purchase_price, down_payment, loan_term_years=30, annual_interest_rate=6.5,
+                 accumulation=ACCUMULATION_ITERATIVE):
         """
         Initialize the analysis with property and financing details.
         
@@ -13,7 +107,13 @@ class RentVsBuyAnalysis:
             down_payment: Available cash for down payment
             loan_term_years: Mortgage loan term (default 30 years)
             annual_interest_rate: Mortgage interest rate as percentage (default 6.5%)
+            accumulation: Investment accumulation mode, 'iterative' (default) or
+                'closed_form'. Closed-form results agree with the iterative ones to
+                within CLOSED_FORM_RELATIVE_TOLERANCE.
         """
+        if accumulation not in (ACCUMULATION_ITERATIVE, ACCUMULATION_CLOSED_FORM):
+            raise ValueError(f"Unknown accumulation mode: {accumulation}")
+        
         self.purchase_price = purchase_price
         self.down_payment = down_payment
         self.loan_amount = purchase_price - down_payment
@@ -21,113 +121,225 @@ class RentVsBuyAnalysis:
         self.annual_interest_rate = annual_interest_rate / 100
         self.monthly_interest_rate = self.annual_interest_rate / 12
         self.num_payments = loan_term_years * 12
+        self.accumulation = accumulation
     
     def calculate_monthly_mortgage_payment(self):
         """Calculate monthly mortgage payment using the standard mortgage formula."""
-        if self.monthly_interest_rate == 0:
-            return self.loan_amount / self.num_payments
+        return self.loan_amount * self._amortization().payment_factor
+    
+    def _amortization(self):
+        """Shared amortization table for this loan's rate and term."""
+        return amortization_table(self.monthly_interest_rate, self.num_payments)
+    
+    @staticmethod
+    def _scenario(method, years, checked=False, **kwargs):
+        """
+        Scenario for a public method: `years` itself when it is a ScenarioParams,
+        otherwise one built from the keyword arguments. Keyword calls skip the
+        ScenarioParams range checks, as the keyword signatures always did.
         
-        payment = self.loan_amount * (
-            (self.monthly_interest_rate * (1 + self.monthly_interest_rate) ** self.num_payments) /
-            ((1 + self.monthly_interest_rate) ** self.num_payments - 1)
-        )
-        return payment
+        Args:
+            method: The public method, whose defaults show which keyword
+                arguments the caller changed
+            years: Analysis period in years, or a ScenarioParams
+            checked: Range-check keyword arguments like ScenarioParams (for
+                methods added together with ScenarioParams)
+            **kwargs: The method's scenario arguments
+        
+        Raises:
+            TypeError: If a ScenarioParams comes with keyword arguments changed from
+                their defaults (use ScenarioParams.replace() instead), or
+                monthly_rent is missing
+            ValueError: If checked and a keyword argument is out of range
+        """
+        if isinstance(years, ScenarioParams):
+            defaults = _keyword_defaults(getattr(method, '__func__', method))
+            changed = sorted(name for name, value in kwargs.items() if value != defaults[name])
+            if changed:
+                raise TypeError(f"Pass either a ScenarioParams or keyword arguments, not both "
+                                f"(got {', '.join(changed)}); use ScenarioParams.replace() to change fields")
+            return years
+        if kwargs.get('monthly_rent', 0) is None:
+            raise TypeError("monthly_rent is required unless a ScenarioParams is passed")
+        if checked:
+            return ScenarioParams(years, **kwargs)
+        return ScenarioParams.unchecked(years, **kwargs)
     
-    def calculate_buying_costs(self, years, annual_property_tax_rate=1.2, annual_maintenance_rate=1.0,
-                              annual_insurance_rate=0.5, annual_hoa=0.2, closing_costs_percent=3,
-                              annual_appreciation_rate=3.0, monthly_income=5000, annual_inflation_rate=2.5,
-                              monthly_investment_percentage=10.0, annual_market_return=7.0):
+    def _simulate(self, scenario, record_series=True):
         """
-        Calculate total costs of buying over specified years.
-        Includes home equity plus investments from available budget.
+        Advance the shared monthly state of both scenarios once over the analysis period.
+        
+        Home value, rent and income come from shared cumulative growth tables, and the three
+        investment accounts (gross-income budget while buying, leftover budget while
+        buying, down payment plus leftover budget while renting) are compounded monthly,
+        either month by month or with the closed form from year_accumulation_factors.
+        Every public calculation method is a view over the dictionary returned here.
         
         Args:
-            years: Analysis period in years
-            annual_property_tax_rate: Annual property tax as % of home value
-            annual_maintenance_rate: Annual maintenance as % of home value
-            annual_insurance_rate: Annual insurance as % of home value
-            annual_hoa: Annual HOA fees as % of home value
-            closing_costs_percent: One-time closing costs as % of purchase price
-            annual_appreciation_rate: Expected annual home appreciation rate
-            monthly_income: Initial monthly income
-            annual_inflation_rate: Annual income inflation rate
-            monthly_investment_percentage: Percentage of available budget to invest
-            annual_market_return: Expected annual market return for investments
+            scenario: ScenarioParams to simulate
+            record_series: Record the per-year series (views that only need the
+                totals pass False and skip that work)
         
         Returns:
-            Dictionary with detailed cost breakdown
+            Dictionary with running totals and unrounded per-year series
+            (None when record_series is False)
         """
+        years = scenario.years
         monthly_mortgage = self.calculate_monthly_mortgage_payment()
-        total_mortgage_payments = monthly_mortgage * 12 * years
-        
-        # Calculate remaining balance after specified years
-        remaining_balance = self.calculate_remaining_mortgage_balance(years)
+        monthly_return = scenario.annual_market_return / 100 / 12
+        growth_per_month = 1 + monthly_return
+        closed_form = self.accumulation == ACCUMULATION_CLOSED_FORM
+        growth_per_year, annuity_per_year = year_accumulation_factors(monthly_return)
+        # Cumulative factors by year, shared with other calls using the same rates
+        appreciation = growth_table(scenario.annual_appreciation_rate / 100, years).factors
+        rent_increase = growth_table(scenario.annual_rent_increase_rate / 100, years).factors
+        inflation = growth_table(scenario.annual_inflation_rate / 100, years).factors
+        amortization = self._amortization()
+        investment_share = scenario.monthly_investment_percentage / 100
+        
+        property_tax_share = scenario.annual_property_tax_rate / 100
+        maintenance_share = scenario.annual_maintenance_rate / 100
+        insurance_share = scenario.annual_insurance_rate / 100
+        hoa_share = scenario.annual_hoa / 100
+        closing_costs = self.purchase_price * (scenario.closing_costs_percent / 100)
         
-        # Principal paid = initial loan - remaining balance
-        principal_paid = self.loan_amount - remaining_balance
-        
-        # Total interest paid = total payments - principal paid
-        total_interest_paid = total_mortgage_payments - principal_paid
-        
-        # Closing costs (upfront)
-        closing_costs = self.purchase_price * (closing_costs_percent / 100)
-        
-        # Ongoing costs
         total_property_tax = 0
         total_maintenance = 0
         total_insurance = 0
         total_hoa = 0
+        total_rent = 0
         
-        current_home_value = self.purchase_price
-        for year in range(years):
-            # Costs based on current appreciated value
-            annual_property_tax = current_home_value * (annual_property_tax_rate / 100)
-            total_property_tax += annual_property_tax
+        # Buying: percentage of gross income invested every month
+        budget_investments = 0
+        # Buying: percentage of what is left after monthly ownership costs
+        # Note: down payment goes to house, so investment starts at 0
+        investment_buy = 0
+        contributions_buy = 0
+        # Renting: down payment plus percentage of what is left after rent
+        investment_rent = self.down_payment
+        contributions_rent = self.down_payment
+        
+        series = {
+            'buy_costs': [],
+            'rent_costs': [],
+            'monthly_income': [],
+            'buy_monthly_investments': [],
+            'rent_monthly_investments': [],
+            'home_equity_after_sales': [],
+            'investment_growth_buy': [],
+            'investment_growth_rent': [],
+            'investment_contributions_buy': [],
+            'investment_contributions_rent': [],
+            'buy_net_position': [],
+            'rent_net_position': [],
+        } if record_series else None
+        
+        for year in range(1, years + 1):
+            home_value = self.purchase_price * appreciation[year - 1]
+            current_monthly_rent = scenario.monthly_rent * rent_increase[year - 1]
+            current_monthly_income = scenario.monthly_income * inflation[year - 1]
             
-            annual_maintenance = current_home_value * (annual_maintenance_rate / 100)
+            # Ownership costs for the year are based on the value at its start
+            annual_property_tax = home_value * property_tax_share
+            annual_maintenance = home_value * maintenance_share
+            annual_insurance = home_value * insurance_share
+            annual_hoa_cost = home_value * hoa_share
+            total_property_tax += annual_property_tax
             total_maintenance += annual_maintenance
-            
-            annual_insurance = current_home_value * (annual_insurance_rate / 100)
             total_insurance += annual_insurance
-            
-            annual_hoa_cost = current_home_value * (annual_hoa / 100)
             total_hoa += annual_hoa_cost
+            total_rent += current_monthly_rent * 12
+            
+            monthly_buy_cost = monthly_mortgage + (
+                annual_property_tax + annual_maintenance + annual_insurance + annual_hoa_cost
+            ) / 12
+            
+            # Monthly contributions to each account
+            budget_contribution = current_monthly_income * investment_share
+            buy_contribution = max(0, current_monthly_income - monthly_buy_cost) * investment_share
+            rent_contribution = max(0, current_monthly_income - current_monthly_rent) * investment_share
+            
+            if closed_form:
+                # A year of growth and level contributions in one step
+                budget_investments = budget_investments * growth_per_year + budget_contribution * annuity_per_year
+                investment_buy = investment_buy * growth_per_year + buy_contribution * annuity_per_year
+                investment_rent = investment_rent * growth_per_year + rent_contribution * annuity_per_year
+            else:
+                for month in range(12):
+                    # Grow existing investments, then add monthly investments
+                    budget_investments = budget_investments * growth_per_month + budget_contribution
+                    investment_buy = investment_buy * growth_per_month + buy_contribution
+                    investment_rent = investment_rent * growth_per_month + rent_contribution
+            contributions_buy += buy_contribution * 12
+            contributions_rent += rent_contribution * 12
+            
+            # Totals-only runs skip the per-year series
+            if not record_series:
+                continue
+            
+            series['buy_costs'].append(monthly_buy_cost)
+            series['rent_costs'].append(current_monthly_rent)
+            series['monthly_income'].append(current_monthly_income)
+            series['buy_monthly_investments'].append(buy_contribution)
+            series['rent_monthly_investments'].append(rent_contribution)
+            series['investment_growth_buy'].append(investment_buy)
+            series['investment_growth_rent'].append(investment_rent)
+            series['investment_contributions_buy'].append(contributions_buy)
+            series['investment_contributions_rent'].append(contributions_rent)
+            
+            # Appreciated home value and equity after sales at the end of this year
+            home_value = self.purchase_price * appreciation[year]
+            remaining_balance = self.loan_amount * amortization.remaining_fraction(year * 12)
+            equity_after_sales = home_value - remaining_balance - home_value * 0.06
+            series['home_equity_after_sales'].append(equity_after_sales)
             
-            # Appreciate home value
-            current_home_value *= (1 + annual_appreciation_rate / 100)
+            # Net positions if the analysis ended at this year (see the buying and renting views)
+            costs_paid = (closing_costs + monthly_mortgage * 12 * year + total_property_tax +
+                          total_maintenance + total_insurance + total_hoa)
+            series['buy_net_position'].append(equity_after_sales + budget_investments - costs_paid)
+            series['rent_net_position'].append(investment_rent - total_rent)
+        
+        return {
+            'years': years,
+            'monthly_mortgage_payment': monthly_mortgage,
+            'closing_costs': closing_costs,
+            'total_property_tax': total_property_tax,
+            'total_maintenance': total_maintenance,
+            'total_insurance': total_insurance,
+            'total_hoa': total_hoa,
+            'total_rent': total_rent,
+            'final_home_value': self.purchase_price * appreciation[years],
+            'remaining_mortgage_balance': self.loan_amount * amortization.remaining_fraction(years * 12),
+            'available_budget_investments': budget_investments,
+            'investment_rent': investment_rent,
+            'down_payment_investment': self.down_payment * growth_per_month ** (years * 12),
+            'series': series,
+        }
+    
+    def _buying_costs_view(self, sim):
+        """Build the calculate_buying_costs result from a simulation."""
+        years = sim['years']
+        monthly_mortgage = sim['monthly_mortgage_payment']
+        total_mortgage_payments = monthly_mortgage * 12 * years
+        remaining_balance = sim['remaining_mortgage_balance']
+        
+        # Principal paid = initial loan - remaining balance
+        principal_paid = self.loan_amount - remaining_balance
         
-        # Final home value
-        final_home_value = self.purchase_price * ((1 + annual_appreciation_rate / 100) ** years)
+        # Total interest paid = total payments - principal paid
+        total_interest_paid = total_mortgage_payments - principal_paid
         
         # Home equity (home value - remaining mortgage - selling costs)
+        final_home_value = sim['final_home_value']
         selling_costs = final_home_value * 0.06  # Typical 6% realtor commission
         home_equity = final_home_value - remaining_balance - selling_costs
         
-        total_costs = (closing_costs + total_mortgage_payments + total_property_tax + 
-                      total_maintenance + total_insurance + total_hoa + selling_costs)
-        
-        # Calculate investments from available budget (income - monthly buy costs)
-        monthly_return = annual_market_return / 100 / 12
-        available_budget_investments = 0
-        
-        current_home_value = self.purchase_price
-        for year in range(years):
-            # Income increases annually with inflation
-            current_monthly_income = monthly_income * ((1 + annual_inflation_rate / 100) ** year)
-            
-            # Monthly investment = percentage of gross income (not dependent on costs)
-            monthly_investment_amount = current_monthly_income * (monthly_investment_percentage / 100)
-            
-            for month in range(12):
-                # Grow existing investment
-                available_budget_investments *= (1 + monthly_return)
-                # Add monthly investment
-                available_budget_investments += monthly_investment_amount
-            
-            # Appreciate home value for next year
-            current_home_value *= (1 + annual_appreciation_rate / 100)
+        closing_costs = sim['closing_costs']
+        total_costs = (closing_costs + total_mortgage_payments + sim['total_property_tax'] +
+                      sim['total_maintenance'] + sim['total_insurance'] + sim['total_hoa'] + selling_costs)
         
         # Total wealth after buying = home equity + available budget investments
+        available_budget_investments = sim['available_budget_investments']
         total_wealth = home_equity + available_budget_investments
         
         return {
@@ -135,10 +347,10 @@ class RentVsBuyAnalysis:
             'closing_costs': closing_costs,
             'total_mortgage_payments': total_mortgage_payments,
             'total_interest_paid': total_interest_paid,
-            'total_property_tax': total_property_tax,
-            'total_maintenance': total_maintenance,
-            'total_insurance': total_insurance,
-            'total_hoa': total_hoa,
+            'total_property_tax': sim['total_property_tax'],
+            'total_maintenance': sim['total_maintenance'],
+            'total_insurance': sim['total_insurance'],
+            'total_hoa': sim['total_hoa'],
             'selling_costs': selling_costs,
             'total_costs': total_costs,
             'final_home_value': final_home_value,
@@ -150,20 +362,124 @@ class RentVsBuyAnalysis:
             'monthly_mortgage_payment': monthly_mortgage
         }
     
+    @staticmethod
+    def _renting_costs_view(sim):
+        """Build the calculate_renting_costs result from a simulation."""
+        total_rent = sim['total_rent']
+        investment_value = sim['investment_rent']
+        return {
+            'total_rent_paid': total_rent,
+            'investment_amount': investment_value,
+            'investment_from_down_payment': sim['down_payment_investment'],
+            'total_outflow': total_rent,
+            'net_position': investment_value - total_rent
+        }
+    
+    @staticmethod
+    def _monthly_costs_view(sim):
+        """Build the calculate_monthly_costs result from a simulation."""
+        series = sim['series']
+        return {
+            'years': list(range(1, sim['years'] + 1)),
+            'buy_costs': [round(value, 2) for value in series['buy_costs']],
+            'rent_costs': [round(value, 2) for value in series['rent_costs']],
+            'monthly_income': [round(value, 2) for value in series['monthly_income']],
+            'buy_monthly_investments': [round(value, 2) for value in series['buy_monthly_investments']],
+            'rent_monthly_investments': [round(value, 2) for value in series['rent_monthly_investments']]
+        }
+    
+    @staticmethod
+    def _yearly_growth_view(sim):
+        """Build the calculate_yearly_growth result from a simulation."""
+        series = sim['series']
+        yearly_home_equity = [round(max(0, value), 2) for value in series['home_equity_after_sales']]
+        yearly_investment_value_buy = [round(value, 2) for value in series['investment_growth_buy']]
+        yearly_investment_value_rent = [round(value, 2) for value in series['investment_growth_rent']]
+        
+        # Calculate gains: total value minus contributions
+        yearly_investment_gains_buy = [
+            round(max(0, value - contributions), 2)
+            for value, contributions in zip(series['investment_growth_buy'], series['investment_contributions_buy'])
+        ]
+        yearly_investment_gains_rent = [
+            round(max(0, value - contributions), 2)
+            for value, contributions in zip(series['investment_growth_rent'], series['investment_contributions_rent'])
+        ]
+        
+        # Calculate combined wealth for buy scenario (home equity + investment gains)
+        yearly_buy_wealth_gains = [
+            round(equity + gains, 2)
+            for equity, gains in zip(yearly_home_equity, yearly_investment_gains_buy)
+        ]
+        
+        # Calculate total available cash for each scenario
+        yearly_buy_total_available = [
+            round(equity + value, 2)
+            for equity, value in zip(yearly_home_equity, yearly_investment_value_buy)
+        ]
+        yearly_rent_total_available = yearly_investment_value_rent
+        
+        return {
+            'years': list(range(1, sim['years'] + 1)),
+            'home_equity_after_sales': yearly_home_equity,
+            'investment_growth': yearly_investment_value_rent,  # For backwards compatibility
+            'investment_growth_buy': yearly_investment_value_buy,
+            'investment_growth_rent': yearly_investment_value_rent,
+            'investment_gains_buy': yearly_investment_gains_buy,
+            'investment_gains_rent': yearly_investment_gains_rent,
+            'buy_total_available_cash': yearly_buy_total_available,
+            'rent_total_available_cash': yearly_rent_total_available,
+            'buy_wealth_gains': yearly_buy_wealth_gains
+        }
+    
+    def calculate_buying_costs(self, years, annual_property_tax_rate=1.2, annual_maintenance_rate=1.0,
+                              annual_insurance_rate=0.5, annual_hoa=0.2, closing_costs_percent=3,
+                              annual_appreciation_rate=3.0, monthly_income=5000, annual_inflation_rate=2.5,
+                              monthly_investment_percentage=10.0, annual_market_return=7.0):
+        """
+        Calculate total costs of buying over specified years.
+        Includes home equity plus investments from available budget.
+        
+        Args:
+            years: Analysis period in years
+            annual_property_tax_rate: Annual property tax as % of home value
+            annual_maintenance_rate: Annual maintenance as % of home value
+            annual_insurance_rate: Annual insurance as % of home value
+            annual_hoa: Annual HOA fees as % of home value
+            closing_costs_percent: One-time closing costs as % of purchase price
+            annual_appreciation_rate: Expected annual home appreciation rate
+            monthly_income: Initial monthly income
+            annual_inflation_rate: Annual income inflation rate
+            monthly_investment_percentage: Percentage of available budget to invest
+            annual_market_return: Expected annual market return for investments
+        
+        Returns:
+            Dictionary with detailed cost breakdown
+        """
+        scenario = self._scenario(
+            self.calculate_buying_costs,
+            years,
+            annual_market_return=annual_market_return,
+            annual_property_tax_rate=annual_property_tax_rate,
+            annual_maintenance_rate=annual_maintenance_rate,
+            annual_insurance_rate=annual_insurance_rate,
+            annual_hoa=annual_hoa,
+            closing_costs_percent=closing_costs_percent,
+            annual_appreciation_rate=annual_appreciation_rate,
+            monthly_income=monthly_income,
+            annual_inflation_rate=annual_inflation_rate,
+            monthly_investment_percentage=monthly_investment_percentage
+        )
+        sim = self._simulate(scenario, record_series=False)
+        return self._buying_costs_view(sim)
+    
     def calculate_remaining_mortgage_balance(self, years):
         """Calculate remaining mortgage balance after specified years."""
         months_paid = years * 12
         if months_paid >= self.num_payments:
             return 0
         
-        monthly_payment = self.calculate_monthly_mortgage_payment()
-        remaining_payments = self.num_payments - months_paid
-        
-        balance = monthly_payment * (
-            ((1 + self.monthly_interest_rate) ** remaining_payments - 1) /
-            (self.monthly_interest_rate * (1 + self.monthly_interest_rate) ** remaining_payments)
-        )
-        return balance
+        return self.loan_amount * self._amortization().remaining_fraction(months_paid)
     
     def calculate_investment_returns(self, years, annual_return_rate=7.0):
         """
@@ -187,7 +503,8 @@ class RentVsBuyAnalysis:
             'annual_return_rate': annual_return_rate
         }
     
-    def calculate_renting_costs(self, years, monthly_rent, annual_market_return=7.0, annual_rent_increase_rate=3.0,
+    
+    def calculate_renting_costs(self, years, monthly_rent=None, annual_market_return=7.0, annual_rent_increase_rate=3.0,
                                monthly_income=5000, annual_inflation_rate=2.5, monthly_investment_percentage=10.0):
         """
         Calculate total renting costs over specified years.
@@ -204,42 +521,22 @@ class RentVsBuyAnalysis:
         Returns:
             Dictionary with renting details
         """
-        total_rent = 0
-        for year in range(years):
-            annual_rent = monthly_rent * 12 * ((1 + annual_rent_increase_rate / 100) ** year)
-            total_rent += annual_rent
-        
-        # Calculate investment growth: down payment + monthly investments from available budget
-        monthly_return = annual_market_return / 100 / 12
-        investment_value = self.down_payment
-        
-        for year in range(years):
-            # Income increases annually with inflation
-            current_monthly_income = monthly_income * ((1 + annual_inflation_rate / 100) ** year)
-            
-            # Calculate current monthly rent
-            current_monthly_rent = monthly_rent * ((1 + annual_rent_increase_rate / 100) ** year)
-            
-            # Available budget for investment = income - rent
-            available_budget = max(0, current_monthly_income - current_monthly_rent)
-            monthly_investment_amount = available_budget * (monthly_investment_percentage / 100)
-            
-            for month in range(12):
-                # Grow existing investment
-                investment_value *= (1 + monthly_return)
-                # Add monthly investment
-                investment_value += monthly_investment_amount
-        
-        return {
-            'total_rent_paid': total_rent,
-            'investment_amount': investment_value,
-            'total_outflow': total_rent,
-            'net_position': investment_value - total_rent
-        }
+        scenario = self._scenario(
+            self.calculate_renting_costs,
+            years,
+            monthly_rent=monthly_rent,
+            annual_market_return=annual_market_return,
+            annual_rent_increase_rate=annual_rent_increase_rate,
+            monthly_income=monthly_income,
+            annual_inflation_rate=annual_inflation_rate,
+            monthly_investment_percentage=monthly_investment_percentage
+        )
+        sim = self._simulate(scenario, record_series=False)
+        return self._renting_costs_view(sim)
     
-    def calculate_monthly_costs(self, years, monthly_rent, annual_property_tax_rate=1.2, 
-                               annual_maintenance_rate=1.0, annual_insurance_rate=0.5, 
-                               annual_hoa=0, closing_costs_percent=3, annual_appreciation_rate=3.0, 
+    def calculate_monthly_costs(self, years, monthly_rent=None, annual_property_tax_rate=1.2,
+                               annual_maintenance_rate=1.0, annual_insurance_rate=0.5,
+                               annual_hoa=0, closing_costs_percent=3, annual_appreciation_rate=3.0,
                                annual_rent_increase_rate=3.0, monthly_income=5000, annual_inflation_rate=2.5,
                                monthly_investment_percentage=10.0):
         """
@@ -248,84 +545,27 @@ class RentVsBuyAnalysis:
         Returns:
             Dictionary with lists of years and average yearly costs/investments
         """
-        # Initialize lists
-        years_list = list(range(1, years + 1))
-        buy_yearly_costs = []
-        rent_yearly_costs = []
-        monthly_income_values = []
-        buy_monthly_investments = []
-        rent_monthly_investments = []
-        
-        # Buying costs
-        monthly_mortgage = self.calculate_monthly_mortgage_payment()
-        current_home_value = self.purchase_price
-        
-        for year in years_list:
-            yearly_buy_costs = 0
-            
-            for month_in_year in range(12):
-                # Monthly costs based on current home value
-                monthly_property_tax = current_home_value * (annual_property_tax_rate / 100) / 12
-                monthly_maintenance = current_home_value * (annual_maintenance_rate / 100) / 12
-                monthly_insurance = current_home_value * (annual_insurance_rate / 100) / 12
-                monthly_hoa = current_home_value * (annual_hoa / 100) / 12
-                
-                # Sum monthly costs
-                yearly_buy_costs += monthly_mortgage + monthly_property_tax + monthly_maintenance + monthly_insurance + monthly_hoa
-            
-            # Calculate average monthly cost for this year
-            avg_monthly_cost = yearly_buy_costs / 12
-            buy_yearly_costs.append(round(avg_monthly_cost, 2))
-            
-            # Update home value annually
-            current_home_value *= (1 + annual_appreciation_rate / 100)
-        
-        # Renting costs and investments
-        for year in years_list:
-            # Calculate average monthly rent for this year (accounting for annual increases)
-            current_monthly_rent = monthly_rent * ((1 + annual_rent_increase_rate / 100) ** (year - 1))
-            rent_yearly_costs.append(round(current_monthly_rent, 2))
-        
-        # Monthly income and investment values (accounting for inflation)
-        current_home_value = self.purchase_price
-        for year in years_list:
-            current_monthly_income = monthly_income * ((1 + annual_inflation_rate / 100) ** (year - 1))
-            monthly_income_values.append(round(current_monthly_income, 2))
-            
-            # For buy scenario: available budget is income minus monthly buy costs
-            monthly_mortgage = self.calculate_monthly_mortgage_payment()
-            current_home_value_for_taxes = self.purchase_price * ((1 + annual_appreciation_rate / 100) ** (year - 1))
-            monthly_property_tax = current_home_value_for_taxes * (annual_property_tax_rate / 100) / 12
-            monthly_maintenance = current_home_value_for_taxes * (annual_maintenance_rate / 100) / 12
-            monthly_insurance = current_home_value_for_taxes * (annual_insurance_rate / 100) / 12
-            monthly_hoa_cost = current_home_value_for_taxes * (annual_hoa / 100) / 12
-            
-            total_monthly_buy_cost = monthly_mortgage + monthly_property_tax + monthly_maintenance + monthly_insurance + monthly_hoa_cost
-            available_budget_buy = max(0, current_monthly_income - total_monthly_buy_cost)
-            monthly_investment_buy = available_budget_buy * (monthly_investment_percentage / 100)
-            buy_monthly_investments.append(round(monthly_investment_buy, 2))
-            
-            # For rent scenario: available budget is income minus monthly rent
-            current_monthly_rent = monthly_rent * ((1 + annual_rent_increase_rate / 100) ** (year - 1))
-            available_budget_rent = max(0, current_monthly_income - current_monthly_rent)
-            monthly_investment_rent = available_budget_rent * (monthly_investment_percentage / 100)
-            rent_monthly_investments.append(round(monthly_investment_rent, 2))
-            
-            # Update home value for next year
-            current_home_value *= (1 + annual_appreciation_rate / 100)
-        
-        return {
-            'years': years_list,
-            'buy_costs': buy_yearly_costs,
-            'rent_costs': rent_yearly_costs,
-            'monthly_income': monthly_income_values,
-            'buy_monthly_investments': buy_monthly_investments,
-            'rent_monthly_investments': rent_monthly_investments
-        }
+        scenario = self._scenario(
+            self.calculate_monthly_costs,
+            years,
+            monthly_rent=monthly_rent,
+            annual_property_tax_rate=annual_property_tax_rate,
+            annual_maintenance_rate=annual_maintenance_rate,
+            annual_insurance_rate=annual_insurance_rate,
+            annual_hoa=annual_hoa,
+            closing_costs_percent=closing_costs_percent,
+            annual_appreciation_rate=annual_appreciation_rate,
+            annual_rent_increase_rate=annual_rent_increase_rate,
+            monthly_income=monthly_income,
+            annual_inflation_rate=annual_inflation_rate,
+            monthly_investment_percentage=monthly_investment_percentage
+        )
+        sim = self._simulate(scenario)
+        return self._monthly_costs_view(sim)
     
-    def calculate_yearly_growth(self, years, monthly_rent, annual_market_return=7.0, 
-                               closing_costs_percent=3, annual_appreciation_rate=3.0, 
-                               annual_rent_increase_rate=3.0, monthly_income=5000, 
+    def calculate_yearly_growth(self, years, monthly_rent=None, annual_market_return=7.0,
+                               closing_costs_percent=3, annual_appreciation_rate=3.0,
+                               annual_rent_increase_rate=3.0, monthly_income=5000,
                                annual_inflation_rate=2.5, monthly_investment_percentage=10.0,
                                annual_property_tax_rate=1.2, annual_maintenance_rate=1.0,
                                annual_insurance_rate=0.5, annual_hoa=0):
@@ -335,147 +575,258 @@ class RentVsBuyAnalysis:
         
         Returns arrays with values for each year for charting.
         """
-        yearly_home_equity = []
-        yearly_investment_value_buy = []
-        yearly_investment_value_rent = []
-        yearly_investment_gains_buy = []
-        yearly_investment_gains_rent = []
-        monthly_return = annual_market_return / 100 / 12
-        
-        # Calculate monthly costs for both scenarios
-        monthly_mortgage = self.calculate_monthly_mortgage_payment()
-        current_home_value = self.purchase_price
+        scenario = self._scenario(
+            self.calculate_yearly_growth,
+            years,
+            monthly_rent=monthly_rent,
+            annual_market_return=annual_market_return,
+            annual_property_tax_rate=annual_property_tax_rate,
+            annual_maintenance_rate=annual_maintenance_rate,
+            annual_insurance_rate=annual_insurance_rate,
+            annual_hoa=annual_hoa,
+            closing_costs_percent=closing_costs_percent,
+            annual_appreciation_rate=annual_appreciation_rate,
+            annual_rent_increase_rate=annual_rent_increase_rate,
+            monthly_income=monthly_income,
+            annual_inflation_rate=annual_inflation_rate,
+            monthly_investment_percentage=monthly_investment_percentage
+        )
+        sim = self._simulate(scenario)
+        return self._yearly_growth_view(sim)
+    
+    def calculate_horizon_summary(self, monthly_rent, max_years=None, annual_market_return=7.0,
+                                  annual_property_tax_rate=1.2, annual_maintenance_rate=1.0,
+                                  annual_insurance_rate=0.5, annual_hoa=0, closing_costs_percent=3,
+                                  annual_appreciation_rate=3.0, annual_rent_increase_rate=3.0,
+                                  monthly_income=5000, annual_inflation_rate=2.5,
+                                  monthly_investment_percentage=10.0):
+        """
+        Summarize the buy vs rent outcome for every analysis period from 1 year up to max_years.
         
-        for year in range(1, years + 1):
-            # Calculate home equity after sales at this year
-            final_home_value = self.purchase_price * ((1 + annual_appreciation_rate / 100) ** year)
-            remaining_balance = self.calculate_remaining_mortgage_balance(year)
-            selling_costs = final_home_value * 0.06
-            equity_after_sales = final_home_value - remaining_balance - selling_costs
-            yearly_home_equity.append(round(max(0, equity_after_sales), 2))
-            
-            # Calculate investment with available budget for BUY SCENARIO
-            # Note: down payment goes to house, so investment starts at 0
-            investment_value_buy = 0
-            total_contributions_buy = 0
-            
-            for y in range(year):
-                # Income increases annually with inflation
-                current_monthly_income = monthly_income * ((1 + annual_inflation_rate / 100) ** y)
-                
-                # Calculate average monthly buy cost
-                home_value_at_year = self.purchase_price * ((1 + annual_appreciation_rate / 100) ** y)
-                monthly_property_tax = home_value_at_year * (annual_property_tax_rate / 100) / 12
-                monthly_maintenance = home_value_at_year * (annual_maintenance_rate / 100) / 12
-                monthly_insurance = home_value_at_year * (annual_insurance_rate / 100) / 12
-                monthly_hoa = home_value_at_year * (annual_hoa / 100) / 12
-                avg_monthly_buy_cost = monthly_mortgage + monthly_property_tax + monthly_maintenance + monthly_insurance + monthly_hoa
-                
-                # Calculate available budget for investment (income - cost of buying)
-                available_budget_buy = max(0, current_monthly_income - avg_monthly_buy_cost)
-                monthly_investment_amount_buy = available_budget_buy * (monthly_investment_percentage / 100)
-                
-                for month in range(12):
-                    # Grow existing investment
-                    investment_value_buy *= (1 + monthly_return)
-                    # Add monthly investment
-                    investment_value_buy += monthly_investment_amount_buy
-                    total_contributions_buy += monthly_investment_amount_buy
-            
-            yearly_investment_value_buy.append(round(investment_value_buy, 2))
-            # Calculate gains: total value minus contributions
-            gains_buy = max(0, investment_value_buy - total_contributions_buy)
-            yearly_investment_gains_buy.append(round(gains_buy, 2))
-            
-            # Calculate investment with available budget for RENT SCENARIO
-            investment_value_rent = self.down_payment
-            total_contributions_rent = self.down_payment
-            
-            for y in range(year):
-                # Income increases annually with inflation
-                current_monthly_income = monthly_income * ((1 + annual_inflation_rate / 100) ** y)
-                
-                # Calculate current rent cost
-                current_monthly_rent = monthly_rent * ((1 + annual_rent_increase_rate / 100) ** y)
-                
-                # Calculate available budget for investment (income - rent)
-                available_budget_rent = max(0, current_monthly_income - current_monthly_rent)
-                monthly_investment_amount_rent = available_budget_rent * (monthly_investment_percentage / 100)
-                
-                for month in range(12):
-                    # Grow existing investment
-                    investment_value_rent *= (1 + monthly_return)
-                    # Add monthly investment
-                    investment_value_rent += monthly_investment_amount_rent
-                    total_contributions_rent += monthly_investment_amount_rent
-            
-            yearly_investment_value_rent.append(round(investment_value_rent, 2))
-            # Calculate gains: total value minus contributions
-            gains_rent = max(0, investment_value_rent - total_contributions_rent)
-            yearly_investment_gains_rent.append(round(gains_rent, 2))
+        A single simulation up to max_years gives the same financial_advantage as calling
+        compare_scenarios once per horizon.
         
-        # Calculate combined wealth for buy scenario (home equity + investment gains)
-        yearly_buy_wealth_gains = [
-            round(yearly_home_equity[i] + yearly_investment_gains_buy[i], 2) 
-            for i in range(len(yearly_home_equity))
-        ]
+        Args:
+            monthly_rent: Initial monthly rent
+            max_years: Longest horizon to summarize (default: loan term)
+            Remaining arguments are the same as compare_scenarios
         
-        # Calculate total available cash for each scenario
-        yearly_buy_total_available = [
-            round(yearly_home_equity[i] + yearly_investment_value_buy[i], 2)
-            for i in range(len(yearly_home_equity))
+        Returns:
+            Dictionary with per-year lists and the first break-even year
+            (first year buying wins, or None) and crossover years (years
+            where the recommendation differs from the year before)
+        """
+        if max_years is None:
+            max_years = self.loan_term_years
+        
+        options = dict(
+            annual_market_return=annual_market_return,
+            annual_property_tax_rate=annual_property_tax_rate,
+            annual_maintenance_rate=annual_maintenance_rate,
+            annual_insurance_rate=annual_insurance_rate,
+            annual_hoa=annual_hoa,
+            closing_costs_percent=closing_costs_percent,
+            annual_appreciation_rate=annual_appreciation_rate,
+            annual_rent_increase_rate=annual_rent_increase_rate,
+            monthly_income=monthly_income,
+            annual_inflation_rate=annual_inflation_rate,
+            monthly_investment_percentage=monthly_investment_percentage
+        )
+        if isinstance(monthly_rent, ScenarioParams):
+            scenario = self._scenario(self.calculate_horizon_summary, monthly_rent, **options)
+            scenario = scenario.replace(years=max_years)
+        else:
+            scenario = self._scenario(self.calculate_horizon_summary, max_years, monthly_rent=monthly_rent, **options)
+        sim = self._simulate(scenario)
+        buy_net_positions = sim['series']['buy_net_position']
+        rent_net_positions = sim['series']['rent_net_position']
+        
+        years_list = list(range(1, max_years + 1))
+        financial_advantage = [buy - rent for buy, rent in zip(buy_net_positions, rent_net_positions)]
+        recommendations = ['BUY' if buy > rent else 'RENT' for buy, rent in zip(buy_net_positions, rent_net_positions)]
+        
+        break_even_year = next((year for year, rec in zip(years_list, recommendations) if rec == 'BUY'), None)
+        crossover_years = [
+            year for year, previous, current in zip(years_list[1:], recommendations, recommendations[1:])
+            if previous != current
         ]
-        yearly_rent_total_available = yearly_investment_value_rent
         
         return {
-            'years': list(range(1, years + 1)),
-            'home_equity_after_sales': yearly_home_equity,
-            'investment_growth': yearly_investment_value_rent,  # For backwards compatibility
-            'investment_growth_buy': yearly_investment_value_buy,
-            'investment_growth_rent': yearly_investment_value_rent,
-            'investment_gains_buy': yearly_investment_gains_buy,
-            'investment_gains_rent': yearly_investment_gains_rent,
-            'buy_total_available_cash': yearly_buy_total_available,
-            'rent_total_available_cash': yearly_rent_total_available,
-            'buy_wealth_gains': yearly_buy_wealth_gains
+            'years': years_list,
+            'financial_advantage': financial_advantage,
+            'buy_net_position': buy_net_positions,
+            'rent_net_position': rent_net_positions,
+            'recommendation': recommendations,
+            'break_even_year': break_even_year,
+            'crossover_years': crossover_years
         }
     
-    def compare_scenarios(self, years, monthly_rent, annual_market_return=7.0, 
+    def iter_monthly_schedule(self, years, monthly_rent=None, annual_market_return=7.0,
+                              annual_property_tax_rate=1.2, annual_maintenance_rate=1.0,
+                              annual_insurance_rate=0.5, annual_hoa=0, closing_costs_percent=3,
+                              annual_appreciation_rate=3.0, annual_rent_increase_rate=3.0,
+                              monthly_income=5000, annual_inflation_rate=2.5,
+                              monthly_investment_percentage=10.0):
+        """
+        Generate the month-by-month schedule of both scenarios, one row at a time.
+        
+        Rows are produced lazily in constant memory, so long or many schedules can be
+        streamed without building a list. Values follow the same yearly model as
+        compare_scenarios: home value, rent, income and ownership costs change once a
+        year, and both investment accounts are compounded monthly, so at each year end
+        they equal the iterative yearly_growth values.
+        
+        Args:
+            years: Analysis period in years, or a ScenarioParams
+            Remaining arguments are the same as compare_scenarios
+        
+        Returns:
+            Iterator of tuples with the SCHEDULE_COLUMNS values for months 1 .. years * 12
+        """
+        scenario = self._scenario(
+            self.iter_monthly_schedule,
+            years,
+            checked=True,
+            monthly_rent=monthly_rent,
+            annual_market_return=annual_market_return,
+            annual_property_tax_rate=annual_property_tax_rate,
+            annual_maintenance_rate=annual_maintenance_rate,
+            annual_insurance_rate=annual_insurance_rate,
+            annual_hoa=annual_hoa,
+            closing_costs_percent=closing_costs_percent,
+            annual_appreciation_rate=annual_appreciation_rate,
+            annual_rent_increase_rate=annual_rent_increase_rate,
+            monthly_income=monthly_income,
+            annual_inflation_rate=annual_inflation_rate,
+            monthly_investment_percentage=monthly_investment_percentage
+        )
+        # Arguments are checked now; rows are generated as they are consumed
+        return self._schedule_rows(scenario)
+    
+    def _schedule_rows(self, scenario):
+        """Generator behind iter_monthly_schedule."""
+        monthly_mortgage = self.calculate_monthly_mortgage_payment()
+        growth_per_month = 1 + scenario.annual_market_return / 100 / 12
+        appreciation = growth_table(scenario.annual_appreciation_rate / 100, scenario.years).factors
+        rent_increase = growth_table(scenario.annual_rent_increase_rate / 100, scenario.years).factors
+        inflation = growth_table(scenario.annual_inflation_rate / 100, scenario.years).factors
+        amortization = self._amortization()
+        investment_share = scenario.monthly_investment_percentage / 100
+        
+        balance = self.loan_amount
+        investment_buy = 0
+        investment_rent = self.down_payment
+        month = 0
+        for year in range(1, scenario.years + 1):
+            home_value = self.purchase_price * appreciation[year - 1]
+            current_monthly_rent = scenario.monthly_rent * rent_increase[year - 1]
+            current_monthly_income = scenario.monthly_income * inflation[year - 1]
+            
+            # Ownership costs for the year are based on the value at its start
+            annual_property_tax = home_value * (scenario.annual_property_tax_rate / 100)
+            annual_maintenance = home_value * (scenario.annual_maintenance_rate / 100)
+            annual_insurance = home_value * (scenario.annual_insurance_rate / 100)
+            annual_hoa_cost = home_value * (scenario.annual_hoa / 100)
+            monthly_buy_cost = monthly_mortgage + (
+                annual_property_tax + annual_maintenance + annual_insurance + annual_hoa_cost
+            ) / 12
+            buy_contribution = max(0, current_monthly_income - monthly_buy_cost) * investment_share
+            rent_contribution = max(0, current_monthly_income - current_monthly_rent) * investment_share
+            
+            for month_of_year in range(12):
+                month += 1
+                payment = monthly_mortgage if month <= self.num_payments else 0.0
+                previous_balance = balance
+                balance = self.loan_amount * amortization.remaining_fraction(month)
+                principal = previous_balance - balance
+                investment_buy = investment_buy * growth_per_month + buy_contribution
+                investment_rent = investment_rent * growth_per_month + rent_contribution
+                yield (
+                    month, year, payment, payment - principal, principal, balance, home_value,
+                    annual_property_tax / 12, annual_maintenance / 12, annual_insurance / 12,
+                    annual_hoa_cost / 12, monthly_buy_cost, current_monthly_rent, current_monthly_income,
+                    buy_contribution, investment_buy, rent_contribution, investment_rent,
+                )
+    
+    def compare_scenarios(self, years, monthly_rent=None, annual_market_return=7.0,
                          annual_property_tax_rate=1.2, annual_maintenance_rate=1.0,
                          annual_insurance_rate=0.5, annual_hoa=0, closing_costs_percent=3,
                          annual_appreciation_rate=3.0, annual_rent_increase_rate=3.0,
-                         monthly_income=5000, annual_inflation_rate=2.5, monthly_investment_percentage=10.0):
+                         monthly_income=5000, annual_inflation_rate=2.5, monthly_investment_percentage=10.0,
+                         timer=None, fields=None):
         """
         Compare buying vs renting scenarios and provide analysis.
         
+        Runs a single simulation and derives the buying, renting, monthly cost and
+        yearly growth sections from it.
+        
+        Args:
+            timer: Optional instrumentation.PhaseTimer; the 'simulate' and 'views'
+                phases are recorded on it
+            fields: Optional keys to compute up front (see COMPARE_FIELDS). The result
+                is then a LazyResults holding only those keys; any other key is computed
+                on first access. Unless 'monthly_costs' or 'yearly_growth' is requested
+                or accessed, the per-year series are never built.
+        
         Returns:
             Dictionary with comparison results
         """
-        buying_costs = self.calculate_buying_costs(
-            years, annual_property_tax_rate, annual_maintenance_rate,
-            annual_insurance_rate, annual_hoa, closing_costs_percent, annual_appreciation_rate,
-            monthly_income, annual_inflation_rate, monthly_investment_percentage, annual_market_return
+        if fields is not None:
+            fields = tuple(fields)
+            unknown = [name for name in fields if name not in COMPARE_FIELDS]
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        
+        scenario = self._scenario(
+            self.compare_scenarios,
+            years,
+            monthly_rent=monthly_rent,
+            annual_market_return=annual_market_return,
+            annual_property_tax_rate=annual_property_tax_rate,
+            annual_maintenance_rate=annual_maintenance_rate,
+            annual_insurance_rate=annual_insurance_rate,
+            annual_hoa=annual_hoa,
+            closing_costs_percent=closing_costs_percent,
+            annual_appreciation_rate=annual_appreciation_rate,
+            annual_rent_increase_rate=annual_rent_increase_rate,
+            monthly_income=monthly_income,
+            annual_inflation_rate=annual_inflation_rate,
+            monthly_investment_percentage=monthly_investment_percentage
         )
-        
-        renting_costs = self.calculate_renting_costs(years, monthly_rent, annual_market_return, annual_rent_increase_rate,
-                                                     monthly_income, annual_inflation_rate, monthly_investment_percentage)
-        
-        # Get monthly cost data for charting
-        monthly_costs = self.calculate_monthly_costs(
-            years, monthly_rent, annual_property_tax_rate, annual_maintenance_rate,
-            annual_insurance_rate, annual_hoa, closing_costs_percent, annual_appreciation_rate,
-            annual_rent_increase_rate, monthly_income, annual_inflation_rate, monthly_investment_percentage
-        )
-        
-        # Get yearly equity and investment growth data for charting
-        yearly_growth = self.calculate_yearly_growth(
-            years, monthly_rent, annual_market_return, closing_costs_percent,
-            annual_appreciation_rate, annual_rent_increase_rate, monthly_income,
-            annual_inflation_rate, monthly_investment_percentage,
-            annual_property_tax_rate, annual_maintenance_rate,
-            annual_insurance_rate, annual_hoa
-        )
-        
+        record_series = fields is None or any(name in SERIES_SECTIONS for name in fields)
+        with timer.phase('simulate') if timer else nullcontext():
+            sim = self._simulate(scenario, record_series=record_series)
+        
+        with timer.phase('views') if timer else nullcontext():
+            summary = self._comparison_view(sim)
+            if fields is None:
+                # Get monthly cost and yearly equity/investment growth data for charting
+                summary['monthly_costs'] = self._monthly_costs_view(sim)
+                summary['yearly_growth'] = self._yearly_growth_view(sim)
+                return summary
+            
+            def series_sim():
+                # Headline-only runs simulate again, with series, on first series access
+                nonlocal sim
+                if sim['series'] is None:
+                    sim = self._simulate(scenario)
+                return sim
+            
+            loaders = {name: (lambda name=name: summary[name]) for name in summary}
+            loaders['monthly_costs'] = lambda: self._monthly_costs_view(series_sim())
+            loaders['yearly_growth'] = lambda: self._yearly_growth_view(series_sim())
+            results = LazyResults(loaders)
+            for name in fields:
+                results[name]
+            return results
+    
+    def _comparison_view(self, sim):
+        """Build the compare_scenarios headline keys (everything but the series sections)."""
+        return self._summary_view(sim['years'], self._buying_costs_view(sim), self._renting_costs_view(sim))
+    
+    @staticmethod
+    def _summary_view(years, buying_costs, renting_costs):
+        """Build the compare_scenarios headline keys from the buying and renting views."""
         # Net position comparison
         buy_net_cost = buying_costs['net_cost']
         rent_net_cost = renting_costs['total_outflow']  # Total rent paid (actual cost)
@@ -496,11 +847,8 @@ class RentVsBuyAnalysis:
             'recommendation': 'BUY' if buy_net_position > rent_net_position else 'RENT',
             'advantage_amount': abs(position_advantage),
             'advantage_description': f"Buying is better by ${abs(position_advantage):,.2f}" if position_advantage > 0 else f"Renting is better by ${abs(position_advantage):,.2f}",
-            'monthly_costs': monthly_costs,
-            'yearly_growth': yearly_growth
         }
 
-
 def print_analysis_report(analysis_results):
     """Print a formatted analysis report."""
     print("\n" + "=" * 80)
@@ -0,0 +1,111 @@
+"""
+In-process result cache for Rent vs Buy Analysis
+Bounded LRU cache with optional time-to-live and hit/miss/eviction counters.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+def canonical_key(params):
+    """
+    Build a cache key from request parameters.
+    
+    Numbers are converted to exact floats (and -0.0 becomes 0.0), so equivalent
+    requests such as {"annual_hoa": 0} and {"annual_hoa": 0.0} share an entry
+    while distinct values never do. Keys are sorted by parameter name.
+    """
+    items = []
+    for name in sorted(params):
+        value = params[name]
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = float(value) + 0.0
+        items.append((name, value))
+    return tuple(items)
+
+
+class ResultCache:
+    """Thread-safe LRU cache with an optional time-to-live per entry."""
+    
+    def __init__(self, max_size=1024, ttl_seconds=None):
+        """
+        Args:
+            max_size: Maximum number of entries before the least recently used is evicted
+            ttl_seconds: Seconds an entry stays valid (None keeps entries until evicted)
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def get(self, key):
+        """Return the cached value for key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            value, stored_at = entry
+            if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def pop(self, key):
+        """Remove and return the cached value for key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            value, stored_at = entry
+            if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+                self.expirations += 1
+                self.misses += 1
+                return None
+            
+            self.hits += 1
+            return value
+    
+    def put(self, key, value):
+        """Store value under key, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        """Remove all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """Return cache counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,177 @@
+"""
+Scenario parameters for Rent vs Buy Analysis
+An immutable, hashable value object holding the per-scenario inputs that
+RentVsBuyAnalysis methods take as keyword arguments.
+"""
+
+import math
+from array import array
+
+# Inputs in canonical order (analysis period first)
+SCENARIO_PARAM_FIELDS = (
+    'years', 'monthly_rent', 'annual_market_return', 'annual_property_tax_rate',
+    'annual_maintenance_rate', 'annual_insurance_rate', 'annual_hoa', 'closing_costs_percent',
+    'annual_appreciation_rate', 'annual_rent_increase_rate', 'monthly_income',
+    'annual_inflation_rate', 'monthly_investment_percentage',
+)
+
+# Amounts and cost rates that cannot be negative
+NON_NEGATIVE_FIELDS = (
+    'monthly_rent', 'annual_property_tax_rate', 'annual_maintenance_rate', 'annual_insurance_rate',
+    'annual_hoa', 'closing_costs_percent', 'monthly_income', 'monthly_investment_percentage',
+)
+
+# Growth rates (percent per year) that must stay above -100%
+GROWTH_RATE_FIELDS = (
+    'annual_market_return', 'annual_appreciation_rate', 'annual_rent_increase_rate', 'annual_inflation_rate',
+)
+
+
+class ScenarioParams:
+    """
+    Frozen scenario inputs with validation and a canonical hash.
+    
+    Values are stored as floats (years as an int), with -0.0 stored as 0.0, so
+    equal scenarios compare and hash equal however their numbers were spelled.
+    Instances can be passed to RentVsBuyAnalysis methods in place of `years`
+    and the keyword arguments, used as cache keys, and copied with replace().
+    """
+    
+    __slots__ = SCENARIO_PARAM_FIELDS + ('_hash',)
+    
+    def __init__(self, years=10, monthly_rent=0.0, annual_market_return=7.0,
+                 annual_property_tax_rate=1.2, annual_maintenance_rate=1.0,
+                 annual_insurance_rate=0.5, annual_hoa=0.0, closing_costs_percent=3.0,
+                 annual_appreciation_rate=3.0, annual_rent_increase_rate=3.0,
+                 monthly_income=5000.0, annual_inflation_rate=2.5, monthly_investment_percentage=10.0):
+        """
+        Args:
+            years: Analysis period in whole years
+            Remaining arguments are the same as RentVsBuyAnalysis.compare_scenarios
+        
+        Raises:
+            ValueError: If a value is not finite or out of range
+        """
+        values = (years, monthly_rent, annual_market_return, annual_property_tax_rate,
+                  annual_maintenance_rate, annual_insurance_rate, annual_hoa, closing_costs_percent,
+                  annual_appreciation_rate, annual_rent_increase_rate, monthly_income,
+                  annual_inflation_rate, monthly_investment_percentage)
+        self._assign(self._validate(values))
+    
+    def _assign(self, values):
+        for name, value in zip(SCENARIO_PARAM_FIELDS, values):
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, '_hash', hash(values))
+    
+    @staticmethod
+    def _validate(values):
+        """Normalize and check values given in SCENARIO_PARAM_FIELDS order."""
+        normalized = []
+        for name, value in zip(SCENARIO_PARAM_FIELDS, values):
+            try:
+                number = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{name} must be a number")
+            if not math.isfinite(number):
+                raise ValueError(f"{name} must be finite")
+            if name == 'years':
+                if not number.is_integer() or number < 0:
+                    raise ValueError("years must be a non-negative whole number")
+                normalized.append(int(number))
+                continue
+            if name in NON_NEGATIVE_FIELDS and number < 0:
+                raise ValueError(f"{name} cannot be negative")
+            if name in GROWTH_RATE_FIELDS and number <= -100:
+                raise ValueError(f"{name} must be above -100")
+            normalized.append(number + 0.0)
+        if normalized[-1] > 100:
+            raise ValueError("monthly_investment_percentage cannot exceed 100")
+        return tuple(normalized)
+    
+    @classmethod
+    def from_mapping(cls, mapping):
+        """
+        Build from a mapping such as an /api/analyze request.
+        
+        'analysis_years' is read as years; keys that are not scenario inputs
+        (purchase_price, loan terms, ...) are ignored.
+        """
+        values = {name: mapping[name] for name in SCENARIO_PARAM_FIELDS if name in mapping}
+        if 'years' not in values and 'analysis_years' in mapping:
+            values['years'] = mapping['analysis_years']
+        return cls(**values)
+    
+    @classmethod
+    def unchecked(cls, years, **kwargs):
+        """
+        Build for a RentVsBuyAnalysis keyword-argument call, without the range checks.
+        
+        The keyword signatures predate ScenarioParams and compute with whatever
+        values they are given (negative amounts, an investment percentage above
+        100, ...), so only the number normalization is applied. Fields not given
+        take the ScenarioParams defaults.
+        """
+        unknown = [name for name in kwargs if name not in SCENARIO_PARAM_FIELDS]
+        if unknown:
+            raise TypeError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        # Whole-number years become ints; other values reach the engine as before
+        number = float(years)
+        values = [int(number) if number.is_integer() else years]
+        values += [float(kwargs.get(name, getattr(_DEFAULTS, name))) + 0.0 for name in SCENARIO_PARAM_FIELDS[1:]]
+        params = object.__new__(cls)
+        params._assign(tuple(values))
+        return params
+    
+    @classmethod
+    def from_array(cls, values):
+        """Build from a sequence in SCENARIO_PARAM_FIELDS order (see to_array)."""
+        if len(values) != len(SCENARIO_PARAM_FIELDS):
+            raise ValueError(f"Expected {len(SCENARIO_PARAM_FIELDS)} values")
+        return cls(*values)
+    
+    def as_tuple(self):
+        """Values in SCENARIO_PARAM_FIELDS order."""
+        return tuple(getattr(self, name) for name in SCENARIO_PARAM_FIELDS)
+    
+    def as_dict(self):
+        """Values by field name (keyword arguments for RentVsBuyAnalysis methods)."""
+        return {name: getattr(self, name) for name in SCENARIO_PARAM_FIELDS}
+    
+    def to_array(self):
+        """Values as a compact float64 array.array in SCENARIO_PARAM_FIELDS order."""
+        return array('d', self.as_tuple())
+    
+    def replace(self, **changes):
+        """Copy with some fields changed (the copy is validated like a new instance)."""
+        unknown = [name for name in changes if name not in SCENARIO_PARAM_FIELDS]
+        if unknown:
+            raise TypeError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        values = tuple(changes.get(name, getattr(self, name)) for name in SCENARIO_PARAM_FIELDS)
+        copy = object.__new__(type(self))
+        copy._assign(self._validate(values))
+        return copy
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("ScenarioParams is immutable; use replace()")
+    
+    def __delattr__(self, name):
+        raise AttributeError("ScenarioParams is immutable")
+    
+    def __eq__(self, other):
+        if not isinstance(other, ScenarioParams):
+            return NotImplemented
+        return self._hash == other._hash and self.as_tuple() == other.as_tuple()
+    
+    def __hash__(self):
+        return self._hash
+    
+    def __reduce__(self):
+        return (type(self), self.as_tuple())
+    
+    def __repr__(self):
+        values = ', '.join(f"{name}={getattr(self, name)!r}" for name in SCENARIO_PARAM_FIELDS)
+        return f"ScenarioParams({values})"
+
+
+# Defaults for fields left out of ScenarioParams.unchecked
+_DEFAULTS = ScenarioParams()
@@ -0,0 +1,98 @@
+"""
+Streaming schedule export for Rent vs Buy Analysis
+Encodes monthly schedule rows as CSV or NDJSON a chunk at a time, so a response
+can be sent with chunked transfer encoding without ever holding a whole schedule.
+"""
+
+import csv
+import io
+import json
+
+CSV_MIMETYPE = 'text/csv'
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# Export format names accepted by ?format=, with their content types
+SCHEDULE_FORMATS = {
+    'csv': CSV_MIMETYPE,
+    'ndjson': NDJSON_MIMETYPE,
+}
+
+# Rows encoded into each yielded chunk
+CHUNK_ROWS = 512
+
+
+def negotiate_schedule_format(format_name=None, accept_mimetypes=None):
+    """
+    Choose an export format from a ?format= value or the Accept header.
+    
+    Args:
+        format_name: Explicit format from SCHEDULE_FORMATS (takes precedence)
+        accept_mimetypes: werkzeug MIMEAccept of the request, if any
+    
+    Returns:
+        Key of SCHEDULE_FORMATS ('csv' unless NDJSON is asked for)
+    """
+    if format_name:
+        if format_name not in SCHEDULE_FORMATS:
+            raise ValueError(f"Unknown format: {format_name} (expected one of {', '.join(SCHEDULE_FORMATS)})")
+        return format_name
+    if accept_mimetypes is not None and accept_mimetypes.best_match(
+            [CSV_MIMETYPE, NDJSON_MIMETYPE], default=CSV_MIMETYPE) == NDJSON_MIMETYPE:
+        return 'ndjson'
+    return 'csv'
+
+
+def _rounded(row, decimals):
+    return [round(value, decimals) if isinstance(value, float) else value for value in row]
+
+
+def iter_csv(rows, columns, decimals=2, chunk_rows=CHUNK_ROWS):
+    """
+    Encode rows as CSV text chunks (header first).
+    
+    Args:
+        rows: Iterable of row tuples in `columns` order (consumed lazily)
+        columns: Column names
+        decimals: Decimal places for floats
+        chunk_rows: Rows per yielded chunk
+    
+    Yields:
+        CSV text chunks
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(columns)
+    pending = 0
+    for row in rows:
+        writer.writerow(_rounded(row, decimals))
+        pending += 1
+        if pending == chunk_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_ndjson(rows, columns, decimals=2, chunk_rows=CHUNK_ROWS):
+    """
+    Encode rows as newline-delimited JSON objects keyed by column name.
+    
+    Args:
+        rows: Iterable of row tuples in `columns` order (consumed lazily)
+        columns: Column names
+        decimals: Decimal places for floats
+        chunk_rows: Rows per yielded chunk
+    
+    Yields:
+        NDJSON text chunks
+    """
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(columns, _rounded(row, decimals))), separators=(',', ':')))
+        if len(lines) == chunk_rows:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
@@ -0,0 +1,109 @@
+"""
+Sensitivity (tornado) analysis for Rent vs Buy Analysis
+Bumps each input up and down and ranks the change in financial advantage,
+evaluating every perturbed scenario in one vectorized batch.
+"""
+
+import math
+
+from batch_engine import compare_scenarios_batch, find_invalid_scenarios, prepare_columns
+
+# Default bump sizes (absolute amounts, in each input's own units)
+DEFAULT_BUMPS = {
+    'annual_interest_rate': 1.0,
+    'monthly_rent': 100,
+    'annual_market_return': 1.0,
+    'annual_property_tax_rate': 0.25,
+    'annual_maintenance_rate': 0.25,
+    'annual_insurance_rate': 0.1,
+    'annual_hoa': 0.1,
+    'closing_costs_percent': 1.0,
+    'annual_appreciation_rate': 1.0,
+    'annual_rent_increase_rate': 1.0,
+    'monthly_income': 500,
+    'annual_inflation_rate': 1.0,
+    'monthly_investment_percentage': 5.0,
+}
+
+# Inputs that may be bumped below zero (growth and return rates)
+SIGNED_FIELDS = ('annual_market_return', 'annual_appreciation_rate',
+                 'annual_rent_increase_rate', 'annual_inflation_rate')
+
+
+def sensitivity_analysis(params, bumps=None):
+    """
+    Measure how financial_advantage responds to each input moving down and up.
+    
+    The base scenario and two perturbed scenarios per input are evaluated
+    together with compare_scenarios_batch.
+    
+    Args:
+        params: Base scenario as a mapping of batch_engine.SCENARIO_FIELDS
+        bumps: Mapping of input name to bump size (default: DEFAULT_BUMPS)
+    
+    Returns:
+        Dictionary with the base result and one entry per input, ranked by
+        the largest absolute change in financial_advantage
+    
+    Raises:
+        ValueError: If an input is unknown, or a bump is not finite or moves its
+            input out of range (e.g. a zero loan term or a down payment above
+            the purchase price)
+    """
+    if bumps is None:
+        bumps = DEFAULT_BUMPS
+    
+    unknown = [name for name in bumps if name not in params]
+    if unknown:
+        raise ValueError(f"Unknown sensitivity inputs: {', '.join(sorted(unknown))}")
+    not_finite = [name for name, bump in bumps.items() if not math.isfinite(bump)]
+    if not_finite:
+        raise ValueError(f"Sensitivity bumps must be finite: {', '.join(sorted(not_finite))}")
+    
+    # Row 0 is the base scenario, then a (low, high) pair per input
+    fields = list(bumps)
+    columns = {name: [value] * (1 + 2 * len(fields)) for name, value in params.items()}
+    for index, name in enumerate(fields):
+        low = params[name] - bumps[name]
+        if name not in SIGNED_FIELDS:
+            low = max(0, low)
+        columns[name][1 + 2 * index] = low
+        columns[name][2 + 2 * index] = params[name] + bumps[name]
+    
+    # Bumped scenarios must pass the same checks as the base one
+    count, arrays = prepare_columns(columns)
+    invalid = find_invalid_scenarios(arrays)
+    if len(invalid):
+        if invalid[0] == 0:
+            raise ValueError("Base scenario fails the input checks")
+        names = sorted({fields[(row - 1) // 2] for row in invalid})
+        raise ValueError(f"Sensitivity bumps move inputs out of range: {', '.join(names)}")
+    
+    results = compare_scenarios_batch(arrays, include_series=False)
+    advantage = results['financial_advantage']
+    recommendation = results['recommendation']
+    base_advantage = float(advantage[0])
+    
+    inputs = []
+    for index, name in enumerate(fields):
+        low_row, high_row = 1 + 2 * index, 2 + 2 * index
+        low_change = float(advantage[low_row]) - base_advantage
+        high_change = float(advantage[high_row]) - base_advantage
+        inputs.append({
+            'input': name,
+            'bump': bumps[name],
+            'low_value': columns[name][low_row],
+            'high_value': columns[name][high_row],
+            'low_change': low_change,
+            'high_change': high_change,
+            'swing': max(abs(low_change), abs(high_change)),
+            'low_recommendation': str(recommendation[low_row]),
+            'high_recommendation': str(recommendation[high_row]),
+        })
+    inputs.sort(key=lambda entry: entry['swing'], reverse=True)
+    
+    return {
+        'base_financial_advantage': base_advantage,
+        'base_recommendation': str(recommendation[0]),
+        'inputs': inputs,
+    }
@@ -0,0 +1,115 @@
+"""
+In-memory static page serving for Rent vs Buy Analysis
+Loads a page once, keeps identity, gzip and (when the brotli package is
+installed) brotli variants with strong ETags, and answers conditional requests
+without touching the filesystem.
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+import time
+
+try:
+    import brotli
+except ImportError:  # Optional: brotli variants are skipped without it
+    brotli = None
+
+# Preferred order when a client accepts several encodings
+ENCODINGS = ('br', 'gzip', 'identity')
+
+
+class PageVariants:
+    """Encoded bodies and ETags of one version of a page."""
+    
+    def __init__(self, content, mtime=None, size=None):
+        """
+        Args:
+            content: Page bytes
+            mtime: Modification time of the source file (for reload checks)
+            size: Size of the source file (for reload checks)
+        """
+        self.mtime = mtime
+        self.size = size
+        digest = hashlib.sha256(content).hexdigest()[:32]
+        self.bodies = {'identity': content, 'gzip': gzip.compress(content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.bodies['br'] = brotli.compress(content, mode=brotli.MODE_TEXT, quality=11)
+        # Strong ETags (unquoted), one per encoded representation
+        self.etags = {
+            encoding: digest if encoding == 'identity' else f"{digest}-{encoding}"
+            for encoding in self.bodies
+        }
+    
+    def choose(self, accepts):
+        """
+        Pick the best available encoding.
+        
+        Args:
+            accepts: Callable returning the client's quality (0 to 1) for an encoding
+        
+        Returns:
+            Encoding name from ENCODINGS
+        """
+        best, best_quality = 'identity', 0
+        for encoding in ENCODINGS:
+            if encoding in self.bodies and encoding != 'identity':
+                quality = accepts(encoding)
+                if quality > best_quality:
+                    best, best_quality = encoding, quality
+        return best
+
+
+class StaticPage:
+    """
+    A page file held in memory.
+    
+    The first existing path in `paths` is read once. With `reload_interval`,
+    the file's mtime and size are checked at most once per interval and the
+    variants rebuilt when they change; with None the file is never re-read.
+    """
+    
+    def __init__(self, paths, reload_interval=None):
+        """
+        Args:
+            paths: Candidate file paths, in order of preference
+            reload_interval: Seconds between change checks (None disables reloading)
+        """
+        self.paths = list(paths)
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._checked = time.monotonic()
+        self._path, self._variants = self._load()
+    
+    def _load(self):
+        for path in self.paths:
+            try:
+                with open(path, 'rb') as handle:
+                    content = handle.read()
+                    stat = os.fstat(handle.fileno())
+            except FileNotFoundError:
+                continue
+            return path, PageVariants(content, stat.st_mtime, stat.st_size)
+        raise FileNotFoundError(f"None of these files exist: {', '.join(self.paths)}")
+    
+    def variants(self):
+        """Current PageVariants, reloaded first if the file changed and a check is due."""
+        if self.reload_interval is None or time.monotonic() - self._checked < self.reload_interval:
+            return self._variants
+        
+        with self._lock:
+            if time.monotonic() - self._checked >= self.reload_interval:
+                self._checked = time.monotonic()
+                try:
+                    stat = os.stat(self._path)
+                    changed = (stat.st_mtime, stat.st_size) != (self._variants.mtime, self._variants.size)
+                except FileNotFoundError:
+                    changed = True
+                if changed:
+                    try:
+                        self._path, self._variants = self._load()
+                    except FileNotFoundError:
+                        # Keep serving the last good version
+                        pass
+        return self._variants
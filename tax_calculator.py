@@ -3,6 +3,110 @@ Tax Calculator for Affordability Analysis
 Calculates federal and state income taxes based on gross income
 """
 
+from bisect import bisect_right
+
+import numpy as np
+
+# Filing statuses with their own federal schedule ('married' is married filing jointly)
+FILING_STATUSES = ('single', 'married', 'married_separate', 'head_of_household')
+
+# Other accepted spellings of FILING_STATUSES
+FILING_STATUS_ALIASES = {
+    'married_jointly': 'married',
+    'married_filing_jointly': 'married',
+    'married_filing_separately': 'married_separate',
+    'hoh': 'head_of_household',
+}
+
+
+def normalize_filing_status(filing_status):
+    """
+    Canonical filing status name.
+    
+    Args:
+        filing_status: Name from FILING_STATUSES or FILING_STATUS_ALIASES, in any
+            case, with spaces or hyphens in place of underscores
+    
+    Returns:
+        Key of FILING_STATUSES ('single' for unknown names, as before)
+    """
+    name = str(filing_status).strip().lower().replace(' ', '_').replace('-', '_')
+    name = FILING_STATUS_ALIASES.get(name, name)
+    return name if name in FILING_STATUSES else 'single'
+
+
+class CompiledBrackets:
+    """
+    Progressive tax schedule compiled for constant-work lookup.
+    
+    Brackets are turned into sorted lower bounds with the tax owed at each bound,
+    so the tax on any income is one binary search plus one multiply-add instead
+    of a walk over the brackets.
+    
+    Attributes:
+        deduction: Amount subtracted from income before the brackets apply
+        thresholds: Tuple of bracket lower bounds of taxable income, starting at 0
+        rates: Tuple of marginal rates, one per threshold
+        base_tax: Tuple of cumulative tax owed at each threshold
+    """
+    
+    __slots__ = ('deduction', 'thresholds', 'rates', 'base_tax', '_arrays')
+    
+    def __init__(self, brackets, deduction=0):
+        """
+        Args:
+            brackets: List of (upper limit, rate) pairs in increasing limit order, the
+                last limit float('inf') (the format of FEDERAL_BRACKETS_SINGLE_2024)
+            deduction: Amount subtracted from income before the brackets apply
+        
+        Raises:
+            ValueError: If the brackets are empty, unsorted or do not end at infinity
+        """
+        if not brackets or brackets[-1][0] != float('inf'):
+            raise ValueError("Brackets must end with an unbounded (float('inf')) bracket")
+        thresholds = [0]
+        rates = []
+        base_tax = [0]
+        for limit, rate in brackets:
+            if limit <= thresholds[-1]:
+                raise ValueError("Bracket limits must be increasing and positive")
+            rates.append(rate)
+            if limit != float('inf'):
+                base_tax.append(base_tax[-1] + (limit - thresholds[-1]) * rate)
+                thresholds.append(limit)
+        self.deduction = deduction
+        self.thresholds = tuple(thresholds)
+        self.rates = tuple(rates)
+        self.base_tax = tuple(base_tax)
+        self._arrays = tuple(np.array(values, dtype=np.float64) for values in (thresholds, rates, base_tax))
+    
+    def _bracket(self, taxable_income):
+        return bisect_right(self.thresholds, taxable_income) - 1
+    
+    def tax(self, income):
+        """Tax owed on an income (before the deduction)."""
+        taxable_income = income - self.deduction
+        if taxable_income <= 0:
+            return 0
+        index = self._bracket(taxable_income)
+        return self.base_tax[index] + (taxable_income - self.thresholds[index]) * self.rates[index]
+    
+    def tax_array(self, incomes):
+        """Vectorized tax(): tax owed on each income of an array."""
+        thresholds, rates, base_tax = self._arrays
+        taxable_income = np.asarray(incomes, dtype=np.float64) - self.deduction
+        index = np.maximum(np.searchsorted(thresholds, taxable_income, side='right') - 1, 0)
+        tax = base_tax[index] + (taxable_income - thresholds[index]) * rates[index]
+        return np.where(taxable_income > 0, tax, 0.0)
+    
+    def marginal_rate(self, income):
+        """Rate applied to the next dollar of an income (0 below the deduction)."""
+        taxable_income = income - self.deduction
+        if taxable_income < 0:
+            return 0
+        return self.rates[self._bracket(taxable_income)]
+
+
 class TaxCalculator:
     # 2024 Federal Tax Brackets (Single Filer)
     FEDERAL_BRACKETS_SINGLE_2024 = [
@@ -26,9 +130,51 @@ class TaxCalculator:
         (float('inf'), 0.37) # 37% above $731,200
     ]
     
+    # 2024 Federal Tax Brackets (Married Filing Separately)
+    FEDERAL_BRACKETS_MARRIED_SEPARATE_2024 = [
+        (11600, 0.10),      # 10% up to $11,600
+        (47150, 0.12),      # 12% up to $47,150
+        (100525, 0.22),     # 22% up to $100,525
+        (191950, 0.24),     # 24% up to $191,950
+        (243725, 0.32),     # 32% up to $243,725
+        (365600, 0.35),     # 35% up to $365,600
+        (float('inf'), 0.37) # 37% above $365,600
+    ]
+    
+    # 2024 Federal Tax Brackets (Head of Household)
+    FEDERAL_BRACKETS_HEAD_OF_HOUSEHOLD_2024 = [
+        (16550, 0.10),      # 10% up to $16,550
+        (63100, 0.12),      # 12% up to $63,100
+        (100500, 0.22),     # 22% up to $100,500
+        (191950, 0.24),     # 24% up to $191,950
+        (243700, 0.32),     # 32% up to $243,700
+        (609350, 0.35),     # 35% up to $609,350
+        (float('inf'), 0.37) # 37% above $609,350
+    ]
+    
     # Standard deduction for 2024
     STANDARD_DEDUCTION_SINGLE_2024 = 14600
     STANDARD_DEDUCTION_MARRIED_2024 = 29200
+    STANDARD_DEDUCTION_MARRIED_SEPARATE_2024 = 14600
+    STANDARD_DEDUCTION_HEAD_OF_HOUSEHOLD_2024 = 21900
+    
+    # 2024 FICA rates; Social Security stops at the wage base and the additional
+    # Medicare tax applies to income over its threshold
+    SOCIAL_SECURITY_RATE = 0.062
+    SOCIAL_SECURITY_WAGE_BASE_2024 = 168600
+    MEDICARE_RATE = 0.0145
+    ADDITIONAL_MEDICARE_RATE = 0.009
+    ADDITIONAL_MEDICARE_THRESHOLD = 200000
+    
+    # Federal schedules compiled once at import, by filing status
+    FEDERAL_SCHEDULES = {
+        'single': CompiledBrackets(FEDERAL_BRACKETS_SINGLE_2024, STANDARD_DEDUCTION_SINGLE_2024),
+        'married': CompiledBrackets(FEDERAL_BRACKETS_MARRIED_2024, STANDARD_DEDUCTION_MARRIED_2024),
+        'married_separate': CompiledBrackets(FEDERAL_BRACKETS_MARRIED_SEPARATE_2024,
+                                             STANDARD_DEDUCTION_MARRIED_SEPARATE_2024),
+        'head_of_household': CompiledBrackets(FEDERAL_BRACKETS_HEAD_OF_HOUSEHOLD_2024,
+                                              STANDARD_DEDUCTION_HEAD_OF_HOUSEHOLD_2024),
+    }
     
     # State tax rates (simplified flat rates or brackets)
     STATE_TAX_RATES = {
@@ -84,62 +230,72 @@ class TaxCalculator:
         'WY': 0.00,  # Wyoming (no income tax)
     }
     
+    # State schedules compiled once at import: state code -> {filing status: CompiledBrackets}.
+    # Every state starts with its flat rate applied to gross income as the 'single'
+    # schedule, which other filing statuses fall back to; set_state_brackets()
+    # replaces it with progressive brackets.
+    STATE_SCHEDULES = {
+        state: {'single': CompiledBrackets([(float('inf'), rate)])}
+        for state, rate in STATE_TAX_RATES.items()
+    }
+    
     @staticmethod
-    def calculate_federal_tax(annual_income, filing_status='single'):
-        """Calculate federal income tax using 2024 brackets"""
-        # Select appropriate brackets and standard deduction
-        if filing_status.lower() == 'married':
-            brackets = TaxCalculator.FEDERAL_BRACKETS_MARRIED_2024
-            standard_deduction = TaxCalculator.STANDARD_DEDUCTION_MARRIED_2024
-        else:
-            brackets = TaxCalculator.FEDERAL_BRACKETS_SINGLE_2024
-            standard_deduction = TaxCalculator.STANDARD_DEDUCTION_SINGLE_2024
-        
-        if annual_income <= standard_deduction:
-            return 0
-        
-        taxable_income = annual_income - standard_deduction
-        tax = 0
-        previous_limit = 0
-        
-        for limit, rate in brackets:
-            if taxable_income <= previous_limit:
-                break
-            
-            taxable_in_bracket = min(taxable_income, limit) - previous_limit
-            tax += taxable_in_bracket * rate
-            previous_limit = limit
+    def federal_schedule(filing_status='single'):
+        """Compiled federal schedule for a filing status (see normalize_filing_status)."""
+        return TaxCalculator.FEDERAL_SCHEDULES[normalize_filing_status(filing_status)]
+    
+    @staticmethod
+    def state_schedule(state_code, filing_status='single'):
+        """
+        Compiled state schedule for a state and filing status.
         
-        return max(0, tax)
+        Unknown states use California's schedule; filing statuses without their own
+        schedule use the state's 'single' schedule.
+        """
+        schedules = TaxCalculator.STATE_SCHEDULES.get(state_code) or TaxCalculator.STATE_SCHEDULES['CA']
+        return schedules.get(normalize_filing_status(filing_status), schedules['single'])
     
     @staticmethod
-    def calculate_state_tax(annual_income, state_code):
-        """Calculate state income tax"""
-        if state_code not in TaxCalculator.STATE_TAX_RATES:
-            state_code = 'CA'  # Default to California if invalid state
+    def set_state_brackets(state_code, brackets, filing_status='single', deduction=0):
+        """
+        Use progressive brackets for a state's income tax.
         
-        # Simplified calculation - apply state rate to gross income
-        # In reality, some states have deductions and brackets
-        state_rate = TaxCalculator.STATE_TAX_RATES[state_code]
-        return annual_income * state_rate
+        Args:
+            state_code: Two-letter state code (added if not yet known)
+            brackets: List of (upper limit, rate) pairs, as for the federal brackets
+            filing_status: Filing status the brackets apply to ('single' is also the
+                fallback for statuses without their own brackets)
+            deduction: Amount subtracted from gross income before the brackets apply
+        """
+        schedule = CompiledBrackets(brackets, deduction)
+        state_schedules = TaxCalculator.STATE_SCHEDULES.setdefault(state_code, {'single': schedule})
+        state_schedules[normalize_filing_status(filing_status)] = schedule
+    
+    @staticmethod
+    def calculate_federal_tax(annual_income, filing_status='single'):
+        """Calculate federal income tax using 2024 brackets"""
+        return TaxCalculator.federal_schedule(filing_status).tax(annual_income)
+    
+    @staticmethod
+    def calculate_state_tax(annual_income, state_code, filing_status='single'):
+        """Calculate state income tax (unknown states default to California)"""
+        # Flat-rate states apply their rate to gross income; progressive states use
+        # brackets registered with set_state_brackets
+        return TaxCalculator.state_schedule(state_code, filing_status).tax(annual_income)
     
     @staticmethod
     def calculate_fica_taxes(annual_income):
         """Calculate FICA taxes (Social Security and Medicare)"""
-        social_security_rate = 0.062
-        medicare_rate = 0.0145
-        additional_medicare_rate = 0.009  # For income over $200,000
-        
-        # Social Security is capped at $168,600 (2024)
-        ss_wage_base = 168600
-        ss_tax = min(annual_income, ss_wage_base) * social_security_rate
+        # Social Security is capped at the wage base ($168,600 in 2024)
+        ss_tax = min(annual_income, TaxCalculator.SOCIAL_SECURITY_WAGE_BASE_2024) * TaxCalculator.SOCIAL_SECURITY_RATE
         
         # Medicare taxes
-        medicare_tax = annual_income * medicare_rate
+        medicare_tax = annual_income * TaxCalculator.MEDICARE_RATE
         
         # Additional Medicare tax for high earners
-        if annual_income > 200000:
-            additional_medicare = (annual_income - 200000) * additional_medicare_rate
+        if annual_income > TaxCalculator.ADDITIONAL_MEDICARE_THRESHOLD:
+            additional_medicare = ((annual_income - TaxCalculator.ADDITIONAL_MEDICARE_THRESHOLD)
+                                   * TaxCalculator.ADDITIONAL_MEDICARE_RATE)
         else:
             additional_medicare = 0
         
@@ -154,13 +310,14 @@ class TaxCalculator:
         Args:
             gross_annual_income: Annual income before taxes
             state_code: Two-letter state code
-            filing_status: 'single' or 'married'
+            filing_status: 'single', 'married' (jointly), 'married_separate' or
+                'head_of_household'
         
         Returns:
             dict with breakdown of taxes and after-tax income
         """
         federal_tax = TaxCalculator.calculate_federal_tax(gross_annual_income, filing_status)
-        state_tax = TaxCalculator.calculate_state_tax(gross_annual_income, state_code)
+        state_tax = TaxCalculator.calculate_state_tax(gross_annual_income, state_code, filing_status)
         fica_tax = TaxCalculator.calculate_fica_taxes(gross_annual_income)
         
         total_tax = federal_tax + state_tax + fica_tax
@@ -177,7 +334,93 @@ class TaxCalculator:
             'effective_tax_rate': round((total_tax / gross_annual_income * 100), 2) if gross_annual_income > 0 else 0
         }
     
+    @staticmethod
+    def calculate_fica_taxes_array(annual_incomes):
+        """Vectorized calculate_fica_taxes for an array of incomes."""
+        incomes = np.asarray(annual_incomes, dtype=np.float64)
+        ss_tax = np.minimum(incomes, TaxCalculator.SOCIAL_SECURITY_WAGE_BASE_2024) * TaxCalculator.SOCIAL_SECURITY_RATE
+        medicare_tax = incomes * TaxCalculator.MEDICARE_RATE
+        additional_medicare = (np.maximum(incomes - TaxCalculator.ADDITIONAL_MEDICARE_THRESHOLD, 0)
+                               * TaxCalculator.ADDITIONAL_MEDICARE_RATE)
+        return ss_tax + medicare_tax + additional_medicare
+    
+    @staticmethod
+    def _schedule_taxes(incomes, schedules, keys):
+        """
+        Tax per income where row i uses schedules[keys[i]].
+        
+        Rows are grouped by key, so each schedule costs one vectorized
+        searchsorted over its rows however many rows there are.
+        """
+        if len(schedules) == 1:
+            return schedules[0].tax_array(incomes)
+        taxes = np.zeros(len(incomes))
+        for key in range(len(schedules)):
+            rows = keys == key
+            taxes[rows] = schedules[key].tax_array(incomes[rows])
+        return taxes
+    
+    @staticmethod
+    def calculate_after_tax_income_batch(gross_annual_incomes, state_codes='CA', filing_statuses='single'):
+        """
+        Vectorized calculate_after_tax_income for many incomes at once.
+        
+        Args:
+            gross_annual_incomes: Array or list of annual incomes before taxes
+            state_codes: Two-letter state code, or one per income
+            filing_statuses: Filing status, or one per income (see calculate_after_tax_income)
+        
+        Returns:
+            dict of unrounded float64 arrays with the keys of calculate_after_tax_income
+        """
+        incomes = np.atleast_1d(np.asarray(gross_annual_incomes, dtype=np.float64))
+        if incomes.ndim != 1:
+            raise ValueError("gross_annual_incomes must be one-dimensional")
+        count = len(incomes)
+        
+        def codes(values, name):
+            """Distinct names and each income's index into them."""
+            values = np.asarray(values, dtype=str)
+            if values.ndim == 0:
+                return [values.item()], np.zeros(count, dtype=np.int64)
+            if values.shape != (count,):
+                raise ValueError(f"{name} must be a single value or one per income")
+            names, index = np.unique(values, return_inverse=True)
+            return names.tolist(), index.reshape(count)
+        
+        # Resolve each distinct filing status and (state, filing status) pair once
+        state_names, state_index = codes(state_codes, 'state_codes')
+        status_names, status_index = codes(filing_statuses, 'filing_statuses')
+        pair_keys = state_index * len(status_names) + status_index
+        if len(state_names) * len(status_names) == 1:
+            pairs, pair_index = np.zeros(1, dtype=np.int64), pair_keys
+        else:
+            pairs, pair_index = np.unique(pair_keys, return_inverse=True)
+        pairs = [(state_names[key // len(status_names)], status_names[key % len(status_names)]) for key in pairs]
+        federal = [TaxCalculator.federal_schedule(status) for status in status_names]
+        state = [TaxCalculator.state_schedule(state_code, status) for state_code, status in pairs]
+        
+        federal_tax = TaxCalculator._schedule_taxes(incomes, federal, status_index)
+        state_tax = TaxCalculator._schedule_taxes(incomes, state, pair_index)
+        fica_tax = TaxCalculator.calculate_fica_taxes_array(incomes)
+        
+        total_tax = federal_tax + state_tax + fica_tax
+        after_tax_income = incomes - total_tax
+        with np.errstate(divide='ignore', invalid='ignore'):
+            effective_tax_rate = np.where(incomes > 0, total_tax / incomes * 100, 0.0)
+        
+        return {
+            'gross_annual_income': incomes,
+            'federal_tax': federal_tax,
+            'state_tax': state_tax,
+            'fica_tax': fica_tax,
+            'total_tax': total_tax,
+            'after_tax_income': after_tax_income,
+            'after_tax_monthly_income': after_tax_income / 12,
+            'effective_tax_rate': effective_tax_rate,
+        }
+    
     @staticmethod
     def get_available_states():
         """Return list of available states and their codes"""
-        return sorted(TaxCalculator.STATE_TAX_RATES.keys())
+        return sorted(TaxCalculator.STATE_SCHEDULES.keys())
@@ -0,0 +1,86 @@
+"""
+Unit tests for the maximum affordable home price solver
+"""
+
+import unittest
+
+import numpy as np
+
+from affordability import compare_states, max_affordable_prices, max_purchase_prices
+from rent_vs_buy import RentVsBuyAnalysis
+from tax_calculator import TaxCalculator
+
+
+class TestMaxAffordablePrices(unittest.TestCase):
+    """Test cases for max_affordable_prices"""
+    
+    def test_first_year_cost_matches_budget(self):
+        """Test that the solved price costs exactly the budget in RentVsBuyAnalysis"""
+        for rate, term in ((6.5, 30), (5.0, 15), (0.0, 20)):
+            with self.subTest(rate=rate, term=term):
+                results = max_affordable_prices(120000, 60000, 'NY', 'married', loan_term_years=term,
+                                                annual_interest_rate=rate, annual_hoa=0.3)
+                price = results['max_purchase_price'][0]
+                analysis = RentVsBuyAnalysis(price, 60000, term, rate)
+                costs = analysis.calculate_monthly_costs(1, monthly_rent=2000, annual_hoa=0.3)
+                self.assertAlmostEqual(costs['buy_costs'][0], results['housing_budget'][0], places=1)
+                self.assertAlmostEqual(results['monthly_ownership_cost'][0], results['housing_budget'][0], places=6)
+    
+    def test_budget_from_after_tax_income(self):
+        """Test the housing budget against calculate_after_tax_income and other debts"""
+        results = max_affordable_prices(90000, 30000, 'CA', 'single', debt_to_income=0.3, monthly_debts=400)
+        after_tax = TaxCalculator.calculate_after_tax_income(90000, 'CA', 'single')
+        self.assertAlmostEqual(results['housing_budget'][0], 0.3 * after_tax['after_tax_monthly_income'] - 400,
+                               places=1)
+    
+    def test_gross_basis(self):
+        """Test that a gross-income ratio does not depend on the state"""
+        ca = max_affordable_prices(90000, 30000, 'CA', income_basis='gross')
+        tx = max_affordable_prices(90000, 30000, 'TX', income_basis='gross')
+        self.assertEqual(ca['max_purchase_price'][0], tx['max_purchase_price'][0])
+        self.assertAlmostEqual(ca['housing_budget'][0], 0.36 * 7500)
+    
+    def test_bought_outright(self):
+        """Test prices below the down payment when the budget only covers ownership costs"""
+        share = 2.9 / 100 / 12
+        price = max_purchase_prices(300, 500000, 0.006, share)
+        self.assertAlmostEqual(price, 300 / share)
+        self.assertEqual(max_purchase_prices(-50, 100000, 0.006, share), 0)
+    
+    def test_invalid_inputs(self):
+        """Test rejection of out-of-range inputs and unknown assumptions"""
+        with self.assertRaises(ValueError):
+            max_affordable_prices(-1, 0)
+        with self.assertRaises(ValueError):
+            max_affordable_prices(90000, 0, debt_to_income=1.5)
+        with self.assertRaises(ValueError):
+            max_affordable_prices(90000, 0, income_basis='net')
+        with self.assertRaises(ValueError):
+            max_affordable_prices(90000, 0, closing_costs_percent=3)
+
+
+class TestCompareStates(unittest.TestCase):
+    """Test cases for compare_states"""
+    
+    def test_every_state_and_status(self):
+        """Test one row per state and filing status, matching single evaluations"""
+        results = compare_states(150000, 100000, annual_interest_rate=6.0)
+        states = TaxCalculator.get_available_states()
+        self.assertEqual(len(results['state_code']), 2 * len(states))
+        self.assertEqual(results['state_code'][:4].tolist(), [states[0], states[0], states[1], states[1]])
+        self.assertEqual(results['filing_status'][:2].tolist(), ['single', 'married'])
+        for index in (0, 9, 57):
+            single = max_affordable_prices(150000, 100000, results['state_code'][index],
+                                           results['filing_status'][index], annual_interest_rate=6.0)
+            self.assertAlmostEqual(results['max_purchase_price'][index], single['max_purchase_price'][0], places=6)
+    
+    def test_no_income_tax_states_afford_most(self):
+        """Test that states without income tax allow the highest price"""
+        results = compare_states(150000, 100000, filing_statuses=('single',))
+        prices = dict(zip(results['state_code'].tolist(), results['max_purchase_price']))
+        self.assertEqual(prices['TX'], max(prices.values()))
+        self.assertTrue(np.all(results['max_purchase_price'] > 100000))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+"""
+Unit tests for incremental analysis sessions
+"""
+
+import random
+import unittest
+
+import app as app_module
+from analysis_session import AnalysisSession
+from rent_vs_buy import ACCUMULATION_CLOSED_FORM, ACCUMULATION_ITERATIVE, LazyResults, RentVsBuyAnalysis
+from scenario_params import ScenarioParams
+
+LOAN = {'purchase_price': 550000, 'down_payment': 110000, 'loan_term_years': 30, 'annual_interest_rate': 6.5}
+
+RENT_SIDE = ('rents', 'incomes', 'rent_account', 'renting')
+
+
+class TestAnalysisSession(unittest.TestCase):
+    """Test cases for AnalysisSession"""
+    
+    def setUp(self):
+        self.scenario = ScenarioParams(12, monthly_rent=2300, annual_hoa=0.2, monthly_income=9000)
+        self.session = AnalysisSession(scenario=self.scenario, **LOAN)
+    
+    def expected(self, scenario=None, accumulation=ACCUMULATION_ITERATIVE, **loan_changes):
+        analysis = RentVsBuyAnalysis(accumulation=accumulation, **dict(LOAN, **loan_changes))
+        return analysis.compare_scenarios(scenario or self.scenario)
+    
+    def test_matches_compare_scenarios(self):
+        """Test that a fresh session gives exactly the compare_scenarios results"""
+        self.assertEqual(self.session.results(), self.expected())
+    
+    def test_interest_rate_change_reuses_rent_side(self):
+        """Test that a loan edit leaves the rent, income and home value nodes alone"""
+        self.session.results()
+        before = dict(self.session.computations)
+        dropped = self.session.update(annual_interest_rate=5.75)
+        self.assertIn('loan', dropped)
+        self.assertFalse(set(RENT_SIDE + ('home_values', 'ownership_costs')) & set(dropped))
+        
+        self.assertEqual(self.session.results(), self.expected(annual_interest_rate=5.75))
+        for node in RENT_SIDE + ('home_values', 'ownership_costs', 'budget_account'):
+            self.assertEqual(self.session.computations[node], before[node], node)
+        self.assertEqual(self.session.computations['loan'], before['loan'] + 1)
+    
+    def test_rent_change_reuses_buy_side(self):
+        """Test that a rent edit leaves the buying section alone"""
+        self.session.results()
+        dropped = self.session.update(monthly_rent=2500)
+        self.assertNotIn('buying', dropped)
+        self.assertNotIn('buy_account', dropped)
+        self.assertEqual(self.session.results(), self.expected(self.scenario.replace(monthly_rent=2500)))
+    
+    def test_unchanged_value_invalidates_nothing(self):
+        """Test that re-sending current values (as ints or floats) drops nothing"""
+        self.session.results()
+        self.assertEqual(self.session.update(monthly_rent=2300.0, annual_interest_rate=6.5), ())
+    
+    def test_random_edits(self):
+        """Test many random edits in both accumulation modes against full recomputation"""
+        rng = random.Random(7)
+        for accumulation in (ACCUMULATION_ITERATIVE, ACCUMULATION_CLOSED_FORM):
+            scenario = self.scenario
+            loan = dict(LOAN)
+            session = AnalysisSession(scenario=scenario, accumulation=accumulation, **loan)
+            for step in range(40):
+                name = rng.choice(['years', 'monthly_rent', 'annual_market_return', 'annual_hoa',
+                                   'annual_appreciation_rate', 'monthly_income', 'annual_interest_rate',
+                                   'down_payment', 'loan_term_years', 'monthly_investment_percentage'])
+                if name in ('years', 'loan_term_years'):
+                    value = rng.randint(1, 30)
+                elif name in loan:
+                    value = loan[name] * rng.uniform(0.8, 1.0)
+                else:
+                    value = getattr(scenario, name) * rng.uniform(0.8, 1.2)
+                session.update(**{name: value})
+                if name in loan:
+                    loan[name] = value
+                else:
+                    scenario = scenario.replace(**{name: value})
+                expected = RentVsBuyAnalysis(accumulation=accumulation, **loan).compare_scenarios(scenario)
+                self.assertEqual(session.results(), expected, (accumulation, step, name))
+    
+    def test_fields(self):
+        """Test that a field selection computes no series until accessed"""
+        results = self.session.results(fields=['recommendation'])
+        self.assertIsInstance(results, LazyResults)
+        self.assertEqual(self.session.computations['monthly_costs'], 0)
+        self.assertEqual(results['monthly_costs'], self.expected()['monthly_costs'])
+        with self.assertRaises(ValueError):
+            self.session.results(fields=['bogus'])
+    
+    def test_invalid_update(self):
+        """Test that bad updates raise and leave the session unchanged"""
+        with self.assertRaises(TypeError):
+            self.session.update(purchase_prize=1)
+        with self.assertRaises(ValueError):
+            self.session.update(annual_interest_rate=5.0, monthly_rent=-1)
+        self.assertEqual(self.session.loan_inputs['annual_interest_rate'], 6.5)
+        self.assertEqual(self.session.results(), self.expected())
+
+
+
+class TestSessionEndpoints(unittest.TestCase):
+    """Test cases for /api/session across worker processes"""
+    
+    def setUp(self):
+        self.client = app_module.app.test_client()
+        self.body = {'purchase_price': 550000, 'down_payment': 110000, 'monthly_rent': 2300, 'analysis_years': 12}
+    
+    def analyze(self, body):
+        return self.client.post('/api/analyze', json=body).get_json()['results']
+    
+    def test_update_on_another_worker(self):
+        """Test that a PATCH reaching a worker without the session rebuilds it from the id"""
+        session_id = self.client.post('/api/session', json=self.body).get_json()['session_id']
+        # Another worker process holds none of this worker's sessions
+        app_module.analysis_sessions.clear()
+        response = self.client.patch(f'/api/session/{session_id}', json={'annual_interest_rate': 5.0})
+        self.assertEqual(response.status_code, 200)
+        updated = response.get_json()
+        self.assertEqual(updated['results'], self.analyze(dict(self.body, annual_interest_rate=5.0)))
+        
+        app_module.analysis_sessions.clear()
+        response = self.client.patch(f"/api/session/{updated['session_id']}", json={'monthly_rent': 2500})
+        self.assertEqual(response.get_json()['results'],
+                         self.analyze(dict(self.body, annual_interest_rate=5.0, monthly_rent=2500)))
+    
+    def test_reused_id_starts_from_its_own_parameters(self):
+        """Test that an earlier session id keeps meaning the parameters it was issued for"""
+        session_id = self.client.post('/api/session', json=self.body).get_json()['session_id']
+        self.client.patch(f'/api/session/{session_id}', json={'annual_interest_rate': 5.0})
+        response = self.client.patch(f'/api/session/{session_id}', json={'monthly_rent': 2500})
+        self.assertEqual(response.get_json()['results'], self.analyze(dict(self.body, monthly_rent=2500)))
+    
+    def test_malformed_id(self):
+        """Test that an id that carries no parameters is unknown"""
+        response = self.client.patch('/api/session/k3mJ0u9y1cKXb3Yx2d8E1w', json={'monthly_rent': 2500})
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+Unit tests for the vectorized batch engine
+"""
+
+import unittest
+
+import numpy as np
+
+from rent_vs_buy import RentVsBuyAnalysis
+from batch_engine import compare_scenarios_batch, prepare_columns, find_invalid_scenarios
+
+
+class TestCompareScenariosBatch(unittest.TestCase):
+    """Test that batch results match RentVsBuyAnalysis.compare_scenarios"""
+    
+    def setUp(self):
+        """Set up scenarios with different horizons, loan terms and rates"""
+        self.scenarios = [
+            dict(purchase_price=500000, down_payment=100000, monthly_rent=2000, analysis_years=10),
+            dict(purchase_price=300000, down_payment=60000, monthly_rent=1200, analysis_years=3,
+                 loan_term_years=15, annual_interest_rate=5.0, annual_hoa=0.2),
+            dict(purchase_price=900000, down_payment=200000, monthly_rent=4000, analysis_years=35,
+                 loan_term_years=20, annual_market_return=0, monthly_income=15000),
+        ]
+        self.columns = {
+            name: [scenario.get(name, default) for scenario in self.scenarios]
+            for name, default in [
+                ('purchase_price', None), ('down_payment', None), ('monthly_rent', None),
+                ('analysis_years', 10), ('loan_term_years', 30), ('annual_interest_rate', 6.5),
+                ('annual_hoa', 0), ('annual_market_return', 7.0), ('monthly_income', 5000),
+            ]
+        }
+    
+    def scalar_results(self, scenario):
+        """Run one scenario through RentVsBuyAnalysis"""
+        analysis = RentVsBuyAnalysis(
+            scenario['purchase_price'], scenario['down_payment'],
+            scenario.get('loan_term_years', 30), scenario.get('annual_interest_rate', 6.5)
+        )
+        return analysis.compare_scenarios(
+            scenario['analysis_years'], scenario['monthly_rent'],
+            annual_hoa=scenario.get('annual_hoa', 0),
+            annual_market_return=scenario.get('annual_market_return', 7.0),
+            monthly_income=scenario.get('monthly_income', 5000)
+        )
+    
+    def test_totals_match_scalar_engine(self):
+        """Test buying and renting totals for every scenario"""
+        batch = compare_scenarios_batch(self.columns)
+        for index, scenario in enumerate(self.scenarios):
+            expected = self.scalar_results(scenario)
+            for section in ('buying', 'renting'):
+                for key, value in expected[section].items():
+                    self.assertAlmostEqual(batch[section][key][index], value, delta=1e-6 * max(1, abs(value)))
+            self.assertEqual(batch['recommendation'][index], expected['recommendation'])
+    
+    def test_series_match_scalar_engine(self):
+        """Test series values up to each horizon and NaN padding after it"""
+        batch = compare_scenarios_batch(self.columns)
+        self.assertEqual(batch['yearly_growth']['years'].tolist(), list(range(1, 36)))
+        for index, scenario in enumerate(self.scenarios):
+            expected = self.scalar_results(scenario)
+            years = scenario['analysis_years']
+            for section in ('monthly_costs', 'yearly_growth'):
+                for key, values in expected[section].items():
+                    if key == 'years':
+                        continue
+                    row = batch[section][key][index]
+                    np.testing.assert_allclose(row[:years], values, atol=0.011)
+                    self.assertTrue(np.isnan(row[years:]).all())
+    
+    def test_without_series(self):
+        """Test that series are omitted when not requested"""
+        batch = compare_scenarios_batch(self.columns, include_series=False)
+        self.assertNotIn('yearly_growth', batch)
+        self.assertEqual(len(batch['financial_advantage']), 3)
+
+
+class TestPrepareColumns(unittest.TestCase):
+    """Test column validation"""
+    
+    def test_scalars_broadcast(self):
+        """Test that scalar inputs apply to every scenario"""
+        count, arrays = prepare_columns({'purchase_price': [1, 2], 'down_payment': 1, 'monthly_rent': 1})
+        self.assertEqual(count, 2)
+        self.assertEqual(arrays['down_payment'].tolist(), [1.0, 1.0])
+    
+    def test_length_mismatch(self):
+        """Test that columns of different lengths are rejected"""
+        with self.assertRaises(ValueError):
+            prepare_columns({'purchase_price': [1, 2], 'down_payment': [1], 'monthly_rent': 1})
+    
+    def test_invalid_scenarios(self):
+        """Test detection of scenarios that fail input checks"""
+        count, arrays = prepare_columns({
+            'purchase_price': [500000, 500000, 100000],
+            'down_payment': [100000, 0, 200000],
+            'monthly_rent': 2000
+        })
+        self.assertEqual(find_invalid_scenarios(arrays).tolist(), [1, 2])
+    
+    def test_non_finite_and_long_scenarios(self):
+        """Test that non-finite inputs and overlong analysis periods are invalid"""
+        count, arrays = prepare_columns({
+            'purchase_price': [500000, 500000, 500000, 500000, 500000],
+            'down_payment': 100000,
+            'monthly_rent': [2000, float('nan'), 2000, 2000, 2000],
+            'annual_market_return': [7, 7, float('inf'), 7, 7],
+            'analysis_years': [10, 10, 10, 100000, float('nan')]
+        })
+        self.assertEqual(find_invalid_scenarios(arrays).tolist(), [1, 2, 3, 4])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,115 @@
+"""
+Unit tests for the bulk CSV scenario runner
+"""
+
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+
+from batch_runner import ERROR_COLUMN, RESULT_COLUMNS, evaluate_chunk, main, run
+from rent_vs_buy import RentVsBuyAnalysis
+
+HEADER = ['id', 'purchase_price', 'down_payment', 'monthly_rent', 'analysis_years', 'annual_interest_rate']
+
+
+class TestBatchRunner(unittest.TestCase):
+    """Test cases for batch_runner"""
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.input_path = os.path.join(self.directory, 'scenarios.csv')
+        self.output_path = os.path.join(self.directory, 'results.csv')
+        self.rows = [
+            [str(index), str(300000 + 5000 * index), str(60000 + 1000 * index), str(1500 + 10 * index),
+             str(1 + index % 30), f"{4 + (index % 7) * 0.5}"]
+            for index in range(250)
+        ]
+        self.rows.append(['bad', 'abc', '1', '1', '1', '1'])
+        self.rows.append(['invalid', '100000', '200000', '1000', '10', '6'])
+        self.rows.append(['short', '300000'])
+        with open(self.input_path, 'w', newline='') as handle:
+            writer = csv.writer(handle)
+            writer.writerow(HEADER)
+            writer.writerows(self.rows)
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+    
+    def read_output(self):
+        with open(self.output_path, newline='') as handle:
+            return list(csv.DictReader(handle))
+    
+    def test_results_in_order(self):
+        """Test that every row is written in input order with compare_scenarios results"""
+        summary = run(self.input_path, self.output_path, workers=1, chunk_size=40)
+        self.assertEqual(summary, {'processed': 253, 'rows_done': 253, 'errors': 3})
+        output = self.read_output()
+        self.assertEqual(list(output[0]), HEADER + list(RESULT_COLUMNS) + [ERROR_COLUMN])
+        self.assertEqual([row['id'] for row in output], [row[0] for row in self.rows])
+        
+        for row in output[:250:37]:
+            analysis = RentVsBuyAnalysis(float(row['purchase_price']), float(row['down_payment']),
+                                         annual_interest_rate=float(row['annual_interest_rate']))
+            expected = analysis.compare_scenarios(int(row['analysis_years']), float(row['monthly_rent']),
+                                                  annual_hoa=0.2)
+            self.assertEqual(row['recommendation'], expected['recommendation'])
+            self.assertAlmostEqual(float(row['financial_advantage']), expected['financial_advantage'], delta=0.01)
+            self.assertEqual(row[ERROR_COLUMN], '')
+    
+    def test_error_rows(self):
+        """Test that bad rows are reported in the error column"""
+        run(self.input_path, self.output_path, workers=1, chunk_size=100)
+        errors = {row['id']: row[ERROR_COLUMN] for row in self.read_output()[-3:]}
+        self.assertIn('Invalid number for purchase_price', errors['bad'])
+        self.assertIn('down payment cannot exceed purchase price', errors['invalid'])
+        self.assertEqual(errors['short'], 'Missing down_payment')
+    
+    def test_process_pool_matches_single_process(self):
+        """Test that a worker pool writes the same file"""
+        run(self.input_path, self.output_path, workers=1, chunk_size=30)
+        single = self.read_output()
+        run(self.input_path, self.output_path, workers=2, chunk_size=30)
+        self.assertEqual(self.read_output(), single)
+    
+    def test_resume(self):
+        """Test that an interrupted run resumes after its last completed chunk"""
+        run(self.input_path, self.output_path, workers=1, chunk_size=50)
+        complete = self.read_output()
+        
+        def interrupt(rows_done, processed, elapsed):
+            if rows_done >= 100:
+                raise KeyboardInterrupt
+        
+        with self.assertRaises(KeyboardInterrupt):
+            run(self.input_path, self.output_path, workers=1, chunk_size=50, progress=interrupt)
+        with open(self.output_path, 'a') as handle:
+            handle.write('half written\n')
+        summary = run(self.input_path, self.output_path, workers=1, chunk_size=50, resume=True)
+        self.assertEqual(summary['processed'], 153)
+        self.assertEqual(self.read_output(), complete)
+    
+    def test_evaluate_chunk_pads_short_rows(self):
+        """Test that output rows always have every column"""
+        output = evaluate_chunk(HEADER, [['x', '300000']])
+        self.assertEqual(len(output[0]), len(HEADER) + len(RESULT_COLUMNS) + 1)
+    
+    def test_non_finite_values(self):
+        """Test that nan and inf inputs and overlong periods are reported as row errors"""
+        output = evaluate_chunk(HEADER, [['a', 'nan', '60000', '1500', '10', '6'],
+                                         ['b', '300000', '60000', 'inf', '10', '6'],
+                                         ['c', '300000', '60000', '1500', '100000', '6']])
+        self.assertEqual(output[0][-1], 'Invalid number for purchase_price: nan')
+        self.assertEqual(output[1][-1], 'Invalid number for monthly_rent: inf')
+        self.assertIn('at most 100 years', output[2][-1])
+    
+    def test_main(self):
+        """Test the command-line entry point"""
+        self.assertEqual(main([self.input_path, self.output_path, '--workers', '1', '--quiet']), 0)
+        self.assertEqual(len(self.read_output()), 253)
+        self.assertEqual(main([os.path.join(self.directory, 'missing.csv'), self.output_path, '--quiet']), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
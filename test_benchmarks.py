@@ -0,0 +1,127 @@
+"""
+Unit tests for the benchmark harness (the benchmarks themselves run with python -m benchmarks)
+"""
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import benchmarks.suite  # noqa: F401 (registers the benchmarks)
+from benchmarks.__main__ import main
+from benchmarks.harness import (BENCHMARKS, baseline_document, benchmark, compare, keep_best, measure,
+                                retime_regressions)
+from benchmarks.suite import ENGINE_METHODS, HORIZONS
+
+
+class TestHarness(unittest.TestCase):
+    """Test cases for benchmarks.harness"""
+    
+    def setUp(self):
+        self.baseline = {'benchmarks': {
+            'a': {'seconds': 1.0},
+            'b': {'seconds': 1.0},
+            'c': {'seconds': 1.0},
+            'd': {'seconds': 1.0, 'threshold': 1.0},
+        }}
+    
+    def test_compare_statuses(self):
+        """Test regression, faster, ok and new statuses"""
+        results = {name: {'seconds': seconds} for name, seconds in
+                   {'a': 1.3, 'b': 0.7, 'c': 1.1, 'd': 1.9, 'e': 1.0}.items()}
+        statuses = {row[0]: row[4] for row in compare(results, self.baseline, threshold=0.25)}
+        self.assertEqual(statuses, {'a': 'regression', 'b': 'faster', 'c': 'ok', 'd': 'ok', 'e': 'new'})
+        self.assertEqual(compare(results, None)[0][4], 'new')
+    
+    def test_compare_relative(self):
+        """Test that relative times are compared, scaled to this run's calibration"""
+        baseline = {'benchmarks': {'a': {'seconds': 1.0, 'relative': 10.0}}}
+        # Twice the baseline's seconds on a machine half as fast is no regression
+        rows = compare({'a': {'seconds': 2.0, 'relative': 10.0, 'calibration': 0.2}}, baseline)
+        self.assertEqual(rows, [('a', 2.0, 2.0, 1.0, 'ok')])
+        rows = compare({'a': {'seconds': 1.0, 'relative': 20.0, 'calibration': 0.05}}, baseline)
+        self.assertEqual(rows[0][4], 'regression')
+    
+    def test_keep_best(self):
+        """Test that the result with the lower relative time is kept"""
+        results = {'a': {'seconds': 1.0, 'relative': 5.0}, 'b': {'seconds': 1.0}}
+        merged = keep_best(results, {'a': {'seconds': 2.0, 'relative': 4.0}, 'b': {'seconds': 0.5}})
+        self.assertEqual(merged, {'a': {'seconds': 2.0, 'relative': 4.0}, 'b': {'seconds': 0.5}})
+        self.assertEqual(results['a']['relative'], 5.0)
+    
+    def test_baseline_document(self):
+        """Test that saving merges results and keeps hand-set thresholds"""
+        document = baseline_document({'d': {'seconds': 2.0, 'median': 2.1}}, self.baseline)
+        self.assertEqual(document['benchmarks']['d'], {'seconds': 2.0, 'median': 2.1, 'threshold': 1.0})
+        self.assertEqual(document['benchmarks']['a'], {'seconds': 1.0})
+        document = baseline_document({'e': {'seconds': 2.0, 'median': 2.1, 'relative': 4.0}})
+        self.assertEqual(document['benchmarks']['e'], {'seconds': 2.0, 'median': 2.1, 'relative': 4.0})
+    
+    def test_measure(self):
+        """Test that measure reports per-call times"""
+        result = measure(lambda: sum(range(100)), repeat=3, min_time=0.001)
+        self.assertLessEqual(result['seconds'], result['median'])
+        self.assertGreaterEqual(result['number'], 1)
+    
+    def test_retime_regressions_keeps_best(self):
+        """Test that an apparent regression is timed again"""
+        calls = []
+        
+        @benchmark('test.retime')
+        def factory():
+            calls.append(1)
+            return lambda: None
+        
+        try:
+            baseline = {'benchmarks': {'test.retime': {'seconds': 1.0}}}
+            results = retime_regressions({'test.retime': {'seconds': 5.0}}, baseline,
+                                         retries=1, repeat=1, min_time=0.0001)
+            self.assertEqual(len(calls), 1)
+            self.assertLess(results['test.retime']['seconds'], 1.0)
+        finally:
+            del BENCHMARKS['test.retime']
+    
+    def test_save_adds_only_new_entries(self):
+        """Test that --save leaves existing entries alone unless --replace is given"""
+        benchmark('test.save')(lambda: lambda: None)
+        handle, path = tempfile.mkstemp(suffix='.json')
+        os.close(handle)
+        options = ['-k', 'test.save', '--baseline', path, '--repeat', '1', '--min-time', '0.0001', '--save']
+        
+        def saved(*extra):
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                self.assertEqual(main(options + list(extra)), 0)
+            with open(path) as stored:
+                return json.load(stored)['benchmarks']
+        
+        try:
+            with open(path, 'w') as stored:
+                json.dump({'benchmarks': {'other': {'seconds': 1.0}}}, stored)
+            entries = saved()
+            self.assertEqual(entries['other'], {'seconds': 1.0})
+            self.assertIn('relative', entries['test.save'])
+            
+            with open(path, 'w') as stored:
+                json.dump({'benchmarks': {'test.save': {'seconds': 1.0}}}, stored)
+            self.assertEqual(saved(), {'test.save': {'seconds': 1.0}})
+            self.assertLess(saved('--replace')['test.save']['seconds'], 1.0)
+        finally:
+            del BENCHMARKS['test.save']
+            os.remove(path)
+    
+    def test_duplicate_name(self):
+        """Test that a name can only be registered once"""
+        with self.assertRaises(ValueError):
+            benchmark('http.get_index')(lambda: None)
+    
+    def test_suite_covers_horizons(self):
+        """Test that every engine method is registered for every horizon"""
+        for method in ENGINE_METHODS:
+            for years in HORIZONS:
+                self.assertIn(f"engine.{method}[years={years}]", BENCHMARKS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Unit tests for the break-even rent solver
+"""
+
+import unittest
+
+import numpy as np
+
+from batch_engine import compare_scenarios_batch, prepare_columns
+from break_even import RentSide, break_even_rents
+from rent_vs_buy import RentVsBuyAnalysis
+
+
+class TestBreakEvenRents(unittest.TestCase):
+    """Test cases for break_even_rents"""
+    
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        count = 200
+        price = rng.uniform(200000, 1500000, count)
+        self.columns = {
+            'purchase_price': price,
+            'down_payment': price * rng.uniform(0.05, 0.9, count),
+            'analysis_years': rng.integers(1, 40, count),
+            'loan_term_years': rng.choice([15, 20, 30], count),
+            'annual_interest_rate': rng.uniform(0, 9, count),
+            'annual_market_return': rng.uniform(-5, 12, count),
+            'annual_appreciation_rate': rng.uniform(-2, 8, count),
+            'monthly_income': rng.uniform(2000, 20000, count),
+            'annual_hoa': 0.2,
+        }
+    
+    def test_financial_advantage_is_zero(self):
+        """Test that every solvable scenario breaks even at the returned rent"""
+        results = break_even_rents(self.columns)
+        solvable = ~np.isnan(results['break_even_monthly_rent'])
+        self.assertTrue(solvable.any())
+        self.assertTrue(np.all(results['converged'][solvable]))
+        self.assertLess(np.max(np.abs(results['financial_advantage'][solvable])), 0.01)
+    
+    def test_matches_compare_scenarios(self):
+        """Test the root against RentVsBuyAnalysis, including rents above income"""
+        results = break_even_rents({'purchase_price': [500000, 2000000], 'down_payment': [100000, 400000],
+                                    'monthly_income': [5000, 4000], 'analysis_years': [10, 25]})
+        for index, (price, down_payment, income, years) in enumerate(
+                [(500000, 100000, 5000, 10), (2000000, 400000, 4000, 25)]):
+            rent = results['break_even_monthly_rent'][index]
+            analysis = RentVsBuyAnalysis(price, down_payment)
+            comparison = analysis.compare_scenarios(years, monthly_rent=rent, monthly_income=income)
+            self.assertAlmostEqual(comparison['financial_advantage'], 0, places=4)
+        self.assertGreater(results['break_even_monthly_rent'][1], 4000)
+    
+    def test_buying_wins_at_zero_rent(self):
+        """Test NaN when buying is ahead even without paying rent"""
+        results = break_even_rents({'purchase_price': 400000, 'down_payment': 80000,
+                                    'annual_appreciation_rate': 15, 'analysis_years': 30})
+        self.assertTrue(np.isnan(results['break_even_monthly_rent'][0]))
+        self.assertFalse(results['converged'][0])
+    
+    def test_rent_side_matches_batch_engine(self):
+        """Test the precomputed renting net position against compare_scenarios_batch"""
+        columns = dict(self.columns, monthly_rent=3000.0)
+        count, arrays = prepare_columns(columns)
+        position, _ = RentSide(arrays).net_position(3000.0)
+        expected = compare_scenarios_batch(arrays, include_series=False)['rent_net_position']
+        np.testing.assert_allclose(position, expected, rtol=1e-9, atol=1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Unit tests for the compact columnar response formats
+"""
+
+import unittest
+
+import numpy as np
+from werkzeug.datastructures import MIMEAccept
+
+from columnar import (decode_columnar_binary, deduplicate, encode_columnar_binary, encode_columnar_json,
+                      flatten_results, negotiate_format, omit_fields, parse_omit)
+
+
+class TestColumnar(unittest.TestCase):
+    """Test cases for columnar encoding"""
+    
+    def setUp(self):
+        """Set up results shaped like /api/analyze"""
+        self.results = {
+            'recommendation': 'BUY',
+            'financial_advantage': 1234.567,
+            'buying': {'closing_costs': 15000.0},
+            'yearly_growth': {
+                'years': [1, 2, 3],
+                'investment_growth': [100.0, 210.5, 331.25],
+                'investment_growth_rent': [100.0, 210.5, 331.25],
+                'investment_growth_buy': [50.0, 104.0, None],
+            },
+        }
+    
+    def test_flatten(self):
+        """Test dotted names and column conversion"""
+        scalars, columns = flatten_results(self.results)
+        self.assertEqual(scalars['buying.closing_costs'], 15000.0)
+        self.assertEqual(columns['yearly_growth.years'].dtype.kind, 'i')
+        self.assertTrue(np.isnan(columns['yearly_growth.investment_growth_buy'][2]))
+    
+    def test_duplicate_columns_stored_once(self):
+        """Test that identical columns become aliases"""
+        _, columns = flatten_results(self.results)
+        unique, aliases = deduplicate(columns)
+        self.assertEqual(aliases, {'yearly_growth.investment_growth_rent': 'yearly_growth.investment_growth'})
+        self.assertNotIn('yearly_growth.investment_growth_rent', unique)
+    
+    def test_columnar_json(self):
+        """Test rounding, null for NaN and extra keys"""
+        document = encode_columnar_json(self.results, extra={'success': True})
+        self.assertTrue(document['success'])
+        self.assertEqual(document['scalars']['financial_advantage'], 1234.57)
+        self.assertEqual(document['columns']['yearly_growth.investment_growth_buy'], [50.0, 104.0, None])
+        self.assertEqual(document['columns']['yearly_growth.years'], [1, 2, 3])
+    
+    def test_binary_round_trip(self):
+        """Test that decoded binary columns match the originals, 2D arrays included"""
+        results = dict(self.results, series=np.arange(6, dtype=float).reshape(2, 3),
+                       labels=np.array(['BUY', 'RENT']))
+        data = encode_columnar_binary(results, extra={'count': 2})
+        header, columns = decode_columnar_binary(data)
+        self.assertEqual(header['count'], 2)
+        self.assertEqual(header['scalars']['recommendation'], 'BUY')
+        np.testing.assert_array_equal(columns['series'], results['series'])
+        np.testing.assert_array_equal(columns['yearly_growth.investment_growth_rent'], [100.0, 210.5, 331.25])
+        self.assertEqual(columns['labels'].tolist(), ['BUY', 'RENT'])
+        with self.assertRaises(ValueError):
+            decode_columnar_binary(b'XXXX' + data[4:])
+    
+    def test_omit(self):
+        """Test omitting sections, dotted names and leaf names"""
+        kept = omit_fields(self.results, parse_omit('buying, yearly_growth.years,investment_growth_rent'))
+        self.assertNotIn('buying', kept)
+        self.assertEqual(sorted(kept['yearly_growth']), ['investment_growth', 'investment_growth_buy'])
+        self.assertIn('buying', self.results)
+    
+    def test_negotiate_format(self):
+        """Test ?format= precedence and Accept negotiation"""
+        self.assertEqual(negotiate_format(None, MIMEAccept([('*/*', 1)])), 'json')
+        self.assertEqual(negotiate_format(None, MIMEAccept([('application/vnd.rentvsbuy.columnar', 1)])), 'binary')
+        self.assertEqual(negotiate_format('columnar', MIMEAccept([('application/json', 1)])), 'columnar')
+        with self.assertRaises(ValueError):
+            negotiate_format('xml')
+
+
+if __name__ == '__main__':
+    unittest.main()
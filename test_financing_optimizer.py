@@ -0,0 +1,99 @@
+"""
+Unit tests for the down payment and loan term optimizer
+"""
+
+import unittest
+
+import numpy as np
+
+from financing_optimizer import end_of_horizon_wealth, optimize_financing
+from rent_vs_buy import RentVsBuyAnalysis
+
+PARAMS = {
+    'purchase_price': 500000,
+    'monthly_rent': 2000,
+    'analysis_years': 10,
+    'annual_interest_rate': 6.5,
+    'annual_market_return': 7.0,
+    'annual_hoa': 0.2,
+}
+
+
+class TestEndOfHorizonWealth(unittest.TestCase):
+    """Test cases for end_of_horizon_wealth"""
+    
+    def test_matches_buying_costs(self):
+        """Test wealth against calculate_buying_costs plus invested leftover cash"""
+        wealth, _ = end_of_horizon_wealth(PARAMS, 200000, [50000, 120000], [15, 30])
+        for index, (down_payment, term) in enumerate(((50000, 15), (120000, 30))):
+            buying = RentVsBuyAnalysis(500000, down_payment, term, 6.5).calculate_buying_costs(10, annual_hoa=0.2)
+            leftover = 200000 - down_payment - buying['closing_costs']
+            expected = buying['net_position'] + buying['closing_costs'] + leftover * (1 + 0.07 / 12) ** 120
+            self.assertAlmostEqual(wealth[index], expected, places=4)
+
+
+class TestOptimizeFinancing(unittest.TestCase):
+    """Test cases for optimize_financing"""
+    
+    def assert_matches_brute_force(self, params, available_cash, loan_terms=(15, 20, 30)):
+        result = optimize_financing(params, available_cash, loan_terms=loan_terms)
+        closing_costs = params['purchase_price'] * 0.03
+        down_payments = np.linspace(params['purchase_price'] * 0.03,
+                                    min(available_cash - closing_costs, params['purchase_price']), 2001)
+        best = -np.inf
+        for term in loan_terms:
+            wealth, _ = end_of_horizon_wealth(params, available_cash, down_payments, np.full(len(down_payments), term))
+            best = max(best, wealth.max())
+        self.assertGreaterEqual(result['wealth'], best - 0.01)
+        return result
+    
+    def test_cheap_loan_keeps_cash_invested(self):
+        """Test the smallest down payment when the market beats the mortgage rate"""
+        result = self.assert_matches_brute_force(PARAMS, 200000)
+        self.assertAlmostEqual(result['down_payment'], 15000)
+        self.assertAlmostEqual(result['leftover_cash'], 200000 - 15000 - 15000)
+    
+    def test_expensive_loan_uses_all_cash(self):
+        """Test the largest down payment when the mortgage rate beats the market"""
+        params = dict(PARAMS, annual_interest_rate=9.0, annual_market_return=5.0)
+        result = self.assert_matches_brute_force(params, 200000)
+        self.assertAlmostEqual(result['down_payment'], 185000, places=2)
+    
+    def test_cash_purchase(self):
+        """Test down payments capped at the purchase price"""
+        params = dict(PARAMS, annual_interest_rate=9.0, annual_market_return=2.0)
+        result = self.assert_matches_brute_force(params, 700000, loan_terms=(30,))
+        self.assertAlmostEqual(result['down_payment'], 500000, places=2)
+        self.assertAlmostEqual(result['monthly_mortgage_payment'], 0, places=6)
+    
+    def test_terms_table(self):
+        """Test one row per distinct loan term, with the best term chosen"""
+        result = optimize_financing(PARAMS, 200000, loan_terms=[30, 15, 15])
+        self.assertEqual(result['terms']['loan_term_years'].tolist(), [15, 30])
+        best = int(np.argmax(result['terms']['wealth']))
+        self.assertEqual(result['loan_term_years'], result['terms']['loan_term_years'][best])
+    
+    def test_insufficient_cash(self):
+        """Test rejection when the cash cannot cover the minimum down payment and closing costs"""
+        with self.assertRaises(ValueError):
+            optimize_financing(PARAMS, 20000)
+        with self.assertRaises(ValueError):
+            optimize_financing(PARAMS, 200000, loan_terms=[])
+    
+    def test_invalid_inputs(self):
+        """Test rejection of out-of-range and non-finite inputs"""
+        for params, available_cash, min_percent in (
+                (dict(PARAMS, monthly_income=-5000), 200000, 3.0),
+                (dict(PARAMS, analysis_years=0), 200000, 3.0),
+                (dict(PARAMS, annual_interest_rate=-200), 200000, 3.0),
+                (PARAMS, float('nan'), 3.0),
+                (PARAMS, float('inf'), 3.0),
+                (PARAMS, 200000, float('nan')),
+                (PARAMS, 200000, -5.0)):
+            with self.subTest(params=params, available_cash=available_cash, min_percent=min_percent):
+                with self.assertRaises(ValueError):
+                    optimize_financing(params, available_cash, min_down_payment_percent=min_percent)
+
+
+if __name__ == '__main__':
+    unittest.main()
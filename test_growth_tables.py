@@ -0,0 +1,76 @@
+"""
+Unit tests for the shared growth-factor and amortization tables
+"""
+
+import unittest
+
+from rent_vs_buy import RentVsBuyAnalysis
+from growth_tables import MAX_TABLE_PERIODS, amortization_table, growth_table
+
+
+class TestGrowthTable(unittest.TestCase):
+    """Test cases for growth_table"""
+    
+    def test_cumulative_factors(self):
+        """Test factors against direct powers"""
+        table = growth_table(0.03, 10)
+        self.assertEqual(len(table.factors), 11)
+        self.assertEqual(table.factors[0], 1.0)
+        for k in (1, 5, 10):
+            self.assertAlmostEqual(table.factors[k], 1.03 ** k, places=12)
+    
+    def test_tables_are_shared(self):
+        """Test that the same rate and horizon return the same table"""
+        self.assertIs(growth_table(0.05, 20), growth_table(0.05, 20))
+        self.assertIs(amortization_table(0.005, 360), amortization_table(0.005, 360))
+    
+    def test_long_horizons_not_cached(self):
+        """Test that horizons above MAX_TABLE_PERIODS are built per call"""
+        table = growth_table(0.03, MAX_TABLE_PERIODS + 1)
+        self.assertIsNot(table, growth_table(0.03, MAX_TABLE_PERIODS + 1))
+        self.assertAlmostEqual(table.factors[40], 1.03 ** 40, places=9)
+
+
+class TestAmortizationTable(unittest.TestCase):
+    """Test cases for amortization_table"""
+    
+    def test_balance_matches_annuity_formula(self):
+        """Test remaining balance against the present value of remaining payments"""
+        rate, payments = 0.065 / 12, 360
+        table = amortization_table(rate, payments)
+        for months_paid in (0, 12, 120, 359):
+            remaining = payments - months_paid
+            expected = table.payment_factor * (1 - (1 + rate) ** -remaining) / rate
+            self.assertAlmostEqual(table.remaining_fraction(months_paid), expected, places=12)
+        self.assertEqual(table.remaining_fraction(360), 0.0)
+    
+    def test_fractional_months(self):
+        """Test that fractional months fall between the neighbouring whole months"""
+        table = amortization_table(0.005, 180)
+        self.assertLess(table.remaining_fraction(13), table.remaining_fraction(12.5))
+        self.assertLess(table.remaining_fraction(12.5), table.remaining_fraction(12))
+    
+    def test_zero_interest_rate(self):
+        """Test that a zero-rate loan is paid down linearly"""
+        analysis = RentVsBuyAnalysis(400000, 100000, loan_term_years=30, annual_interest_rate=0)
+        self.assertAlmostEqual(analysis.calculate_monthly_mortgage_payment(), 300000 / 360, places=6)
+        self.assertAlmostEqual(analysis.calculate_remaining_mortgage_balance(10), 200000, places=6)
+        self.assertEqual(analysis.calculate_remaining_mortgage_balance(30), 0)
+    
+    def test_long_loans_use_closed_form(self):
+        """Test that loans above MAX_TABLE_PERIODS payments store no table and match the formula"""
+        payments = MAX_TABLE_PERIODS + 1
+        for rate in (0.0, 0.065 / 12):
+            with self.subTest(rate=rate):
+                table = amortization_table(rate, payments)
+                self.assertIsNone(table.balance_fractions)
+                for months_paid in (0, 12, 1200):
+                    remaining = payments - months_paid
+                    expected = remaining / payments if rate == 0 else (
+                        table.payment_factor * (1 - (1 + rate) ** -remaining) / rate)
+                    self.assertAlmostEqual(table.remaining_fraction(months_paid), expected, places=12)
+        self.assertEqual(amortization_table(0.005, 12000000).remaining_fraction(12000000), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
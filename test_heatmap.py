@@ -0,0 +1,62 @@
+"""
+Unit tests for the buy vs rent heatmap grid
+"""
+
+import time
+import unittest
+
+import numpy as np
+
+from rent_vs_buy import RentVsBuyAnalysis
+from batch_engine import DEFAULT_FIELDS
+from heatmap import evaluate_grid, grid_axis
+
+
+class TestEvaluateGrid(unittest.TestCase):
+    """Test cases for evaluate_grid"""
+    
+    def setUp(self):
+        """Set up a base scenario"""
+        self.params = dict(DEFAULT_FIELDS, purchase_price=500000, down_payment=100000, monthly_rent=2000)
+    
+    def test_cells_match_scalar_engine(self):
+        """Test grid cells against compare_scenarios, across chunk boundaries"""
+        prices = grid_axis(300000, 900000, 7)
+        rents = grid_axis(1000, 4000, 5)
+        grid = evaluate_grid(self.params, 'purchase_price', prices, 'monthly_rent', rents, chunk_size=4)
+        self.assertEqual(grid['financial_advantage'].shape, (5, 7))
+        for row, column in [(0, 0), (2, 3), (4, 6)]:
+            expected = RentVsBuyAnalysis(prices[column], 100000).compare_scenarios(10, rents[row])
+            self.assertAlmostEqual(
+                grid['financial_advantage'][row, column], expected['financial_advantage'], delta=1e-6
+            )
+            self.assertEqual(grid['recommendation'][row, column], expected['recommendation'])
+    
+    def test_invalid_cells(self):
+        """Test that cells where the down payment exceeds the price are left empty"""
+        grid = evaluate_grid(self.params, 'purchase_price', [50000, 500000], 'monthly_rent', [2000])
+        self.assertTrue(np.isnan(grid['financial_advantage'][0, 0]))
+        self.assertEqual(grid['recommendation'][0, 0], '')
+        self.assertFalse(np.isnan(grid['financial_advantage'][0, 1]))
+    
+    def test_out_of_range_axis_skipped(self):
+        """Test that cells past MAX_ANALYSIS_YEARS are left empty without being evaluated"""
+        started = time.perf_counter()
+        grid = evaluate_grid(self.params, 'analysis_years', [10, 1e6, 1e9], 'monthly_rent', [1500, 2000, 2500])
+        self.assertLess(time.perf_counter() - started, 1.0)
+        self.assertFalse(np.isnan(grid['financial_advantage'][:, 0]).any())
+        self.assertTrue(np.isnan(grid['financial_advantage'][:, 1:]).all())
+        self.assertEqual(grid['recommendation'][:, 1:].tolist(), [['', '']] * 3)
+    
+    def test_invalid_axes(self):
+        """Test that unknown or repeated inputs are rejected"""
+        with self.assertRaises(ValueError):
+            evaluate_grid(self.params, 'pets', [1], 'monthly_rent', [2000])
+        with self.assertRaises(ValueError):
+            evaluate_grid(self.params, 'monthly_rent', [1], 'monthly_rent', [2000])
+        with self.assertRaises(ValueError):
+            grid_axis(0, 1, 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,69 @@
+"""
+Unit tests for request timing instrumentation
+"""
+
+import logging
+import unittest
+from unittest import mock
+
+from rent_vs_buy import RentVsBuyAnalysis
+from instrumentation import PhaseTimer, log_timings, should_log
+
+
+class TestPhaseTimer(unittest.TestCase):
+    """Test cases for PhaseTimer"""
+    
+    def test_server_timing_header(self):
+        """Test header format, summed repeats and descriptions"""
+        timer = PhaseTimer()
+        with mock.patch('instrumentation.time.perf_counter', side_effect=[1.0, 1.002, 1.010, 1.011, 1.020]):
+            with timer.phase('parse'):
+                pass
+            with timer.phase('parse'):
+                pass
+        timer.note('parse', 'json')
+        timer.note('cache', 'hit')
+        timer.started = 1.0
+        with mock.patch('instrumentation.time.perf_counter', return_value=1.020):
+            header = timer.server_timing()
+        self.assertEqual(header, 'parse;dur=3.000;desc="json", total;dur=20.000, cache;desc="hit"')
+    
+    def test_engine_phases_recorded(self):
+        """Test that compare_scenarios records simulate and views phases"""
+        timer = PhaseTimer()
+        RentVsBuyAnalysis(500000, 100000).compare_scenarios(10, 2000, timer=timer)
+        self.assertEqual([name for name, _ in timer.phases], ['simulate', 'views'])
+
+
+class TestSampledLogging(unittest.TestCase):
+    """Test cases for should_log and log_timings"""
+    
+    def test_disabled_logger_skips_sampling(self):
+        """Test that no random number is drawn while the logger is disabled"""
+        with mock.patch('instrumentation.logger.isEnabledFor', return_value=False), \
+                mock.patch('instrumentation.random.random') as draw:
+            self.assertFalse(should_log(1.0))
+            draw.assert_not_called()
+    
+    def test_sample_rate(self):
+        """Test that only the sampled fraction is logged"""
+        with mock.patch('instrumentation.logger.isEnabledFor', return_value=True):
+            self.assertFalse(should_log(0))
+            self.assertTrue(should_log(1))
+            with mock.patch('instrumentation.random.random', return_value=0.3):
+                self.assertTrue(should_log(0.5))
+                self.assertFalse(should_log(0.2))
+    
+    def test_log_line(self):
+        """Test that a logged request includes phases and summary fields"""
+        timer = PhaseTimer()
+        with timer.phase('validate'):
+            pass
+        with self.assertLogs('rent_vs_buy.timing', level=logging.DEBUG) as captured:
+            log_timings('analyze', timer, 1.0, recommendation='BUY')
+        self.assertIn('validate=', captured.output[0])
+        self.assertIn('recommendation=BUY', captured.output[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+"""
+Unit tests for Prometheus metrics
+"""
+
+import glob
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from metrics import MERGED_FILE, MetricsRegistry, clear_directory, merge_exited_process
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Test cases for MetricsRegistry"""
+    
+    def test_counter_and_histogram_rendering(self):
+        """Test Prometheus text output with cumulative buckets"""
+        registry = MetricsRegistry()
+        registry.inc('rentvsbuy_http_requests_total', ('/api/analyze', 'POST', 200))
+        registry.inc('rentvsbuy_http_requests_total', ('/api/analyze', 'POST', 200))
+        registry.observe('rentvsbuy_analysis_years', 10, ('/api/analyze',))
+        registry.observe('rentvsbuy_analysis_years', 12, ('/api/analyze',))
+        registry.observe('rentvsbuy_analysis_years', 60, ('/api/analyze',))
+        text = registry.render()
+        self.assertIn('rentvsbuy_http_requests_total{route="/api/analyze",method="POST",status="200"} 2', text)
+        self.assertIn('rentvsbuy_analysis_years_bucket{route="/api/analyze",le="7"} 0', text)
+        self.assertIn('rentvsbuy_analysis_years_bucket{route="/api/analyze",le="10"} 1', text)
+        self.assertIn('rentvsbuy_analysis_years_bucket{route="/api/analyze",le="15"} 2', text)
+        self.assertIn('rentvsbuy_analysis_years_bucket{route="/api/analyze",le="+Inf"} 3', text)
+        self.assertIn('rentvsbuy_analysis_years_sum{route="/api/analyze"} 82', text)
+        self.assertIn('rentvsbuy_analysis_years_count{route="/api/analyze"} 3', text)
+    
+    def test_cache_hit_ratio(self):
+        """Test the derived cache hit ratio gauge"""
+        registry = MetricsRegistry()
+        registry.inc('rentvsbuy_cache_requests_total', ('analysis', 'hit'), 3)
+        registry.inc('rentvsbuy_cache_requests_total', ('analysis', 'miss'))
+        self.assertIn('rentvsbuy_cache_hit_ratio{cache="analysis"} 0.75', registry.render())
+    
+    def test_label_count_checked(self):
+        """Test that a wrong number of labels is rejected"""
+        with self.assertRaises(ValueError):
+            MetricsRegistry().inc('rentvsbuy_errors_total', ('/api/analyze',))
+    
+    def test_processes_aggregated_through_directory(self):
+        """Test that snapshots from several processes are summed"""
+        with tempfile.TemporaryDirectory() as directory:
+            for pid in (101, 102):
+                worker = MetricsRegistry(directory)
+                worker.inc('rentvsbuy_errors_total', ('/api/analyze', 'ValueError'))
+                worker.observe('rentvsbuy_http_request_duration_seconds', 0.003, ('/api/analyze',))
+                with mock.patch('metrics.os.getpid', return_value=pid):
+                    worker.flush()
+            text = MetricsRegistry(directory).render()
+        self.assertIn('rentvsbuy_errors_total{route="/api/analyze",exception="ValueError"} 2', text)
+        self.assertIn('rentvsbuy_http_request_duration_seconds_bucket{route="/api/analyze",le="0.005"} 2', text)
+        self.assertIn('rentvsbuy_http_request_duration_seconds_count{route="/api/analyze"} 2', text)
+    
+    def test_flush_interval(self):
+        """Test that automatic flushes are throttled but forced flushes are not"""
+        with tempfile.TemporaryDirectory() as directory:
+            registry = MetricsRegistry(directory, flush_interval=60)
+            registry.inc('rentvsbuy_errors_total', ('/', 'KeyError'))
+            with mock.patch('metrics.json.dump') as dump:
+                registry.flush()
+                registry.inc('rentvsbuy_errors_total', ('/', 'KeyError'))
+                registry.flush()
+                self.assertEqual(dump.call_count, 1)
+                registry.flush(force=True)
+                self.assertEqual(dump.call_count, 2)
+    
+    def test_concurrent_automatic_flush_skipped(self):
+        """Test that an automatic flush does not write while another flush holds the file"""
+        with tempfile.TemporaryDirectory() as directory:
+            registry = MetricsRegistry(directory)
+            registry.inc('rentvsbuy_errors_total', ('/', 'KeyError'))
+            with mock.patch('metrics.json.dump') as dump:
+                with registry._flush_lock:
+                    registry.flush()
+                self.assertEqual(dump.call_count, 0)
+                registry.flush()
+                self.assertEqual(dump.call_count, 1)
+    
+    
+    def test_idle_worker_flushed_by_timer(self):
+        """Test that updates after the last request reach the file without another flush() call"""
+        with tempfile.TemporaryDirectory() as directory:
+            registry = MetricsRegistry(directory, flush_interval=0.05)
+            registry.inc('rentvsbuy_errors_total', ('/', 'KeyError'))
+            registry.flush()
+            registry.inc('rentvsbuy_errors_total', ('/', 'KeyError'))
+            deadline = time.monotonic() + 5
+            while registry._dirty and time.monotonic() < deadline:
+                time.sleep(0.01)
+            registry.close()
+            text = MetricsRegistry(directory).render()
+        self.assertIn('rentvsbuy_errors_total{route="/",exception="KeyError"} 2', text)
+    
+    def test_close_waits_for_timer_flush(self):
+        """Test that close() does not return while the flush thread is still writing"""
+        replace = os.replace
+        
+        def slow_replace(source, target):
+            time.sleep(0.2)
+            replace(source, target)
+        
+        with tempfile.TemporaryDirectory() as directory:
+            registry = MetricsRegistry(directory, flush_interval=0.05)
+            registry.inc('rentvsbuy_errors_total', ('/', 'KeyError'))
+            registry.flush()
+            with mock.patch('metrics.os.replace', slow_replace):
+                registry.inc('rentvsbuy_errors_total', ('/', 'KeyError'))
+                deadline = time.monotonic() + 5
+                while registry._dirty and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                registry.close()
+            text = MetricsRegistry(directory).render()
+        self.assertIn('rentvsbuy_errors_total{route="/",exception="KeyError"} 2', text)
+    
+    def test_recycled_pid_keeps_both_files(self):
+        """Test that a new process with a dead worker's pid does not overwrite its counts"""
+        with tempfile.TemporaryDirectory() as directory:
+            with mock.patch('metrics.os.getpid', return_value=101):
+                for _ in range(2):
+                    worker = MetricsRegistry(directory)
+                    worker.inc('rentvsbuy_errors_total', ('/', 'KeyError'))
+                    worker.flush()
+            text = MetricsRegistry(directory).render()
+        self.assertIn('rentvsbuy_errors_total{route="/",exception="KeyError"} 2', text)
+    
+    def test_exited_workers_merged(self):
+        """Test that exited workers' files are folded into one file and the directory can be cleared"""
+        with tempfile.TemporaryDirectory() as directory:
+            for pid in (101, 102, 101):
+                with mock.patch('metrics.os.getpid', return_value=pid):
+                    worker = MetricsRegistry(directory)
+                    worker.observe('rentvsbuy_analysis_years', 10, ('/api/analyze',))
+                    worker.flush()
+            merge_exited_process(directory, 101)
+            merge_exited_process(directory, 102)
+            self.assertEqual(os.listdir(directory), [MERGED_FILE])
+            text = MetricsRegistry(directory).render()
+            self.assertIn('rentvsbuy_analysis_years_count{route="/api/analyze"} 3', text)
+            clear_directory(directory)
+            self.assertEqual(glob.glob(os.path.join(directory, '*')), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
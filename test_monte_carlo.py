@@ -0,0 +1,80 @@
+"""
+Unit tests for the Monte Carlo mode
+"""
+
+import unittest
+
+import numpy as np
+
+from batch_engine import DEFAULT_FIELDS, MAX_ANALYSIS_YEARS, compare_scenarios_batch
+from monte_carlo import run_monte_carlo, StreamingPercentiles
+
+
+class TestRunMonteCarlo(unittest.TestCase):
+    """Test cases for run_monte_carlo"""
+    
+    def setUp(self):
+        """Set up a base scenario"""
+        self.params = dict(DEFAULT_FIELDS, purchase_price=500000, down_payment=100000,
+                           monthly_rent=2000, analysis_years=15)
+    
+    def test_seed_is_reproducible(self):
+        """Test that the same seed gives the same results"""
+        first = run_monte_carlo(self.params, n_paths=2000, seed=11)
+        second = run_monte_carlo(self.params, n_paths=2000, seed=11)
+        self.assertEqual(first, second)
+        self.assertEqual(len(first['probability_buy_wins_by_year']), 15)
+    
+    def test_zero_volatility_matches_deterministic_engine(self):
+        """Test that paths without randomness reproduce the batch engine"""
+        volatility = {'annual_appreciation_rate': 0, 'annual_market_return': 0, 'annual_rent_increase_rate': 0}
+        results = run_monte_carlo(self.params, n_paths=100, volatility=volatility, seed=1)
+        expected = compare_scenarios_batch(self.params, include_series=False)['financial_advantage'][0]
+        for band in results['bands']['financial_advantage'].values():
+            self.assertAlmostEqual(band[-1], expected, delta=1e-6)
+        self.assertEqual(results['probability_buy_wins'], float(expected > 0))
+    
+    def test_chunked_run_matches_exact_percentiles(self):
+        """Test that histogram percentiles from a chunked run are close to exact ones"""
+        exact = run_monte_carlo(self.params, n_paths=20000, seed=5, chunk_size=20000)
+        chunked = run_monte_carlo(self.params, n_paths=20000, seed=5, chunk_size=5000, workers=1)
+        self.assertEqual(exact['method'], 'exact')
+        self.assertEqual(chunked['method'], 'histogram')
+        self.assertAlmostEqual(exact['probability_buy_wins'], chunked['probability_buy_wins'], delta=0.02)
+        spread = exact['bands']['financial_advantage']['p95'][-1] - exact['bands']['financial_advantage']['p5'][-1]
+        for label in ('p5', 'p50', 'p95'):
+            self.assertAlmostEqual(
+                exact['bands']['financial_advantage'][label][-1],
+                chunked['bands']['financial_advantage'][label][-1],
+                delta=0.02 * spread
+            )
+    
+    def test_invalid_correlation(self):
+        """Test that a correlation matrix that is not positive definite is rejected"""
+        with self.assertRaises(ValueError):
+            run_monte_carlo(self.params, n_paths=10, correlation=[[1, 2, 0], [2, 1, 0], [0, 0, 1]])
+    
+    def test_analysis_years_out_of_range(self):
+        """Test that zero and over-limit analysis periods are rejected"""
+        for years in (0, MAX_ANALYSIS_YEARS + 1, 300):
+            with self.subTest(years=years):
+                with self.assertRaises(ValueError):
+                    run_monte_carlo(dict(self.params, analysis_years=years), n_paths=10)
+
+
+class TestStreamingPercentiles(unittest.TestCase):
+    """Test cases for the histogram percentile estimator"""
+    
+    def test_uniform_values(self):
+        """Test percentiles of evenly spread values, merged from two halves"""
+        values = np.linspace(0, 100, 10001)[None, :]
+        histogram = StreamingPercentiles([0], [100], bins=1000)
+        histogram.update(values[:, :5000])
+        other = StreamingPercentiles([0], [100], bins=1000)
+        other.update(values[:, 5000:])
+        histogram.merge(other.counts)
+        np.testing.assert_allclose(histogram.percentiles([10, 50, 90])[:, 0], [10, 50, 90], atol=0.2)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
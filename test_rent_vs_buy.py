@@ -3,7 +3,11 @@ Unit tests for the Rent vs Buy Analysis Tool
 """
 
 import unittest
-from rent_vs_buy import RentVsBuyAnalysis
+from unittest import mock
+from rent_vs_buy import (
+    RentVsBuyAnalysis, ACCUMULATION_CLOSED_FORM, CLOSED_FORM_RELATIVE_TOLERANCE,
+    year_accumulation_factors
+)
 
 
 class TestRentVsBuyAnalysis(unittest.TestCase):
@@ -162,6 +166,61 @@ class TestRentVsBuyAnalysis(unittest.TestCase):
         # In this case, buying should typically be better
         if results['recommendation'] == 'BUY':
             self.assertGreater(results['financial_advantage'], 0)
+    
+    
+    def test_yearly_growth_matches_renting_investment(self):
+        """Test that each year of the growth series matches a standalone run of that length"""
+        growth = self.analysis.calculate_yearly_growth(15, monthly_rent=2000)
+        self.assertEqual(growth['years'], list(range(1, 16)))
+        for year in (1, 7, 15):
+            renting = self.analysis.calculate_renting_costs(year, monthly_rent=2000)
+            self.assertEqual(
+                growth['investment_growth_rent'][year - 1],
+                round(renting['investment_amount'], 2)
+            )
+    
+    
+    def test_comparison_sections_match_individual_methods(self):
+        """Test that compare_scenarios sections match the standalone calculation methods"""
+        kwargs = dict(annual_hoa=0.2, monthly_income=9000, annual_appreciation_rate=4.0)
+        results = self.analysis.compare_scenarios(years=12, monthly_rent=2500, **kwargs)
+        self.assertEqual(
+            results['monthly_costs'],
+            self.analysis.calculate_monthly_costs(12, 2500, **kwargs)
+        )
+        self.assertEqual(
+            results['yearly_growth'],
+            self.analysis.calculate_yearly_growth(12, 2500, **kwargs)
+        )
+        self.assertEqual(
+            results['renting'],
+            self.analysis.calculate_renting_costs(12, 2500, monthly_income=9000)
+        )
+        self.assertEqual(results['buying'], self.analysis.calculate_buying_costs(12, **kwargs))
+    
+    
+    def test_horizon_summary_matches_compare_scenarios(self):
+        """Test that every horizon in the summary matches a compare_scenarios run"""
+        kwargs = dict(annual_appreciation_rate=4.5, monthly_income=9000)
+        summary = self.analysis.calculate_horizon_summary(2500, **kwargs)
+        self.assertEqual(summary['years'], list(range(1, 31)))
+        for years in (1, 5, 30):
+            results = self.analysis.compare_scenarios(years, 2500, **kwargs)
+            self.assertAlmostEqual(summary['financial_advantage'][years - 1], results['financial_advantage'], delta=1e-6)
+            self.assertEqual(summary['recommendation'][years - 1], results['recommendation'])
+        
+        # Renting wins early, buying wins from the break-even year on
+        self.assertEqual(summary['break_even_year'], 5)
+        self.assertEqual(summary['crossover_years'], [5])
+    
+    def test_horizon_summary_without_break_even(self):
+        """Test that break_even_year is None when renting always wins"""
+        summary = self.analysis.calculate_horizon_summary(
+            800, max_years=10, annual_appreciation_rate=0, annual_market_return=12.0
+        )
+        self.assertEqual(len(summary['years']), 10)
+        self.assertIsNone(summary['break_even_year'])
+        self.assertEqual(summary['crossover_years'], [])
 
 
 class TestEdgeCases(unittest.TestCase):
@@ -239,6 +298,88 @@ class TestCalculationAccuracy(unittest.TestCase):
         self.assertAlmostEqual(returns['final_amount'], expected, delta=100)
 
 
+class TestClosedFormAccumulation(unittest.TestCase):
+    """Test the closed-form investment accumulation mode"""
+    
+    def assert_close(self, iterative, closed_form):
+        """Assert two values agree within the documented relative tolerance"""
+        tolerance = CLOSED_FORM_RELATIVE_TOLERANCE * max(1, abs(iterative))
+        self.assertAlmostEqual(iterative, closed_form, delta=tolerance)
+    
+    def test_accumulation_factors_match_monthly_loop(self):
+        """Test the closed-form factors against compounding month by month"""
+        for monthly_return in (0, 0.07 / 12, -0.02 / 12):
+            value = 1000
+            for month in range(12):
+                value = value * (1 + monthly_return) + 50
+            growth, annuity = year_accumulation_factors(monthly_return)
+            self.assert_close(value, 1000 * growth + 50 * annuity)
+    
+    def test_closed_form_matches_iterative(self):
+        """Test that both modes agree on totals and series, including a zero market return"""
+        for market_return in (7.0, 0):
+            iterative = RentVsBuyAnalysis(500000, 100000).compare_scenarios(
+                years=30, monthly_rent=2000, annual_market_return=market_return, monthly_income=12000
+            )
+            closed_form = RentVsBuyAnalysis(
+                500000, 100000, accumulation=ACCUMULATION_CLOSED_FORM
+            ).compare_scenarios(
+                years=30, monthly_rent=2000, annual_market_return=market_return, monthly_income=12000
+            )
+            self.assert_close(iterative['financial_advantage'], closed_form['financial_advantage'])
+            self.assert_close(
+                iterative['buying']['available_budget_investments'],
+                closed_form['buying']['available_budget_investments']
+            )
+            for key in ('investment_growth_buy', 'investment_growth_rent'):
+                for a, b in zip(iterative['yearly_growth'][key], closed_form['yearly_growth'][key]):
+                    self.assertAlmostEqual(a, b, delta=0.01)
+    
+    def test_unknown_accumulation_mode(self):
+        """Test that an unknown accumulation mode is rejected"""
+        with self.assertRaises(ValueError):
+            RentVsBuyAnalysis(500000, 100000, accumulation='fast')
+
+
+class TestFieldSelection(unittest.TestCase):
+    """Test lazy, field-selective compare_scenarios results"""
+    
+    def setUp(self):
+        """Set up an analysis and its full result"""
+        self.analysis = RentVsBuyAnalysis(500000, 100000)
+        self.full = self.analysis.compare_scenarios(years=20, monthly_rent=2000)
+    
+    def test_headline_only_skips_series(self):
+        """Test that a headline-only call never records the series"""
+        with mock.patch.object(self.analysis, '_yearly_growth_view') as growth_view, \
+                mock.patch.object(self.analysis, '_monthly_costs_view') as monthly_view:
+            results = self.analysis.compare_scenarios(
+                years=20, monthly_rent=2000, fields=['recommendation', 'financial_advantage']
+            )
+            growth_view.assert_not_called()
+            monthly_view.assert_not_called()
+        self.assertEqual(sorted(results), ['financial_advantage', 'recommendation'])
+        self.assertEqual(results['recommendation'], self.full['recommendation'])
+        self.assertEqual(results['financial_advantage'], self.full['financial_advantage'])
+    
+    def test_sections_computed_on_access(self):
+        """Test that unrequested keys are computed on first access and match the full result"""
+        results = self.analysis.compare_scenarios(years=20, monthly_rent=2000, fields=[])
+        self.assertEqual(len(results), 0)
+        self.assertIn('yearly_growth', results)
+        self.assertEqual(results['yearly_growth'], self.full['yearly_growth'])
+        self.assertEqual(results.get('monthly_costs'), self.full['monthly_costs'])
+        self.assertEqual(results.get('buying'), self.full['buying'])
+        self.assertIsNone(results.get('missing'))
+        with self.assertRaises(KeyError):
+            results['missing']
+    
+    def test_unknown_field(self):
+        """Test that unknown fields are rejected"""
+        with self.assertRaises(ValueError):
+            self.analysis.compare_scenarios(years=20, monthly_rent=2000, fields=['monthly_payment'])
+
+
 def run_all_tests():
     """Run all unit tests"""
     unittest.main(verbosity=2)
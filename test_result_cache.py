@@ -0,0 +1,80 @@
+"""
+Unit tests for the analysis result cache
+"""
+
+import unittest
+from unittest import mock
+
+from result_cache import ResultCache, canonical_key
+
+
+class TestCanonicalKey(unittest.TestCase):
+    """Test cases for canonical_key"""
+    
+    def test_equivalent_numbers_share_key(self):
+        """Test that int/float spellings and -0.0 produce the same key"""
+        first = canonical_key({'monthly_rent': 2000, 'annual_hoa': 0, 'analysis_years': 10})
+        second = canonical_key({'analysis_years': 10.0, 'annual_hoa': -0.0, 'monthly_rent': 2000.0})
+        self.assertEqual(first, second)
+        self.assertEqual(hash(first), hash(second))
+    
+    def test_different_values_differ(self):
+        """Test that distinct parameters produce distinct keys"""
+        self.assertNotEqual(canonical_key({'monthly_rent': 2000}), canonical_key({'monthly_rent': 2001}))
+        self.assertNotEqual(canonical_key({'annual_interest_rate': 6.5}),
+                            canonical_key({'annual_interest_rate': 6.50000000001}))
+
+
+class TestResultCache(unittest.TestCase):
+    """Test cases for ResultCache"""
+    
+    def test_hit_and_miss_counters(self):
+        """Test that lookups are counted"""
+        cache = ResultCache(max_size=4)
+        self.assertIsNone(cache.get('a'))
+        cache.put('a', 1)
+        self.assertEqual(cache.get('a'), 1)
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['size']), (1, 1, 1))
+        self.assertEqual(stats['hit_ratio'], 0.5)
+    
+    def test_pop(self):
+        """Test that pop returns an entry once and removes it"""
+        cache = ResultCache(max_size=4)
+        cache.put('a', 1)
+        self.assertEqual(cache.pop('a'), 1)
+        self.assertIsNone(cache.pop('a'))
+        self.assertEqual(cache.stats()['size'], 0)
+    
+    def test_least_recently_used_evicted(self):
+        """Test that the least recently used entry is evicted when full"""
+        cache = ResultCache(max_size=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(cache.stats()['evictions'], 1)
+    
+    def test_entries_expire(self):
+        """Test that entries older than the TTL are treated as misses"""
+        cache = ResultCache(max_size=2, ttl_seconds=60)
+        with mock.patch('result_cache.time.monotonic', return_value=1000.0):
+            cache.put('a', 1)
+        with mock.patch('result_cache.time.monotonic', return_value=1030.0):
+            self.assertEqual(cache.get('a'), 1)
+        with mock.patch('result_cache.time.monotonic', return_value=1061.0):
+            self.assertIsNone(cache.get('a'))
+        stats = cache.stats()
+        self.assertEqual((stats['expirations'], stats['size']), (1, 0))
+    
+    def test_invalid_size(self):
+        """Test that a cache must hold at least one entry"""
+        with self.assertRaises(ValueError):
+            ResultCache(max_size=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+"""
+Unit tests for the immutable scenario parameter object
+"""
+
+import pickle
+import unittest
+
+from rent_vs_buy import RentVsBuyAnalysis
+from scenario_params import SCENARIO_PARAM_FIELDS, ScenarioParams
+
+
+class TestScenarioParams(unittest.TestCase):
+    """Test cases for ScenarioParams"""
+    
+    def setUp(self):
+        self.params = ScenarioParams(years=10, monthly_rent=2000, annual_hoa=0.2)
+    
+    def test_immutable(self):
+        """Test that attributes cannot be set, deleted or added"""
+        with self.assertRaises(AttributeError):
+            self.params.monthly_rent = 2500
+        with self.assertRaises(AttributeError):
+            del self.params.years
+        with self.assertRaises(AttributeError):
+            self.params.extra = 1
+        self.assertFalse(hasattr(self.params, '__dict__'))
+    
+    def test_equal_values_hash_equal(self):
+        """Test that ints, floats and -0.0 normalize to the same key"""
+        a = ScenarioParams(10, 2000, annual_hoa=0)
+        b = ScenarioParams(10.0, 2000.0, annual_hoa=-0.0)
+        self.assertEqual(a, b)
+        self.assertEqual(hash(a), hash(b))
+        self.assertIsInstance(b.years, int)
+        self.assertEqual(len({a, b}), 1)
+        self.assertNotEqual(a, a.replace(monthly_rent=2001))
+    
+    def test_replace(self):
+        """Test that replace copies with changes and validates"""
+        longer = self.params.replace(years=20)
+        self.assertEqual(longer.years, 20)
+        self.assertEqual(self.params.years, 10)
+        self.assertEqual(longer.annual_hoa, 0.2)
+        with self.assertRaises(TypeError):
+            self.params.replace(purchase_price=1)
+        with self.assertRaises(ValueError):
+            self.params.replace(monthly_rent=-1)
+    
+    def test_array_round_trip(self):
+        """Test conversion to a float64 array and back"""
+        values = self.params.to_array()
+        self.assertEqual(values.typecode, 'd')
+        self.assertEqual(len(values), len(SCENARIO_PARAM_FIELDS))
+        self.assertEqual(ScenarioParams.from_array(values), self.params)
+        with self.assertRaises(ValueError):
+            ScenarioParams.from_array(values[:-1])
+    
+    def test_from_mapping(self):
+        """Test building from request parameters"""
+        params = ScenarioParams.from_mapping({
+            'analysis_years': 10, 'monthly_rent': 2000, 'annual_hoa': 0.2, 'purchase_price': 500000
+        })
+        self.assertEqual(params, self.params)
+    
+    def test_validation(self):
+        """Test rejected values"""
+        for changes in ({'years': 2.5}, {'years': -1}, {'monthly_rent': float('nan')},
+                        {'monthly_rent': 'abc'}, {'annual_property_tax_rate': -0.1},
+                        {'annual_market_return': -100}, {'monthly_investment_percentage': 101}):
+            with self.subTest(changes=changes):
+                with self.assertRaises(ValueError):
+                    ScenarioParams(**{'years': 10, **changes})
+    
+    def test_pickle(self):
+        """Test that instances survive pickling (for worker processes)"""
+        restored = pickle.loads(pickle.dumps(self.params))
+        self.assertEqual(restored, self.params)
+        self.assertEqual(hash(restored), hash(self.params))
+
+
+class TestEngineAcceptsScenarioParams(unittest.TestCase):
+    """Test that engine entry points give the same results for ScenarioParams and keywords"""
+    
+    def setUp(self):
+        self.analysis = RentVsBuyAnalysis(purchase_price=500000, down_payment=100000,
+                                          annual_interest_rate=6.5, loan_term_years=30)
+        self.params = ScenarioParams(years=12, monthly_rent=2200, annual_hoa=0.2,
+                                     annual_appreciation_rate=4.0, monthly_income=9000)
+        self.kwargs = self.params.as_dict()
+    
+    def test_compare_scenarios(self):
+        """Test compare_scenarios with and without field selection"""
+        self.assertEqual(self.analysis.compare_scenarios(self.params),
+                         self.analysis.compare_scenarios(**self.kwargs))
+        selected = self.analysis.compare_scenarios(self.params, fields=['recommendation'])
+        self.assertEqual(selected['yearly_growth'],
+                         self.analysis.compare_scenarios(**self.kwargs)['yearly_growth'])
+    
+    def test_section_methods(self):
+        """Test the per-section methods"""
+        rent_kwargs = {name: self.kwargs[name] for name in (
+            'years', 'monthly_rent', 'annual_market_return', 'annual_rent_increase_rate',
+            'monthly_income', 'annual_inflation_rate', 'monthly_investment_percentage')}
+        buy_kwargs = {name: value for name, value in self.kwargs.items()
+                      if name not in ('monthly_rent', 'annual_rent_increase_rate')}
+        self.assertEqual(self.analysis.calculate_renting_costs(self.params),
+                         self.analysis.calculate_renting_costs(**rent_kwargs))
+        self.assertEqual(self.analysis.calculate_buying_costs(self.params),
+                         self.analysis.calculate_buying_costs(**buy_kwargs))
+        monthly_kwargs = {name: value for name, value in self.kwargs.items() if name != 'annual_market_return'}
+        self.assertEqual(self.analysis.calculate_monthly_costs(self.params),
+                         self.analysis.calculate_monthly_costs(**monthly_kwargs))
+        self.assertEqual(self.analysis.calculate_yearly_growth(self.params),
+                         self.analysis.calculate_yearly_growth(**self.kwargs))
+    
+    def test_horizon_summary(self):
+        """Test that calculate_horizon_summary uses max_years as the horizon"""
+        kwargs = dict(self.kwargs)
+        del kwargs['years']
+        self.assertEqual(self.analysis.calculate_horizon_summary(self.params, max_years=20),
+                         self.analysis.calculate_horizon_summary(max_years=20, **kwargs))
+    
+    def test_monthly_rent_required_without_params(self):
+        """Test that keyword calls still need monthly_rent"""
+        with self.assertRaises(TypeError):
+            self.analysis.compare_scenarios(10)
+    
+    def test_keyword_calls_keep_previous_acceptance(self):
+        """Test that keyword inputs ScenarioParams would reject still compute"""
+        for changes in ({'monthly_investment_percentage': 150}, {'annual_hoa': -0.1}, {'monthly_income': -500},
+                        {'annual_appreciation_rate': -100}, {'annual_market_return': -150}):
+            with self.subTest(changes=changes):
+                with self.assertRaises(ValueError):
+                    ScenarioParams(10, 2000, **changes)
+                results = self.analysis.compare_scenarios(10, 2000, **changes)
+                self.assertIn(results['recommendation'], ('BUY', 'RENT'))
+        more = self.analysis.calculate_renting_costs(10, 2000, monthly_investment_percentage=150)
+        full = self.analysis.calculate_renting_costs(10, 2000, monthly_investment_percentage=100)
+        self.assertGreater(more['net_position'], full['net_position'])
+    
+    def test_overrides_with_params_rejected(self):
+        """Test that keyword arguments changed alongside a ScenarioParams raise instead of being dropped"""
+        with self.assertRaises(TypeError):
+            self.analysis.compare_scenarios(self.params, annual_hoa=0.5)
+        with self.assertRaises(TypeError):
+            self.analysis.calculate_buying_costs(self.params, monthly_income=1000)
+        with self.assertRaises(TypeError):
+            self.analysis.calculate_horizon_summary(self.params, annual_market_return=3.0)
+        # Arguments left at their defaults are fine
+        self.assertEqual(self.analysis.compare_scenarios(self.params, annual_market_return=7.0),
+                         self.analysis.compare_scenarios(self.params))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+Unit tests for the monthly schedule generator and its streaming encoders
+"""
+
+import csv
+import io
+import json
+import types
+import unittest
+
+from rent_vs_buy import RentVsBuyAnalysis, SCHEDULE_COLUMNS
+from scenario_params import ScenarioParams
+from schedule_export import iter_csv, iter_ndjson, negotiate_schedule_format
+
+COLUMN = {name: index for index, name in enumerate(SCHEDULE_COLUMNS)}
+
+
+class TestMonthlySchedule(unittest.TestCase):
+    """Test cases for RentVsBuyAnalysis.iter_monthly_schedule"""
+    
+    def setUp(self):
+        self.analysis = RentVsBuyAnalysis(purchase_price=500000, down_payment=100000, loan_term_years=15)
+        self.scenario = ScenarioParams(years=20, monthly_rent=2000, annual_hoa=0.2)
+    
+    def test_lazy_generator(self):
+        """Test that rows come from a generator, one tuple per month"""
+        schedule = self.analysis.iter_monthly_schedule(self.scenario)
+        self.assertIsInstance(schedule, types.GeneratorType)
+        first = next(schedule)
+        self.assertEqual(len(first), len(SCHEDULE_COLUMNS))
+        self.assertEqual((first[COLUMN['month']], first[COLUMN['year']]), (1, 1))
+        self.assertEqual(sum(1 for row in schedule) + 1, 240)
+    
+    def test_arguments_checked_on_call(self):
+        """Test that bad arguments raise before any row is requested"""
+        with self.assertRaises(TypeError):
+            self.analysis.iter_monthly_schedule(10)
+        with self.assertRaises(ValueError):
+            self.analysis.iter_monthly_schedule(10, monthly_rent=-5)
+    
+    def test_loan_columns(self):
+        """Test payment split and balance against the loan totals"""
+        rows = list(self.analysis.iter_monthly_schedule(self.scenario))
+        within_term = rows[:180]
+        self.assertAlmostEqual(sum(row[COLUMN['principal']] for row in within_term), 400000, places=4)
+        buying = self.analysis.calculate_buying_costs(self.scenario.replace(years=15))
+        self.assertAlmostEqual(sum(row[COLUMN['interest']] for row in within_term),
+                               buying['total_interest_paid'], places=4)
+        for row in rows:
+            self.assertAlmostEqual(row[COLUMN['interest']] + row[COLUMN['principal']], row[COLUMN['mortgage_payment']])
+        self.assertEqual(rows[179][COLUMN['mortgage_balance']], 0.0)
+        self.assertEqual(rows[180][COLUMN['mortgage_payment']], 0.0)
+    
+    def test_accounts_match_yearly_growth(self):
+        """Test that year-end account values equal compare_scenarios yearly_growth"""
+        rows = list(self.analysis.iter_monthly_schedule(self.scenario))
+        growth = self.analysis.compare_scenarios(self.scenario)['yearly_growth']
+        for year in range(1, 21):
+            row = rows[year * 12 - 1]
+            self.assertEqual(round(row[COLUMN['buy_investment_value']], 2), growth['investment_growth_buy'][year - 1])
+            self.assertEqual(round(row[COLUMN['rent_investment_value']], 2), growth['investment_growth_rent'][year - 1])
+
+
+class TestScheduleEncoders(unittest.TestCase):
+    """Test cases for the CSV and NDJSON encoders"""
+    
+    def setUp(self):
+        self.columns = ('month', 'value')
+        self.rows = [(month, month / 8) for month in range(1, 1201)]
+    
+    def test_csv_chunks(self):
+        """Test CSV output in chunks, header first"""
+        chunks = list(iter_csv(iter(self.rows), self.columns, chunk_rows=500))
+        self.assertEqual(len(chunks), 3)
+        parsed = list(csv.reader(io.StringIO(''.join(chunks))))
+        self.assertEqual(parsed[0], ['month', 'value'])
+        self.assertEqual(len(parsed), 1201)
+        self.assertEqual(parsed[3], ['3', '0.38'])
+    
+    def test_csv_empty(self):
+        """Test that an empty schedule still has a header"""
+        self.assertEqual(''.join(iter_csv(iter(()), self.columns)), 'month,value\n')
+    
+    def test_ndjson(self):
+        """Test NDJSON output"""
+        chunks = list(iter_ndjson(iter(self.rows), self.columns, chunk_rows=600))
+        self.assertEqual(len(chunks), 2)
+        lines = ''.join(chunks).splitlines()
+        self.assertEqual(len(lines), 1200)
+        self.assertEqual(json.loads(lines[0]), {'month': 1, 'value': 0.12})
+    
+    def test_negotiate(self):
+        """Test format selection"""
+        self.assertEqual(negotiate_schedule_format(), 'csv')
+        self.assertEqual(negotiate_schedule_format('ndjson'), 'ndjson')
+        with self.assertRaises(ValueError):
+            negotiate_schedule_format('xml')
+
+
+if __name__ == '__main__':
+    unittest.main()
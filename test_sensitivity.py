@@ -0,0 +1,60 @@
+"""
+Unit tests for the sensitivity (tornado) analysis
+"""
+
+import unittest
+
+from rent_vs_buy import RentVsBuyAnalysis
+from batch_engine import DEFAULT_FIELDS
+from sensitivity import sensitivity_analysis, DEFAULT_BUMPS
+
+
+class TestSensitivityAnalysis(unittest.TestCase):
+    """Test cases for sensitivity_analysis"""
+    
+    def setUp(self):
+        """Set up a base scenario"""
+        self.params = dict(DEFAULT_FIELDS, purchase_price=500000, down_payment=100000, monthly_rent=2000)
+    
+    def test_every_input_is_ranked(self):
+        """Test that all inputs are returned, ordered by swing"""
+        results = sensitivity_analysis(self.params)
+        self.assertEqual(len(results['inputs']), len(DEFAULT_BUMPS))
+        swings = [entry['swing'] for entry in results['inputs']]
+        self.assertEqual(swings, sorted(swings, reverse=True))
+    
+    def test_bumped_scenario_matches_scalar_engine(self):
+        """Test that a bumped interest rate matches a direct compare_scenarios run"""
+        results = sensitivity_analysis(self.params, bumps={'annual_interest_rate': 1.0})
+        entry = results['inputs'][0]
+        
+        base = RentVsBuyAnalysis(500000, 100000).compare_scenarios(10, 2000)
+        high = RentVsBuyAnalysis(500000, 100000, annual_interest_rate=7.5).compare_scenarios(10, 2000)
+        self.assertAlmostEqual(results['base_financial_advantage'], base['financial_advantage'], delta=1e-6)
+        self.assertAlmostEqual(
+            entry['high_change'], high['financial_advantage'] - base['financial_advantage'], delta=1e-6
+        )
+        # A higher mortgage rate makes buying worse
+        self.assertLess(entry['high_change'], 0)
+    
+    def test_cost_rates_do_not_go_negative(self):
+        """Test that bumping a cost rate down stops at zero"""
+        results = sensitivity_analysis(self.params, bumps={'annual_hoa': 1.0})
+        self.assertEqual(results['inputs'][0]['low_value'], 0)
+    
+    def test_unknown_input(self):
+        """Test that unknown inputs are rejected"""
+        with self.assertRaises(ValueError):
+            sensitivity_analysis(self.params, bumps={'pets': 1})
+    
+    def test_out_of_range_bumps(self):
+        """Test that bumps leaving the valid input range are rejected"""
+        for bumps in ({'loan_term_years': 30}, {'down_payment': 500000}, {'analysis_years': 10},
+                      {'annual_interest_rate': float('inf')}):
+            with self.subTest(bumps=bumps):
+                with self.assertRaises(ValueError):
+                    sensitivity_analysis(self.params, bumps=bumps)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,84 @@
+"""
+Unit tests for in-memory static page serving
+"""
+
+import gzip
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import static_page
+from static_page import PageVariants, StaticPage
+
+
+class TestPageVariants(unittest.TestCase):
+    """Test cases for PageVariants"""
+    
+    def setUp(self):
+        """Set up a page"""
+        self.content = b'<html>' + b'rent or buy ' * 500 + b'</html>'
+        self.page = PageVariants(self.content)
+    
+    def test_compressed_bodies(self):
+        """Test that encoded bodies decode to the page"""
+        self.assertEqual(gzip.decompress(self.page.bodies['gzip']), self.content)
+        self.assertLess(len(self.page.bodies['gzip']), len(self.content))
+        if static_page.brotli is not None:
+            self.assertEqual(static_page.brotli.decompress(self.page.bodies['br']), self.content)
+    
+    def test_etags(self):
+        """Test that each representation has its own stable ETag"""
+        self.assertEqual(len(set(self.page.etags.values())), len(self.page.bodies))
+        self.assertEqual(PageVariants(self.content).etags, self.page.etags)
+        self.assertNotEqual(PageVariants(self.content + b' ').etags['identity'], self.page.etags['identity'])
+    
+    def test_choose_encoding(self):
+        """Test encoding negotiation by client quality"""
+        self.assertEqual(self.page.choose(lambda encoding: 0), 'identity')
+        self.assertEqual(self.page.choose(lambda e: {'gzip': 1}.get(e, 0)), 'gzip')
+        with mock.patch.dict(self.page.bodies, {'br': b''}):
+            self.assertEqual(self.page.choose(lambda encoding: 1), 'br')
+            self.assertEqual(self.page.choose(lambda e: {'gzip': 1, 'br': 0.5}.get(e, 0)), 'gzip')
+
+
+class TestStaticPage(unittest.TestCase):
+    """Test cases for StaticPage"""
+    
+    def setUp(self):
+        """Set up a temporary page file"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'index.html')
+        with open(self.path, 'wb') as handle:
+            handle.write(b'first')
+    
+    def tearDown(self):
+        """Remove the temporary page file"""
+        self.directory.cleanup()
+    
+    def test_fallback_path(self):
+        """Test that the first existing candidate is served"""
+        page = StaticPage([os.path.join(self.directory.name, 'missing.html'), self.path])
+        self.assertEqual(page.variants().bodies['identity'], b'first')
+        with self.assertRaises(FileNotFoundError):
+            StaticPage([os.path.join(self.directory.name, 'missing.html')])
+    
+    def test_not_reloaded_without_interval(self):
+        """Test that the file is not read again by default"""
+        page = StaticPage([self.path])
+        with open(self.path, 'wb') as handle:
+            handle.write(b'second version')
+        with mock.patch('static_page.os.stat') as stat:
+            self.assertEqual(page.variants().bodies['identity'], b'first')
+            stat.assert_not_called()
+    
+    def test_reloaded_when_changed(self):
+        """Test that a changed file is picked up after the interval"""
+        page = StaticPage([self.path], reload_interval=0)
+        with open(self.path, 'wb') as handle:
+            handle.write(b'second version')
+        self.assertEqual(page.variants().bodies['identity'], b'second version')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+"""
+Unit tests for the compiled tax bracket schedules
+"""
+
+import unittest
+
+import numpy as np
+
+from tax_calculator import CompiledBrackets, TaxCalculator, normalize_filing_status
+
+
+def walk_brackets(income, brackets, deduction=0):
+    """Reference tax computed by walking the brackets."""
+    taxable_income = income - deduction
+    tax = 0
+    previous_limit = 0
+    for limit, rate in brackets:
+        if taxable_income <= previous_limit:
+            break
+        tax += (min(taxable_income, limit) - previous_limit) * rate
+        previous_limit = limit
+    return tax
+
+
+class TestCompiledBrackets(unittest.TestCase):
+    """Test cases for CompiledBrackets"""
+    
+    def test_matches_bracket_walk(self):
+        """Test tax at, around and between every boundary against a linear walk"""
+        brackets = TaxCalculator.FEDERAL_BRACKETS_SINGLE_2024
+        schedule = CompiledBrackets(brackets, 14600)
+        incomes = [0, 1, 14600, 14601, 50000, 135000, 1000000]
+        for limit, rate in brackets[:-1]:
+            incomes.extend([limit + 14600 - 1, limit + 14600, limit + 14600 + 1])
+        for income in incomes:
+            self.assertAlmostEqual(schedule.tax(income), walk_brackets(income, brackets, 14600), places=6)
+    
+    def test_cumulative_tax_at_thresholds(self):
+        """Test precomputed tax owed at each bracket boundary"""
+        schedule = CompiledBrackets([(10000, 0.1), (50000, 0.2), (float('inf'), 0.3)])
+        self.assertEqual(schedule.thresholds, (0, 10000, 50000))
+        self.assertEqual(schedule.rates, (0.1, 0.2, 0.3))
+        self.assertEqual(schedule.base_tax, (0, 1000, 9000))
+        self.assertAlmostEqual(schedule.tax(60000), 12000)
+    
+    def test_marginal_rate(self):
+        """Test rate of the next dollar, with boundaries belonging to the higher bracket"""
+        schedule = CompiledBrackets([(10000, 0.1), (float('inf'), 0.3)], deduction=5000)
+        self.assertEqual(schedule.marginal_rate(1000), 0)
+        self.assertEqual(schedule.marginal_rate(5000), 0.1)
+        self.assertEqual(schedule.marginal_rate(15000), 0.3)
+    
+    def test_invalid_brackets(self):
+        """Test rejection of unbounded, unsorted or empty bracket lists"""
+        with self.assertRaises(ValueError):
+            CompiledBrackets([])
+        with self.assertRaises(ValueError):
+            CompiledBrackets([(10000, 0.1), (20000, 0.2)])
+        with self.assertRaises(ValueError):
+            CompiledBrackets([(20000, 0.1), (10000, 0.2), (float('inf'), 0.3)])
+
+
+class TestTaxCalculator(unittest.TestCase):
+    """Test cases for TaxCalculator lookups"""
+    
+    def test_federal_tax_by_filing_status(self):
+        """Test every filing status against its bracket table"""
+        tables = {
+            'single': (TaxCalculator.FEDERAL_BRACKETS_SINGLE_2024, 14600),
+            'married': (TaxCalculator.FEDERAL_BRACKETS_MARRIED_2024, 29200),
+            'married_separate': (TaxCalculator.FEDERAL_BRACKETS_MARRIED_SEPARATE_2024, 14600),
+            'head_of_household': (TaxCalculator.FEDERAL_BRACKETS_HEAD_OF_HOUSEHOLD_2024, 21900),
+        }
+        for status, (brackets, deduction) in tables.items():
+            for income in (10000, 85000, 400000, 900000):
+                with self.subTest(status=status, income=income):
+                    expected = max(0, walk_brackets(income, brackets, deduction))
+                    self.assertAlmostEqual(TaxCalculator.calculate_federal_tax(income, status), expected, places=6)
+    
+    def test_filing_status_names(self):
+        """Test aliases, spelling variants and the single fallback"""
+        self.assertEqual(normalize_filing_status('Married'), 'married')
+        self.assertEqual(normalize_filing_status('married filing jointly'), 'married')
+        self.assertEqual(normalize_filing_status('married-filing-separately'), 'married_separate')
+        self.assertEqual(normalize_filing_status('HOH'), 'head_of_household')
+        self.assertEqual(normalize_filing_status('unknown'), 'single')
+    
+    def test_flat_state_tax(self):
+        """Test flat-rate states, no-tax states and the California fallback"""
+        self.assertAlmostEqual(TaxCalculator.calculate_state_tax(100000, 'CA'), 9300)
+        self.assertEqual(TaxCalculator.calculate_state_tax(100000, 'TX'), 0)
+        self.assertAlmostEqual(TaxCalculator.calculate_state_tax(100000, 'ZZ'), 9300)
+    
+    def test_progressive_state_brackets(self):
+        """Test registering progressive state brackets per filing status"""
+        saved = dict(TaxCalculator.STATE_SCHEDULES['OR'])
+        try:
+            TaxCalculator.set_state_brackets('OR', [(10000, 0.05), (float('inf'), 0.08)])
+            TaxCalculator.set_state_brackets('OR', [(20000, 0.05), (float('inf'), 0.08)], 'married')
+            self.assertAlmostEqual(TaxCalculator.calculate_state_tax(30000, 'OR'), 2100)
+            self.assertAlmostEqual(TaxCalculator.calculate_state_tax(30000, 'OR', 'married'), 1800)
+            self.assertAlmostEqual(TaxCalculator.calculate_state_tax(30000, 'OR', 'head_of_household'), 2100)
+            result = TaxCalculator.calculate_after_tax_income(30000, 'OR', 'married')
+            self.assertEqual(result['state_tax'], 1800)
+        finally:
+            TaxCalculator.STATE_SCHEDULES['OR'] = saved
+
+
+
+class TestAfterTaxIncomeBatch(unittest.TestCase):
+    """Test cases for calculate_after_tax_income_batch"""
+    
+    def assert_matches_scalar(self, incomes, states, statuses):
+        results = TaxCalculator.calculate_after_tax_income_batch(incomes, states, statuses)
+        for index, income in enumerate(incomes):
+            state = states if isinstance(states, str) else states[index]
+            status = statuses if isinstance(statuses, str) else statuses[index]
+            expected = TaxCalculator.calculate_after_tax_income(income, state, status)
+            for key, value in expected.items():
+                self.assertAlmostEqual(round(float(results[key][index]), 2), value, places=6,
+                                       msg=f"{key} for {income} {state} {status}")
+    
+    def test_matches_scalar_per_row(self):
+        """Test mixed states and filing statuses against calculate_after_tax_income"""
+        incomes = [0, 14600, 50000, 168600, 200000, 250000, 750000]
+        states = ['CA', 'TX', 'NY', 'ZZ', 'WA', 'MA', 'CA']
+        statuses = ['single', 'married', 'hoh', 'married_separate', 'Married', 'unknown', 'head_of_household']
+        self.assert_matches_scalar(incomes, states, statuses)
+    
+    def test_scalar_state_and_status(self):
+        """Test one state and filing status applied to an income curve"""
+        self.assert_matches_scalar(list(np.linspace(0, 1000000, 101)), 'NY', 'married')
+    
+    def test_fica_caps(self):
+        """Test the Social Security wage base and additional Medicare threshold"""
+        fica = TaxCalculator.calculate_fica_taxes_array([100000, 168600, 300000])
+        self.assertAlmostEqual(fica[0], 7650)
+        self.assertAlmostEqual(fica[1], 168600 * 0.0765)
+        self.assertAlmostEqual(fica[2], 168600 * 0.062 + 300000 * 0.0145 + 100000 * 0.009)
+    
+    def test_mismatched_lengths(self):
+        """Test that per-income values must match the number of incomes"""
+        with self.assertRaises(ValueError):
+            TaxCalculator.calculate_after_tax_income_batch([50000, 60000], ['CA'])
+        with self.assertRaises(ValueError):
+            TaxCalculator.calculate_after_tax_income_batch([[50000]])
+
+
+if __name__ == '__main__':
+    unittest.main()